@@ -0,0 +1,335 @@
+from collections import OrderedDict
+import os
+import pickle
+import platform
+import random
+import tempfile
+import time
+
+from benchmarks.BenchmarkBears import make_bears
+from benchmarks.ProjectGenerator import generate_project, modify_file
+from coalib.collecting.Collectors import collect_files
+from coalib.misc.Constants import VERSION
+from coalib.misc.Shell import run_shell_command
+from coalib.processes.Processing import (
+    execute_section, get_file_dict, yield_ignore_ranges)
+from coalib.results.Diff import Diff
+from coalib.results.DiffAlgorithms import DIFF_ALGORITHMS
+from coalib.results.Result import Result
+from coalib.results.ResultFilter import filter_results
+from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Not available on Windows.
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    # Not available before Python 3.4.
+    tracemalloc = None
+
+# Increase it when the recorded data changes incompatibly.
+FORMAT_VERSION = 2
+
+
+def get_peak_rss(children=False):
+    """
+    Retrieves the peak resident set size of this process or of its waited
+    for child processes. The latter is the peak of the largest single child,
+    not of all children together, so the two can't be added up.
+
+    :param children: Whether to retrieve the peak of the child processes
+                     instead of the one of this process.
+    :return:         The peak RSS in KiB or None if it can't be retrieved.
+    """
+    if resource is None:  # pragma: no cover
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN if children
+                                  else resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() == "Darwin":  # pragma: no cover
+        # macOS reports bytes instead of KiB.
+        peak_rss //= 1024
+    return peak_rss
+
+
+def get_commit():
+    """
+    Retrieves the git commit of the coala source tree the benchmarks run on.
+
+    :return: The commit hash or None if it can't be retrieved.
+    """
+    try:
+        stdout, stderr = run_shell_command(
+            ("git", "rev-parse", "HEAD"),
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    except OSError:  # pragma: no cover
+        return None
+
+    return stdout.strip() or None
+
+
+def time_stage(function, repeat):
+    """
+    Runs the given function repeatedly and measures its wall time.
+
+    >>> result, stage = time_stage(lambda: 42, 3)
+    >>> result
+    42
+    >>> len(stage["times"])
+    3
+
+    :param function: The function to run without arguments.
+    :param repeat:   How often to run it.
+    :return:         A tuple of the return value of the last run and a dict
+                     with the ``times`` of all runs in seconds as well as
+                     their ``min`` and ``mean``.
+    """
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+
+    return result, {"min": min(times),
+                    "mean": sum(times) / len(times),
+                    "times": times}
+
+
+def measure_memory(function):
+    """
+    Measures the memory allocated by the objects a function returns.
+
+    >>> result, size = measure_memory(lambda: [0] * 1000)
+    >>> size is None or size >= 8000
+    True
+
+    :param function: The function to run without arguments.
+    :return:         A tuple of the return value and the size in bytes of the
+                     memory allocated during the call and not freed
+                     afterwards or None if ``tracemalloc`` isn't available.
+    """
+    if tracemalloc is None:  # pragma: no cover
+        return function(), None
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = function()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+
+def create_results(filenames, count):
+    """
+    Creates results spread over the given files like bears yield them.
+
+    :param filenames: The names of the files the results affect.
+    :param count:     The number of results to create.
+    :return:          A list of the results.
+    """
+    return [Result.from_values("BenchmarkBear",
+                               "Result {}".format(index),
+                               filenames[index % len(filenames)],
+                               index // len(filenames) + 1,
+                               1,
+                               index // len(filenames) + 1,
+                               10)
+            for index in range(count)]
+
+
+def run_benchmarks(log_printer,
+                   file_count=50,
+                   line_count=200,
+                   local_bear_count=2,
+                   global_bear_count=1,
+                   jobs=None,
+                   repeat=3,
+                   settings=None,
+                   seed=0,
+                   filter_file_count=5,
+                   result_count=100000):
+    """
+    Benchmarks the stages of the processing pipeline on a synthetic project.
+
+    :param log_printer:       The log printer the benchmarked code logs to.
+    :param file_count:        The number of files of the project.
+    :param line_count:        The number of lines of each file.
+    :param local_bear_count:  The number of local bears to run.
+    :param global_bear_count: The number of global bears to run.
+    :param jobs:              The number of processes ``execute_section``
+                              runs bears in, defaults to the CPU count.
+    :param repeat:            How often to run each stage. The minimum time is
+                              the most reliable one.
+    :param settings:          A dict of additional settings for the section
+                              ``execute_section`` runs.
+    :param seed:              The seed of the generated project.
+    :param filter_file_count: The number of files to filter the results of,
+                              ``filter_results`` takes quadratic time in the
+                              number of results.
+    :param result_count:      The number of results to create and pickle.
+                              The stages record the ``memory`` the results
+                              take and the ``size`` of their pickle in bytes
+                              next to the times.
+    :return:                  A dict with the parameters, the environment and
+                              the recorded measures that can be serialized to
+                              JSON.
+    """
+    parameters = OrderedDict([("file_count", file_count),
+                              ("line_count", line_count),
+                              ("local_bear_count", local_bear_count),
+                              ("global_bear_count", global_bear_count),
+                              ("jobs", jobs),
+                              ("repeat", repeat),
+                              ("settings", settings or {}),
+                              ("seed", seed),
+                              ("filter_file_count", filter_file_count),
+                              ("result_count", result_count)])
+    stages = OrderedDict()
+
+    def stage(name, function):
+        result, stages[name] = time_stage(function, repeat)
+        return result
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="coala_benchmark_") as directory:
+        generate_project(directory, file_count, line_count, seed)
+        files_glob = os.path.join(directory, "**", "*.py")
+
+        filenames = stage("collect_files",
+                          lambda: collect_files([files_glob], log_printer))
+        file_dict = stage("get_file_dict",
+                          lambda: get_file_dict(filenames, log_printer))
+        stage("yield_ignore_ranges",
+              lambda: list(yield_ignore_ranges(file_dict)))
+
+        rand = random.Random(seed)
+        modified_file_dict = {filename: modify_file(rand, file)
+                              for filename, file in file_dict.items()}
+        for algorithm in sorted(DIFF_ALGORITHMS):
+            stage("Diff.from_string_arrays[{}]".format(algorithm),
+                  lambda: [Diff.from_string_arrays(
+                               file_dict[filename],
+                               modified_file_dict[filename],
+                               algorithm)
+                           for filename in file_dict])
+
+        # Files made of two different lines have no rare lines to align, the
+        # worst case of the histogram algorithm.
+        repeated_lines = [
+            [rand.choice(("a\n", "b\n"))
+             for i in range(file_count * line_count)]
+            for j in range(2)]
+        for algorithm in sorted(DIFF_ALGORITHMS):
+            stage("Diff.from_string_arrays[{}, repeated lines]".format(
+                      algorithm),
+                  lambda: Diff.from_string_arrays(*repeated_lines,
+                                                  algorithm=algorithm))
+
+        result_filenames = sorted(file_dict)
+        results = stage("create_results",
+                        lambda: create_results(result_filenames,
+                                               result_count))
+        del results
+        results, stages["create_results"]["memory"] = measure_memory(
+            lambda: create_results(result_filenames, result_count))
+        pickled_results = pickle.dumps(results)
+        stage("pickle_results",
+              lambda: pickle.loads(pickle.dumps(results)))
+        stages["pickle_results"]["size"] = len(pickled_results)
+        del results, pickled_results
+
+        local_bears, global_bears = make_bears(local_bear_count,
+                                               global_bear_count)
+        section = Section("benchmark")
+        if local_bears:
+            bear = local_bears[0](section, None)
+            filter_filenames = sorted(file_dict)[:filter_file_count]
+            original_file_dict, filter_file_dict = (
+                {filename: some_file_dict[filename]
+                 for filename in filter_filenames}
+                for some_file_dict in (file_dict, modified_file_dict))
+            original_results, modified_results = (
+                [result
+                 for filename, file in sorted(some_file_dict.items())
+                 for result in bear.run(filename, file)]
+                for some_file_dict in (original_file_dict, filter_file_dict))
+            stage("filter_results",
+                  lambda: filter_results(original_file_dict,
+                                         filter_file_dict,
+                                         original_results,
+                                         modified_results))
+            stage("filter_results[compare_snippets]",
+                  lambda: filter_results(original_file_dict,
+                                         filter_file_dict,
+                                         original_results,
+                                         modified_results,
+                                         compare_snippets=True))
+
+        section.append(Setting("files", files_glob))
+        if jobs is not None:
+            section.append(Setting("jobs", str(jobs)))
+        for key, value in parameters["settings"].items():
+            section.append(Setting(key, value))
+
+        stage("execute_section",
+              lambda: execute_section(section,
+                                      list(global_bears),
+                                      list(local_bears),
+                                      lambda *args: None,
+                                      log_printer))
+
+    return OrderedDict([("format_version", FORMAT_VERSION),
+                        ("commit", get_commit()),
+                        ("coala_version", VERSION),
+                        ("python_version", platform.python_version()),
+                        ("platform", platform.platform()),
+                        ("timestamp", time.time()),
+                        ("parameters", parameters),
+                        ("wall_time", time.perf_counter() - start),
+                        ("peak_rss", get_peak_rss()),
+                        ("peak_rss_children", get_peak_rss(children=True)),
+                        ("stages", stages)])
+
+
+def compare_benchmarks(old, new, threshold=1.1):
+    """
+    Compares the minimum stage times of two benchmark runs.
+
+    >>> old = {"stages": OrderedDict([("a", {"min": 1.0}),
+    ...                               ("b", {"min": 2.0})])}
+    >>> new = {"stages": {"a": {"min": 1.5}, "b": {"min": 1.0},
+    ...                   "c": {"min": 1.0}}}
+    >>> for row in compare_benchmarks(old, new):
+    ...     print(row)
+    ('a', 1.0, 1.5, 1.5, True)
+    ('b', 2.0, 1.0, 0.5, False)
+
+    :param old:       The result of the older run as returned by
+                      ``run_benchmarks()``.
+    :param new:       The result of the newer run.
+    :param threshold: The ratio of the new to the old time from which on a
+                      stage counts as regressed.
+    :return:          A list of tuples of the stage name, the old and the new
+                      time, their ratio and whether the stage regressed, for
+                      all stages recorded in both runs.
+    """
+    rows = []
+    for name, old_stage in old["stages"].items():
+        if name not in new["stages"]:
+            continue
+
+        new_time = new["stages"][name]["min"]
+        ratio = new_time / old_stage["min"] if old_stage["min"] else 1.0
+        rows.append((name, old_stage["min"], new_time, ratio,
+                     ratio > threshold))
+
+    return rows
@@ -0,0 +1,64 @@
+from coalib.bears.GlobalBear import GlobalBear
+from coalib.bears.LocalBear import LocalBear
+from coalib.results.Diff import Diff
+from coalib.results.Result import Result
+
+
+class BenchmarkLocalBear(LocalBear):
+    """
+    Reports every line containing ``fixme`` with a patch removing it.
+    """
+
+    LANGUAGES = "all"
+
+    def run(self, filename, file):
+        for line_number, line in enumerate(file, start=1):
+            if "fixme" in line:
+                diff = Diff(file)
+                diff.delete_line(line_number)
+                yield Result.from_values(self,
+                                         "Fix this.",
+                                         filename,
+                                         line=line_number,
+                                         diffs={filename: diff})
+
+
+class BenchmarkGlobalBear(GlobalBear):
+    """
+    Reports the number of ``fixme`` lines of each file.
+    """
+
+    LANGUAGES = "all"
+
+    def run(self):
+        for filename, file in sorted(self.file_dict.items()):
+            count = sum(1 for line in file if "fixme" in line)
+            yield Result.from_values(self,
+                                     "{} lines to fix.".format(count),
+                                     filename)
+
+
+def make_bears(local_bear_count, global_bear_count):
+    """
+    Creates distinct benchmark bear classes.
+
+    >>> [bear.__name__ for bear in make_bears(2, 1)[0]]
+    ['BenchmarkLocalBear0', 'BenchmarkLocalBear1']
+
+    :param local_bear_count:  The number of local bears to create.
+    :param global_bear_count: The number of global bears to create.
+    :return:                  A tuple of the list of local bear classes and
+                              the list of global bear classes.
+    """
+    def make(base, count):
+        bears = []
+        for index in range(count):
+            name = base.__name__ + str(index)
+            # Bears are looked up by name when they are pickled.
+            if name not in globals():
+                globals()[name] = type(name, (base,), {})
+            bears.append(globals()[name])
+        return bears
+
+    return (make(BenchmarkLocalBear, local_bear_count),
+            make(BenchmarkGlobalBear, global_bear_count))
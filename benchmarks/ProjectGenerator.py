@@ -0,0 +1,102 @@
+import os
+import random
+
+from benchmarks.BenchmarkBears import BenchmarkLocalBear
+
+WORDS = ("coala", "bear", "result", "section", "diff", "value", "file",
+         "line", "range", "setting", "queue", "process")
+
+
+def generate_line(rand, index):
+    """
+    Generates a line of python-like source code. Every 10th line contains a
+    ``fixme`` the benchmark bears report.
+
+    >>> generate_line(random.Random(0), 3).endswith("(3)\\n")
+    True
+    >>> generate_line(random.Random(0), 10).startswith("    # fixme: ")
+    True
+
+    :param rand:  The ``random.Random`` instance to use.
+    :param index: The index of the line in the file.
+    :return:      The line including the newline.
+    """
+    first, second, third = (rand.choice(WORDS) for i in range(3))
+    if index % 10 == 0:
+        return "    # fixme: {} {}\n".format(first, second)
+    return "    {} = {}.{}({})\n".format(first, second, third, index)
+
+
+def generate_file(rand, line_count):
+    """
+    Generates the contents of a file.
+
+    Every 50th line the ``fixme`` in the next line is ignored for the first
+    benchmark bear.
+
+    :param rand:       The ``random.Random`` instance to use.
+    :param line_count: The number of lines.
+    :return:           A list of lines.
+    """
+    file = ["def function():\n"]
+    for index in range(1, line_count):
+        if index % 50 == 49 and index < line_count - 1:
+            file.append("    # Ignore {}0\n".format(
+                BenchmarkLocalBear.__name__))
+        else:
+            file.append(generate_line(rand, index))
+
+    return file
+
+
+def generate_project(directory, file_count, line_count, seed=0):
+    """
+    Writes a synthetic project to the given directory.
+
+    The files are spread across subdirectories with up to 50 files each.
+
+    :param directory:  The directory to write the project to.
+    :param file_count: The number of files to generate.
+    :param line_count: The number of lines of each file.
+    :param seed:       The seed for the random contents. The same seed
+                       generates the same project.
+    :return:           A dict with the names of the generated files as keys
+                       and their contents as values.
+    """
+    rand = random.Random(seed)
+    file_dict = {}
+    for index in range(file_count):
+        subdirectory = os.path.join(directory, "package{}".format(index // 50))
+        os.makedirs(subdirectory, exist_ok=True)
+        filename = os.path.join(subdirectory, "module{}.py".format(index))
+        file_dict[filename] = generate_file(rand, line_count)
+        with open(filename, "w") as file:
+            file.writelines(file_dict[filename])
+
+    return file_dict
+
+
+def modify_file(rand, file, change_count=5):
+    """
+    Changes some lines of a file like an edit between two commits would.
+
+    >>> modify_file(random.Random(0), ["a\\n", "b\\n", "c\\n"], 1)
+    ['a\\n', 'c\\n']
+
+    :param rand:         The ``random.Random`` instance to use.
+    :param file:         The contents of the file.
+    :param change_count: The number of changes to make.
+    :return:             The changed contents of the file as a new list.
+    """
+    file = list(file)
+    for i in range(change_count):
+        index = rand.randrange(len(file))
+        action = rand.randrange(3)
+        if action == 0:
+            file.insert(index, "    inserted = {}\n".format(i))
+        elif action == 1 and len(file) > 1:
+            del file[index]
+        else:
+            file[index] = "    changed = {}\n".format(i)
+
+    return file
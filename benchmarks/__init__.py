@@ -0,0 +1,13 @@
+"""
+Benchmarks for the hot paths of coala's processing pipeline.
+
+The benchmarks run on synthetic projects, see ``ProjectGenerator``, with
+fake bears, see ``BenchmarkBears``. Run them with::
+
+    python3 -m benchmarks run --files 200 --lines 300 -o before.json
+
+and compare the recorded results of two runs, e.g. before and after a
+change, with::
+
+    python3 -m benchmarks compare before.json after.json
+"""
@@ -0,0 +1,122 @@
+import argparse
+from collections import OrderedDict
+import json
+import sys
+
+from pyprint.ConsolePrinter import ConsolePrinter
+from pyprint.NullPrinter import NullPrinter
+
+from benchmarks.Benchmark import compare_benchmarks, run_benchmarks
+from coalib.output.printers.LogPrinter import LogPrinter
+
+
+def benchmark_arg_parser():
+    arg_parser = argparse.ArgumentParser(
+        prog="python3 -m benchmarks",
+        description="Benchmarks the processing pipeline of coala on a "
+                    "synthetic project.")
+    subparsers = arg_parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser(
+        "run",
+        help="Run the benchmarks and record the results as JSON.")
+    run_parser.add_argument("--files", type=int, default=50,
+                            help="Number of files to generate.")
+    run_parser.add_argument("--lines", type=int, default=200,
+                            help="Number of lines of each file.")
+    run_parser.add_argument("--local-bears", type=int, default=2,
+                            help="Number of local bears to run.")
+    run_parser.add_argument("--global-bears", type=int, default=1,
+                            help="Number of global bears to run.")
+    run_parser.add_argument("-j", "--jobs", type=int,
+                            help="Number of processes to run bears in.")
+    run_parser.add_argument("--repeat", type=int, default=3,
+                            help="How often to run each stage.")
+    run_parser.add_argument("--seed", type=int, default=0,
+                            help="Seed of the generated project.")
+    run_parser.add_argument("--filter-files", type=int, default=5,
+                            help="Number of files to benchmark "
+                                 "filter_results on.")
+    run_parser.add_argument("--results", type=int, default=100000,
+                            help="Number of results to benchmark creating "
+                                 "and pickling.")
+    run_parser.add_argument("-S", "--settings", nargs="+", default=[],
+                            metavar="KEY=VALUE",
+                            help="Additional settings for the benchmarked "
+                                 "section, e.g. mmap_file_dict=true.")
+    run_parser.add_argument("-o", "--output",
+                            metavar="FILE",
+                            help="File to write the results to instead of "
+                                 "stdout.")
+    run_parser.add_argument("--log",
+                            action="store_true",
+                            help="Show the log messages of coala.")
+
+    compare_parser = subparsers.add_parser(
+        "compare",
+        help="Compare the results of two runs.")
+    compare_parser.add_argument("old", help="Results of the older run.")
+    compare_parser.add_argument("new", help="Results of the newer run.")
+    compare_parser.add_argument("--threshold", type=float, default=1.1,
+                                help="Ratio of the new to the old time from "
+                                     "which on a stage counts as regressed.")
+    return arg_parser
+
+
+def load_results(filename):
+    with open(filename) as file:
+        return json.load(file, object_pairs_hook=OrderedDict)
+
+
+def main(arg_list=None):
+    arg_parser = benchmark_arg_parser()
+    args = arg_parser.parse_args(arg_list)
+
+    if args.command == "run":
+        settings = OrderedDict()
+        for setting in args.settings:
+            key, sep, value = setting.partition("=")
+            if not sep:
+                arg_parser.error("Invalid setting {!r}, use KEY=VALUE."
+                                 .format(setting))
+            settings[key.strip()] = value.strip()
+
+        log_printer = LogPrinter(ConsolePrinter() if args.log else
+                                 NullPrinter())
+        results = run_benchmarks(log_printer,
+                                 file_count=args.files,
+                                 line_count=args.lines,
+                                 local_bear_count=args.local_bears,
+                                 global_bear_count=args.global_bears,
+                                 jobs=args.jobs,
+                                 repeat=args.repeat,
+                                 settings=settings,
+                                 seed=args.seed,
+                                 filter_file_count=args.filter_files,
+                                 result_count=args.results)
+        output = json.dumps(results, indent=2)
+        if args.output:
+            with open(args.output, "w") as file:
+                file.write(output + "\n")
+        else:
+            print(output)
+        return 0
+
+    if args.command == "compare":
+        rows = compare_benchmarks(load_results(args.old),
+                                  load_results(args.new),
+                                  args.threshold)
+        print("{:<25} {:>10} {:>10} {:>7}".format("stage", "old (s)",
+                                                  "new (s)", "ratio"))
+        for name, old_time, new_time, ratio, regressed in rows:
+            print("{:<25} {:>10.4f} {:>10.4f} {:>7.2f}{}".format(
+                name, old_time, new_time, ratio,
+                "  REGRESSED" if regressed else ""))
+        return 1 if any(row[4] for row in rows) else 0
+
+    arg_parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -2,21 +2,40 @@ from contextlib import contextmanager
 from functools import partial
 import inspect
 from itertools import chain, compress
+import os
 import re
 import shutil
 from subprocess import check_call, CalledProcessError, DEVNULL
 from types import MappingProxyType
 
+from coalib.bears.GlobalBear import GlobalBear
 from coalib.bears.LocalBear import LocalBear
 from coalib.misc.ContextManagers import make_temp
 from coalib.misc.Decorators import assert_right_type, enforce_signature
 from coalib.misc.Future import partialmethod
-from coalib.misc.Shell import run_shell_command
+from coalib.misc.Shell import (
+    run_shell_command, run_shell_commands_sequentially)
 from coalib.results.Diff import Diff
 from coalib.results.Result import Result
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
 from coalib.settings.FunctionMetadata import FunctionMetadata
 
+try:
+    from coalib.misc.AsyncShell import run_shell_commands
+except ImportError:  # pragma: no cover
+    # asyncio is only available from Python 3.4 on, run the commands one
+    # after another then, which never exceeds max_concurrency.
+    def run_shell_commands(commands, stdin=None, timeout=0,
+                           max_concurrency=0):
+        return run_shell_commands_sequentially(commands, stdin, timeout)
+
+DEFAULT_SEVERITY_MAP = MappingProxyType({
+    "error": RESULT_SEVERITY.MAJOR,
+    "warning": RESULT_SEVERITY.NORMAL,
+    "warn": RESULT_SEVERITY.NORMAL,
+    "information": RESULT_SEVERITY.INFO,
+    "info": RESULT_SEVERITY.INFO})
+
 
 def _prepare_options(options):
     """
@@ -26,6 +45,7 @@ def _prepare_options(options):
         The options dict that contains user/developer inputs.
     """
     allowed_options = {"executable",
+                       "batch",
                        "output_format",
                        "use_stdin",
                        "use_stdout",
@@ -93,6 +113,44 @@ def _prepare_options(options):
     elif options["output_format"] is not None:
         raise ValueError("Invalid `output_format` specified.")
 
+    if options["batch"]:
+        if options["use_stdin"]:
+            raise ValueError("`use_stdin` can't be used in batch mode.")
+
+        if (options["output_format"] != "regex" or
+                "filename" not in options["output_regex"].groupindex):
+            raise ValueError("Batch mode needs output-format 'regex' with the "
+                             "named group `filename` used in `output_regex`.")
+
+        if "batch_size" in options:
+            assert_right_type(options["batch_size"], int, "batch_size")
+            if options["batch_size"] < 1:
+                raise ValueError("Invalid value for `batch_size`: " +
+                                 repr(options["batch_size"]))
+        else:
+            options["batch_size"] = 100
+
+        if "max_concurrency" in options:
+            assert_right_type(options["max_concurrency"],
+                              int,
+                              "max_concurrency")
+            if options["max_concurrency"] < 0:
+                raise ValueError("Invalid value for `max_concurrency`: " +
+                                 repr(options["max_concurrency"]))
+        else:
+            options["max_concurrency"] = 0
+
+        if "invocation_timeout" in options:
+            assert_right_type(options["invocation_timeout"],
+                              (int, float),
+                              "invocation_timeout")
+        else:
+            options["invocation_timeout"] = 0
+
+        allowed_options |= {"batch_size",
+                            "max_concurrency",
+                            "invocation_timeout"}
+
     if options["prerequisite_check_command"]:
         if "prerequisite_check_fail_message" in options:
             assert_right_type(options["prerequisite_check_fail_message"],
@@ -119,7 +177,8 @@ def _create_linter(klass, options):
             return "<{} linter class (wrapping {!r})>".format(
                 cls.__name__, options["executable"])
 
-    class LinterBase(LocalBear, metaclass=LinterMeta):
+    class LinterBase(GlobalBear if options["batch"] else LocalBear,
+                     metaclass=LinterMeta):
 
         @staticmethod
         def generate_config(filename, file):
@@ -132,6 +191,9 @@ def _create_linter(klass, options):
 
             By default no configuration is generated.
 
+            In batch mode this is called only once with ``None`` as
+            ``filename`` and ``file``, the config-file is used for all files.
+
             You can provide additional keyword arguments and defaults. These
             will be interpreted as required settings that need to be provided
             through a coafile-section.
@@ -165,6 +227,24 @@ def _create_linter(klass, options):
             """
             raise NotImplementedError
 
+        @staticmethod
+        def create_batch_arguments(filenames, config_file):
+            """
+            Creates the arguments for the linter in batch mode.
+
+            You can provide additional keyword arguments and defaults. These
+            will be interpreted as required settings that need to be provided
+            through a coafile-section.
+
+            :param filenames:
+                The names of the files the linter-tool shall process.
+            :param config_file:
+                The path of the config-file if used. ``None`` if unused.
+            :return:
+                A sequence of arguments to feed the linter-tool with.
+            """
+            raise NotImplementedError
+
         @staticmethod
         def get_executable():
             """
@@ -201,6 +281,11 @@ def _create_linter(klass, options):
 
         @classmethod
         def _get_create_arguments_metadata(cls):
+            if options["batch"]:
+                return FunctionMetadata.from_function(
+                    cls.create_batch_arguments,
+                    omit={"self", "filenames", "config_file"})
+
             return FunctionMetadata.from_function(
                 cls.create_arguments,
                 omit={"self", "filename", "file", "config_file"})
@@ -336,12 +421,7 @@ def _create_linter(klass, options):
 
         def process_output_regex(
                 self, output, filename, file, output_regex,
-                severity_map=MappingProxyType({
-                    "error": RESULT_SEVERITY.MAJOR,
-                    "warning": RESULT_SEVERITY.NORMAL,
-                    "warn": RESULT_SEVERITY.NORMAL,
-                    "information": RESULT_SEVERITY.INFO,
-                    "info": RESULT_SEVERITY.INFO})):
+                severity_map=DEFAULT_SEVERITY_MAP):
             """
             Processes the executable's output using a regex.
 
@@ -386,6 +466,46 @@ def _create_linter(klass, options):
                     yield self._convert_output_regex_match_to_result(
                         match, filename, severity_map=severity_map)
 
+        def process_batch_output_regex(self,
+                                       output,
+                                       filenames,
+                                       output_regex,
+                                       severity_map=DEFAULT_SEVERITY_MAP):
+            """
+            Processes the output the executable produced for several files
+            using a regex. Each match is assigned to a file through the named
+            group ``filename``.
+
+            :param output:
+                The output of the program. This can be either a single
+                string or a sequence of strings.
+            :param filenames:
+                The names of the files the executable processed.
+            :param output_regex:
+                The regex to parse the output with, see
+                ``process_output_regex()``.
+            :param severity_map:
+                A dict used to map a severity string to an actual
+                ``coalib.results.RESULT_SEVERITY`` for a result.
+            :return:
+                An iterator returning results.
+            """
+            if isinstance(output, str):
+                output = (output,)
+
+            filenames = {os.path.abspath(filename): filename
+                         for filename in filenames}
+            for string in output:
+                for match in re.finditer(output_regex, string):
+                    reported = os.path.abspath(match.group("filename"))
+                    if reported not in filenames:
+                        self.debug("Ignoring output for file {!r} which "
+                                   "wasn't linted.".format(reported))
+                        continue
+
+                    yield self._convert_output_regex_match_to_result(
+                        match, filenames[reported], severity_map=severity_map)
+
         if options["output_format"] is None:
             # Check if user supplied a `process_output` override.
             if not callable(getattr(klass, "process_output", None)):
@@ -422,7 +542,10 @@ def _create_linter(klass, options):
                     if key in options}
 
                 process_output = partialmethod(
-                    process_output_regex, **process_output_args)
+                    process_batch_output_regex
+                    if options["batch"] else
+                    process_output_regex,
+                    **process_output_args)
 
         @classmethod
         @contextmanager
@@ -432,9 +555,9 @@ def _create_linter(klass, options):
             user provides one and cleans it up when done with linting.
 
             :param filename:
-                The filename of the file.
+                The filename of the file or ``None`` in batch mode.
             :param file:
-                The file contents.
+                The file contents or ``None`` in batch mode.
             :param kwargs:
                 Section settings passed from ``run()``.
             :return:
@@ -450,48 +573,119 @@ def _create_linter(klass, options):
                         fl.write(content)
                     yield config_file
 
-        def run(self, filename, file, **kwargs):
-            # Get the **kwargs params to forward to `generate_config()`
-            # (from `_create_config()`).
-            generate_config_kwargs = FunctionMetadata.filter_parameters(
-                self._get_generate_config_metadata(), kwargs)
-
-            with self._create_config(
-                    filename,
-                    file,
-                    **generate_config_kwargs) as config_file:
-                # And now retrieve the **kwargs for `create_arguments()`.
-                create_arguments_kwargs = (
-                    FunctionMetadata.filter_parameters(
-                        self._get_create_arguments_metadata(), kwargs))
-
-                args = self.create_arguments(filename, file, config_file,
-                                             **create_arguments_kwargs)
-
-                try:
-                    args = tuple(args)
-                except TypeError:
-                    self.err("The given arguments "
-                             "{!r} are not iterable.".format(args))
-                    return
+        def _get_arguments(self, args):
+            """
+            Prepends the executable to the given arguments.
 
-                arguments = (self.get_executable(),) + args
-                self.debug("Running '{}'".format(' '.join(arguments)))
+            :param args:
+                The arguments returned by ``create_arguments()`` or
+                ``create_batch_arguments()``.
+            :return:
+                The command to run as a tuple or ``None`` if the arguments
+                are invalid.
+            """
+            try:
+                args = tuple(args)
+            except TypeError:
+                self.err("The given arguments "
+                         "{!r} are not iterable.".format(args))
+                return None
 
-                output = run_shell_command(
-                    arguments,
-                    stdin="".join(file) if options["use_stdin"] else None)
+            arguments = (self.get_executable(),) + args
+            self.debug("Running '{}'".format(' '.join(arguments)))
+            return arguments
 
-                output = tuple(compress(
-                    output,
-                    (options["use_stdout"], options["use_stderr"])))
-                if len(output) == 1:
-                    output = output[0]
+        @staticmethod
+        def _select_output(output):
+            """
+            Selects the output streams to pass to ``process_output()``.
 
+            :param output:
+                A tuple with the stdout and stderr output.
+            :return:
+                The output of the used stream or a tuple of both if both
+                are used.
+            """
+            output = tuple(compress(
+                output,
+                (options["use_stdout"], options["use_stderr"])))
+            if len(output) == 1:
+                output = output[0]
+
+            return output
+
+        if options["batch"]:
+            def run(self, **kwargs):
+                generate_config_kwargs = FunctionMetadata.filter_parameters(
+                    self._get_generate_config_metadata(), kwargs)
+                create_arguments_kwargs = FunctionMetadata.filter_parameters(
+                    self._get_create_arguments_metadata(), kwargs)
                 process_output_kwargs = FunctionMetadata.filter_parameters(
                     self._get_process_output_metadata(), kwargs)
-                return self.process_output(output, filename, file,
-                                           **process_output_kwargs)
+
+                filenames = sorted(self.file_dict)
+                batch_size = options["batch_size"]
+                batches = [filenames[start:start + batch_size]
+                           for start in range(0, len(filenames), batch_size)]
+                # One config-file is shared by all invocations.
+                with self._create_config(
+                        None,
+                        None,
+                        **generate_config_kwargs) as config_file:
+                    commands = [
+                        self._get_arguments(self.create_batch_arguments(
+                            batch, config_file, **create_arguments_kwargs))
+                        for batch in batches]
+                    if None in commands:
+                        return
+
+                    # The invocations run concurrently in this process.
+                    outputs = run_shell_commands(
+                        commands,
+                        timeout=options["invocation_timeout"],
+                        max_concurrency=options["max_concurrency"])
+
+                for batch, output in zip(batches, outputs):
+                    if isinstance(output, Exception):
+                        self.warn("Linting {} failed: {}".format(
+                            ", ".join(batch), output))
+                        continue
+
+                    yield from self.process_output(
+                        self._select_output(output),
+                        batch,
+                        **process_output_kwargs)
+        else:
+            def run(self, filename, file, **kwargs):
+                # Get the **kwargs params to forward to `generate_config()`
+                # (from `_create_config()`).
+                generate_config_kwargs = FunctionMetadata.filter_parameters(
+                    self._get_generate_config_metadata(), kwargs)
+
+                with self._create_config(
+                        filename,
+                        file,
+                        **generate_config_kwargs) as config_file:
+                    # And now retrieve the **kwargs for `create_arguments()`.
+                    create_arguments_kwargs = (
+                        FunctionMetadata.filter_parameters(
+                            self._get_create_arguments_metadata(), kwargs))
+
+                    arguments = self._get_arguments(
+                        self.create_arguments(filename, file, config_file,
+                                              **create_arguments_kwargs))
+                    if arguments is None:
+                        return
+
+                    output = self._select_output(run_shell_command(
+                        arguments,
+                        stdin="".join(file) if options["use_stdin"] else None))
+
+                    process_output_kwargs = (
+                        FunctionMetadata.filter_parameters(
+                            self._get_process_output_metadata(), kwargs))
+                    return self.process_output(output, filename, file,
+                                               **process_output_kwargs)
 
         def __repr__(self):
             return "<{} linter object (wrapping {!r}) at {}>".format(
@@ -514,6 +708,7 @@ def linter(executable: str,
            executable_check_fail_info: str="",
            prerequisite_check_command: tuple=(),
            output_format: (str, None)=None,
+           batch: bool=False,
            **options):
     """
     Decorator that creates a ``LocalBear`` that is able to process results from
@@ -571,6 +766,23 @@ def linter(executable: str,
     ...                          config_file):
     ...         return "--lint", filename, "--config", config_file
 
+    Tools with a high startup time can lint many files in one go. In batch
+    mode the linter becomes a ``GlobalBear`` that passes the files to the
+    executable in batches via ``create_batch_arguments()``. A config-file
+    generated by ``generate_config()`` is shared by all of them. The output
+    is assigned to the files through the named group ``filename`` of the
+    ``output_regex``:
+
+    >>> @linter("xlint",
+    ...         batch=True,
+    ...         output_format="regex",
+    ...         output_regex=r"(?P<filename>.+):(?P<line>[0-9]+): "
+    ...                      r"(?P<message>.*)")
+    ... class XLintBear:
+    ...     @staticmethod
+    ...     def create_batch_arguments(filenames, config_file):
+    ...         return ("--lint",) + tuple(filenames)
+
     As you can see you don't need to copy additional keyword-arguments you
     introduced from ``create_arguments()`` to ``generate_config()`` and
     vice-versa. ``linter`` takes care of forwarding the right arguments to the
@@ -681,6 +893,23 @@ def linter(executable: str,
         given. If a negative distance is given, every change will be yielded as
         an own diff, even if they are right beneath each other. By default this
         value is ``1``.
+    :param batch:
+        Whether to run the executable once for many files instead of once per
+        file. Needs ``output_format`` ``'regex'`` with the named group
+        ``filename`` in ``output_regex`` and can't be used together with
+        ``use_stdin``. The decorated class implements
+        ``create_batch_arguments()`` instead of ``create_arguments()`` and
+        ``generate_config()`` takes no ``filename`` and ``file``.
+    :param batch_size:
+        The maximum number of files to pass to one invocation of the
+        executable in batch mode, 100 by default.
+    :param max_concurrency:
+        The maximum number of invocations of the executable to run at once
+        in batch mode. By default as many as there are CPUs.
+    :param invocation_timeout:
+        The number of seconds an invocation of the executable may run in
+        batch mode before it is interrupted and its files are skipped. By
+        default it may run indefinitely.
     :raises ValueError:
         Raised when invalid options are supplied.
     :raises TypeError:
@@ -697,6 +926,7 @@ def linter(executable: str,
     options["config_suffix"] = config_suffix
     options["executable_check_fail_info"] = executable_check_fail_info
     options["prerequisite_check_command"] = prerequisite_check_command
+    options["batch"] = batch
 
     _prepare_options(options)
 
@@ -19,9 +19,11 @@ from coalib.coala_main import run_coala
 from coalib.collecting.Collectors import (
     collect_all_bears_from_sections, filter_section_bears_by_languages)
 from coalib.misc.Exceptions import get_exitcode
+from coalib.misc.StringConverter import StringConverter
 from coalib.output.ConsoleInteraction import (
     acquire_settings, nothing_done, print_results, print_section_beginning,
     show_bears)
+from coalib.output.daemon.Protocol import DEFAULT_SOCKET
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.parsing.DefaultArgParser import default_arg_parser
 from coalib.settings.ConfigurationGathering import load_configuration
@@ -33,7 +35,21 @@ def main():
     arg_parser = default_arg_parser()
     args = arg_parser.parse_args()
 
+    try:
+        daemon = (args.daemon is not None and
+                  bool(StringConverter(str(args.daemon))))
+    except ValueError:
+        arg_parser.error("argument --daemon: invalid boolean value: "
+                         "'{}'".format(args.daemon))
+
     console_printer = ConsolePrinter()
+    if daemon:
+        # Only import the server when it is needed.
+        from coalib.output.daemon.DaemonServer import run_daemon
+        return run_daemon(args.daemon_socket[0] if args.daemon_socket
+                          else DEFAULT_SOCKET,
+                          LogPrinter(console_printer))
+
     if args.show_bears or args.show_all_bears or args.show_language_bears:
         log_printer = LogPrinter(console_printer)
         try:
@@ -0,0 +1,114 @@
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Note: This client is meant to start up fast, so it must not import anything
+#       beyond the standard library and the daemon protocol.
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+from coalib.output.daemon.Protocol import (
+    DEFAULT_SOCKET, receive_messages, send_message)
+
+SEVERITIES = {0: "INFO", 1: "NORMAL", 2: "MAJOR"}
+
+
+def format_result(result):
+    """
+    Formats a result as received from the daemon as a single line.
+
+    >>> format_result({"origin": "SomeBear", "message": "Bad.",
+    ...                "severity": 1, "affected_code": []})
+    'NORMAL: SomeBear: Bad.'
+    >>> format_result({"origin": "SomeBear", "message": "Bad.",
+    ...                "severity": 2, "affected_code": [
+    ...                    {"start": {"file": "a.py", "line": 2,
+    ...                               "column": None}}]})
+    'a.py:2: MAJOR: SomeBear: Bad.'
+
+    :param result: The result dictionary.
+    :return:       The formatted string.
+    """
+    location = ""
+    if result["affected_code"]:
+        start = result["affected_code"][0]["start"]
+        location = ":".join(str(part)
+                            for part in (start["file"],
+                                         start["line"],
+                                         start["column"])
+                            if part is not None) + ": "
+
+    return "{}{}: {}: {}".format(location,
+                                 SEVERITIES.get(result["severity"],
+                                                result["severity"]),
+                                 result["origin"],
+                                 result["message"])
+
+
+def client_arg_parser():
+    arg_parser = argparse.ArgumentParser(
+        prog="coala-client",
+        description="Analyzes files with a running coala daemon (see "
+                    "coala --daemon).")
+    arg_parser.add_argument('files',
+                            nargs='*',
+                            metavar='FILE',
+                            help="The files to analyze.")
+    arg_parser.add_argument('--socket',
+                            default=DEFAULT_SOCKET,
+                            metavar='PATH',
+                            help="The UNIX socket the daemon listens on.")
+    arg_parser.add_argument('--json',
+                            action='store_true',
+                            help="Print the messages of the daemon as they "
+                                 "are, one JSON object per line.")
+    arg_parser.add_argument('--shutdown',
+                            action='store_true',
+                            help="Stop the daemon.")
+    return arg_parser
+
+
+def main(arg_list=None):
+    args = client_arg_parser().parse_args(arg_list)
+    if args.shutdown:
+        request = {"command": "shutdown"}
+    else:
+        request = {"files": [os.path.abspath(filename)
+                             for filename in args.files]}
+
+    exitcode = 0
+    try:
+        with socket.socket(socket.AF_UNIX) as connection:
+            connection.connect(args.socket)
+            with connection.makefile("rwb") as stream:
+                send_message(stream, request)
+                for message in receive_messages(stream):
+                    if args.json:
+                        print(json.dumps(message, sort_keys=True))
+                    elif "results" in message:
+                        for result in message["results"]:
+                            print(format_result(result))
+                    elif "log" in message:
+                        print("[{}] {}".format(message["log"]["log_level"],
+                                               message["log"]["message"]),
+                              file=sys.stderr)
+                    exitcode = message.get("exitcode", exitcode)
+    except OSError as exception:
+        print("Unable to connect to the coala daemon at '{}': {}"
+              .format(args.socket, exception), file=sys.stderr)
+        return 2
+
+    return exitcode
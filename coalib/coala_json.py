@@ -12,6 +12,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import json
+import sys
 
 from coalib.coala_main import run_coala
 from coalib.output.JSONEncoder import create_json_encoder
@@ -28,12 +29,19 @@ def main():
     args = arg_parser.parse_args()
 
     log_printer = None if args.text_logs else ListLogPrinter()
+    JSONEncoder = create_json_encoder(use_relpath=args.relpath)
+
+    if args.format == "ndjson":
+        if args.output:
+            with open(str(args.output), 'w+') as fp:
+                return _stream_results(fp, log_printer, JSONEncoder)
+        return _stream_results(sys.stdout, log_printer, JSONEncoder)
+
     results, exitcode, _ = run_coala(log_printer=log_printer, autoapply=False)
 
     retval = {"results": results}
     if not args.text_logs:
         retval["logs"] = log_printer.logs
-    JSONEncoder = create_json_encoder(use_relpath=args.relpath)
     if args.output:
         filename = str(args.output)
         with open(filename, 'w+') as fp:
@@ -50,3 +58,50 @@ def main():
                          separators=(',', ': ')))
 
     return exitcode
+
+
+def _stream_results(fp, log_printer, JSONEncoder):
+    """
+    Runs coala and writes newline delimited JSON: A compact record
+    ``{"section": ..., "result": ...}`` is written for each result as soon as
+    it is printed, followed by a record ``{"summary": ...}`` holding the exit
+    code, the number of results per section and the logs, if not printed as
+    text.
+
+    :param fp:          The file to write the records to.
+    :param log_printer: The ListLogPrinter collecting the logs or None.
+    :param JSONEncoder: The JSON encoder class to serialize records with.
+    :return:            The exit code of coala.
+    """
+    result_counts = {}
+
+    def write_record(record):
+        fp.write(json.dumps(record,
+                            cls=JSONEncoder,
+                            sort_keys=True,
+                            separators=(',', ':')) + "\n")
+        fp.flush()
+
+    def print_results(log_printer, section, results, *args):
+        # Sections are keyed by their lower case name like in the results
+        # run_coala() returns.
+        section_name = section.name.lower()
+        for result in results:
+            write_record({"section": section_name, "result": result})
+        result_counts[section_name] = (result_counts.get(section_name, 0) +
+                                       len(results))
+
+    # The results are written as they come, keeping them would make the
+    # memory used grow with their number.
+    _, exitcode, _ = run_coala(log_printer=log_printer,
+                               print_results=print_results,
+                               autoapply=False,
+                               retain_results=False,
+                               retain_file_dicts=False)
+
+    summary = {"exitcode": exitcode, "result_counts": result_counts}
+    if log_printer is not None:
+        summary["logs"] = log_printer.logs
+    write_record({"summary": summary})
+
+    return exitcode
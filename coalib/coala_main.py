@@ -1,5 +1,7 @@
 import os
 import platform
+import queue
+import threading
 
 import pip
 from pyprint.ConsolePrinter import ConsolePrinter
@@ -8,19 +10,26 @@ from coalib import coala_delete_orig, VERSION
 from coalib.misc.Exceptions import get_exitcode
 from coalib.output.Interactions import fail_acquire_settings
 from coalib.output.printers.LogPrinter import LogPrinter
-from coalib.output.Tagging import delete_tagged_results, tag_results
+from coalib.output.Tagging import (
+    create_tag, delete_tagged_results, discard_tag, save_tag)
 from coalib.processes.Processing import execute_section, simplify_section_result
 from coalib.settings.ConfigurationGathering import gather_configuration
 
 do_nothing = lambda *args: True
 
+# The number of results iter_coala() buffers before the analysis waits for
+# the caller to take them.
+RESULT_BUFFER_SIZE = 1024
+
 
 def run_coala(log_printer=None,
               print_results=do_nothing,
               acquire_settings=fail_acquire_settings,
               print_section_beginning=do_nothing,
               nothing_done=do_nothing,
-              autoapply=True):
+              autoapply=True,
+              retain_results=True,
+              retain_file_dicts=True):
     """
     This is a main method that should be usable for almost all purposes and
     reduces executing coala to one function call.
@@ -45,14 +54,25 @@ def run_coala(log_printer=None,
     :param autoapply:               Set to False to autoapply nothing by
                                     default; this is overridable via any
                                     configuration file/CLI.
-    :return:                        A dictionary containing a list of results
-                                    for all analyzed sections as key.
+    :param retain_results:          Set to False to drop the results of each
+                                    section once it is finished, they are
+                                    only passed to ``print_results`` then.
+    :param retain_file_dicts:       Set to False to drop the file dict of each
+                                    section once it is finished.
+    :return:                        A tuple of a dictionary containing a list
+                                    of results for all analyzed sections as
+                                    key, the exit code and a dictionary
+                                    containing the file dict of all analyzed
+                                    sections. The dictionaries are empty if
+                                    the results or file dicts aren't
+                                    retained.
     """
     log_printer = log_printer or LogPrinter(ConsolePrinter())
 
     exitcode = 0
     results = {}
     file_dicts = {}
+    result_store = None
     try:
         yielded_results = yielded_unfixed_results = False
         did_nothing = True
@@ -73,6 +93,7 @@ def run_coala(log_printer=None,
         coala_delete_orig.main(log_printer, sections["default"])
 
         delete_tagged_results(dtag, config_file, log_printer)
+        result_store = create_tag(tag, config_file, log_printer)
 
         for section_name, section in sections.items():
             if not section.is_enabled(targets):
@@ -85,7 +106,7 @@ def run_coala(log_printer=None,
                 local_bear_list=local_bears[section_name],
                 print_results=print_results,
                 log_printer=log_printer)
-            yielded, yielded_unfixed, results[section_name] = (
+            yielded, yielded_unfixed, section_results = (
                 simplify_section_result(section_result))
 
             yielded_results = yielded_results or yielded
@@ -93,9 +114,17 @@ def run_coala(log_printer=None,
                 yielded_unfixed_results or yielded_unfixed)
             did_nothing = False
 
-            file_dicts[section_name] = section_result[3]
+            if retain_results:
+                results[section_name] = section_results
+            if retain_file_dicts:
+                file_dicts[section_name] = section_result[3]
+
+            if result_store is not None:
+                result_store.add_results(section_name, section_results)
 
-        tag_results(tag, config_file, results, log_printer)
+        # Results replace the tagged ones only if all sections finished.
+        if result_store is not None:
+            save_tag(result_store, tag, config_file, log_printer)
 
         if did_nothing:
             nothing_done(log_printer)
@@ -105,5 +134,100 @@ def run_coala(log_printer=None,
             exitcode = 5
     except BaseException as exception:  # pylint: disable=broad-except
         exitcode = exitcode or get_exitcode(exception, log_printer)
+    finally:
+        if result_store is not None:
+            discard_tag(result_store)
 
     return results, exitcode, file_dicts
+
+
+def iter_coala(log_printer=None,
+               acquire_settings=fail_acquire_settings,
+               print_section_beginning=do_nothing,
+               nothing_done=do_nothing,
+               autoapply=True,
+               file_dicts=None):
+    """
+    Runs coala like ``run_coala()`` but yields the results while the analysis
+    goes on. Neither the results nor the file dicts of finished sections are
+    kept, so the memory used doesn't grow with the number of sections.
+
+    The analysis runs in a separate thread and pauses while
+    ``RESULT_BUFFER_SIZE`` results wait to be taken. If the generator is
+    closed before it is exhausted, the analysis is stopped as soon as the
+    next results are printed or the next section begins.
+
+    :param log_printer:             A LogPrinter object to use for logging.
+    :param acquire_settings:        The method to use for requesting settings,
+                                    see ``run_coala()``.
+    :param print_section_beginning: A callback that will be called with a
+                                    section whenever analysis of a new section
+                                    is started.
+    :param nothing_done:            A callback that will be called with only a
+                                    log printer that shall indicate that
+                                    nothing was done.
+    :param autoapply:               Set to False to autoapply nothing by
+                                    default; this is overridable via any
+                                    configuration file/CLI.
+    :param file_dicts:              A dictionary to store the file dict of all
+                                    analyzed sections in with the section name
+                                    as key. By default the file dicts are not
+                                    retained.
+    :return:                        A generator yielding tuples of the section
+                                    name and a result. Its return value is the
+                                    exit code.
+    """
+    result_queue = queue.Queue(RESULT_BUFFER_SIZE)
+    closed = threading.Event()
+    outcome = []
+
+    def check_closed():
+        if closed.is_set():
+            # run_coala() stops without logging anything on SystemExit.
+            raise SystemExit(0)
+
+    def section_beginning(section):
+        check_closed()
+        print_section_beginning(section)
+
+    def print_results(log_printer, section, results, *args):
+        check_closed()
+        for result in results:
+            # Sections are keyed by their lower case name like in the
+            # results run_coala() returns.
+            result_queue.put((section.name.lower(), result))
+
+    def run():
+        try:
+            outcome.append(run_coala(
+                log_printer=log_printer,
+                print_results=print_results,
+                acquire_settings=acquire_settings,
+                print_section_beginning=section_beginning,
+                nothing_done=nothing_done,
+                autoapply=autoapply,
+                retain_results=False,
+                retain_file_dicts=file_dicts is not None))
+        finally:
+            result_queue.put(None)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    finished = False
+    try:
+        for item in iter(result_queue.get, None):
+            yield item
+        finished = True
+    finally:
+        if not finished:
+            closed.set()
+            # Take the remaining results so the analysis can't block on a
+            # full queue while it stops.
+            for item in iter(result_queue.get, None):
+                pass
+        thread.join()
+
+    _, exitcode, section_file_dicts = outcome[0]
+    if file_dicts is not None:
+        file_dicts.update(section_file_dicts)
+    return exitcode
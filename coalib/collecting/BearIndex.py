@@ -0,0 +1,157 @@
+import inspect
+import json
+import os
+import tempfile
+
+# Increase it when the format of the entries changes incompatibly.
+INDEX_VERSION = 2
+
+
+def _get_file_stat(path):
+    """
+    Retrieves what identifies a version of a file for the index.
+
+    :param path: The path of the file.
+    :return:     A list of the modification time in nanoseconds and the size
+                 of the file or None if it can't be accessed.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _get_source_file(bear_class):
+    try:
+        return os.path.abspath(inspect.getsourcefile(bear_class))
+    except TypeError:
+        return None
+
+
+def get_bear_entry(bear_class, kind):
+    """
+    Describes a bear the way the index stores it.
+
+    >>> from coalib.bears.LocalBear import LocalBear
+    >>> class SomeBear(LocalBear):
+    ...     pass
+    >>> get_bear_entry(SomeBear, 0) == {"name": "SomeBear", "kind": 0}
+    True
+
+    :param bear_class: The bear class.
+    :param kind:       The kind of the bear.
+    :return:           A dict with the name and kind of the bear.
+    """
+    return {"name": getattr(bear_class, "name", bear_class.__name__),
+            "kind": kind}
+
+
+class BearIndex:
+    """
+    An index of the bears in bear files, stored as JSON so bear files don't
+    need to be imported to find out which bears they contain. An entry is
+    valid as long as the bear file and the files defining its bears keep
+    their modification time and size.
+
+    >>> from coalib.bears.GlobalBear import GlobalBear
+    >>> class SomeBear(GlobalBear):
+    ...     pass
+    >>> index = BearIndex(os.path.join(tempfile.gettempdir(), "no_index"))
+    >>> index.get(__file__) is None
+    True
+    >>> index.update(__file__, [(SomeBear, 1)])
+    >>> [(entry["name"], entry["kind"]) for entry in index.get(__file__)]
+    [('SomeBear', 1)]
+    """
+
+    def __init__(self, path):
+        """
+        Loads the index. A missing, unreadable or outdated index file gives
+        an empty index.
+
+        :param path: The path of the index file.
+        """
+        self.path = path
+        self._changed = False
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            self._entries = (data["entries"]
+                             if data["version"] == INDEX_VERSION else {})
+        except (OSError, ValueError, KeyError, TypeError):
+            self._entries = {}
+
+    def get(self, file_path):
+        """
+        Retrieves the bears of a bear file.
+
+        :param file_path: The absolute path of the bear file.
+        :return:          A list of dicts like ``get_bear_entry()`` returns
+                          or None if the file isn't indexed or changed since.
+        """
+        entry = self._entries.get(file_path)
+        if entry is None or any(_get_file_stat(path) != stat
+                                for path, stat in entry["files"].items()):
+            return None
+        return entry["bears"]
+
+    def update(self, file_path, bears):
+        """
+        Indexes the bears of a bear file. Bears with kinds that can't be
+        stored as JSON prevent indexing the file.
+
+        :param file_path: The absolute path of the bear file.
+        :param bears:     A list of tuples of the bear classes in the file
+                          and their kinds.
+        """
+        if not all(kind is None or isinstance(kind, (str, int))
+                   for bear_class, kind in bears):
+            return
+
+        files = {file_path: _get_file_stat(file_path)}
+        for bear_class, kind in bears:
+            source_file = _get_source_file(bear_class)
+            if source_file is not None:
+                files[source_file] = _get_file_stat(source_file)
+
+        self._entries[file_path] = {
+            "files": files,
+            "bears": [get_bear_entry(bear_class, kind)
+                      for bear_class, kind in bears]}
+        self._changed = True
+
+    def save(self):
+        """
+        Writes the index if it changed. Entries of files that don't exist
+        anymore are dropped, so the index doesn't grow with every deleted
+        bear directory. The file is replaced atomically, so concurrent coala
+        runs never read a partially written index. The index is only a cache,
+        so failing to write it is ignored.
+        """
+        if not self._changed:
+            return
+
+        self._entries = {
+            file_path: entry
+            for file_path, entry in self._entries.items()
+            if all(_get_file_stat(path) is not None
+                   for path in entry["files"])}
+
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=directory)
+        except OSError:
+            return
+
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                json.dump({"version": INDEX_VERSION,
+                           "entries": self._entries},
+                          file)
+            os.replace(temp_path, self.path)
+            self._changed = False
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
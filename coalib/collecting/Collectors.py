@@ -1,14 +1,17 @@
-import functools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import os
 import pkg_resources
-import itertools
 from pyprint.NullPrinter import NullPrinter
 
 from coalib.bears.BEAR_KIND import BEAR_KIND
+from coalib.collecting.BearIndex import BearIndex, get_bear_entry
 from coalib.collecting.Importers import iimport_objects
+from coalib.misc import Constants
 from coalib.misc.Decorators import yield_once
 from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
-from coalib.parsing.Globbing import fnmatch, iglob, glob_escape
+from coalib.parsing.Globbing import (
+    GlobMatcher, iglob, iglob_entries, iter_literal_directories, glob_escape)
 from coalib.output.printers.LogPrinter import LogPrinter
 
 
@@ -19,20 +22,65 @@ def _get_kind(bear_class):
         return None
 
 
-def _import_bears(file_path, kinds):
+def _import_bears(file_path):
     # recursive imports:
     for bear_list in iimport_objects(file_path,
                                      names='__additional_bears__',
                                      types=list):
-        for bear_class in bear_list:
-            if _get_kind(bear_class) in kinds:
-                yield bear_class
+        yield from bear_list
     # normal import
-    for bear_class in iimport_objects(file_path,
-                                      attributes='kind',
-                                      local=True):
-        if _get_kind(bear_class) in kinds:
-            yield bear_class
+    yield from iimport_objects(file_path,
+                               attributes='kind',
+                               local=True)
+
+
+def _get_pruned_dir_matcher(ignored_globs):
+    """
+    Creates a function telling whether all contents of a directory are
+    ignored, so it doesn't need to be searched. That's the case if it is
+    matched by an ignore glob ending with ``/**``.
+
+    >>> is_pruned = _get_pruned_dir_matcher(["/a/**", "/b/*.py"])
+    >>> is_pruned("/a"), is_pruned("/b")
+    (True, False)
+
+    :param ignored_globs: list of globs to ignore when matching files
+    :return:              A function taking a directory path or None if no
+                          directory can be pruned.
+    """
+    dir_globs = [glob[:-3] for glob in ignored_globs or ()
+                 if glob.endswith(("/**", os.sep + "**"))]
+    return GlobMatcher(dir_globs).match if dir_globs else None
+
+
+@yield_once
+def _icollect_entries(file_paths, ignored_globs=None, executor=None):
+    """
+    Evaluate globs in file paths and return all matching files along with
+    their types as far as they are known from listing directories. Directories
+    whose contents are ignored are not searched.
+
+    :param file_paths:    file path or list of such that can include globs
+    :param ignored_globs: list of globs to ignore when matching files
+    :param executor:      A ``concurrent.futures.Executor`` to search
+                          directory trees with concurrently or None.
+    :return:              iterator that yields tuples of path of a matching
+                          file, the glob where it was found, whether it is a
+                          directory and whether it is a file, the latter two
+                          being None if unknown
+    """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+    ignored_match = (GlobMatcher(ignored_globs).match if ignored_globs
+                     else lambda fname: False)
+    prune = _get_pruned_dir_matcher(ignored_globs)
+
+    for file_path in file_paths:
+        for match, is_dir, is_file in iglob_entries(file_path,
+                                                    prune,
+                                                    executor):
+            if not ignored_match(match):
+                yield match, file_path, is_dir, is_file
 
 
 @yield_once
@@ -45,30 +93,92 @@ def icollect(file_paths, ignored_globs=None):
     :return:              iterator that yields tuple of path of a matching
                           file, the glob where it was found
     """
+    for match, file_path, is_dir, is_file in _icollect_entries(
+            file_paths, ignored_globs):
+        yield match, file_path
+
+
+def _match_changed_files(file_paths, ignored_file_paths, changed_files):
+    """
+    Finds the changed files matching the globs. The changed files are real
+    paths, so the directories the globs start with are resolved to real paths
+    too. That way globs reaching the files through a symlink, e.g. a
+    symlinked checkout, match them as well.
+
+    :param file_paths:         file path or list of such that can include
+                               globs
+    :param ignored_file_paths: list of globs that match to-be-ignored files
+    :param changed_files:      collection of real, normcased paths of the
+                               changed files
+    :return:                   sorted list of the matching files, as the
+                               globs reach them
+    """
     if isinstance(file_paths, str):
         file_paths = [file_paths]
-
-    for file_path in file_paths:
-        for match in iglob(file_path):
-            if not ignored_globs or not fnmatch(match, ignored_globs):
-                yield match, file_path
+    ignored_match = (GlobMatcher(ignored_file_paths).match
+                     if ignored_file_paths else lambda fname: False)
+
+    collected_files = set()
+    for file_path in file_paths or ():
+        for directory, pattern in iter_literal_directories(file_path):
+            # Relative globs never matched the absolute changed files.
+            if not directory:
+                continue
+
+            real_directory = os.path.normcase(os.path.realpath(directory))
+            real_prefix = os.path.join(real_directory, "")
+            file_match = GlobMatcher(pattern).match
+            for fname in changed_files:
+                if fname != real_directory and not fname.startswith(
+                        real_prefix):
+                    continue
+
+                fname = directory + fname[len(real_directory):]
+                if (file_match(fname) and
+                        not ignored_match(fname) and
+                        os.path.isfile(fname)):
+                    collected_files.add(fname)
+    return sorted(collected_files)
 
 
 def collect_files(file_paths, log_printer, ignored_file_paths=None,
-                  limit_file_paths=None):
+                  limit_file_paths=None, changed_files=None, walk_threads=0):
     """
     Evaluate globs in file paths and return all matching files
 
     :param file_paths:         file path or list of such that can include globs
     :param ignored_file_paths: list of globs that match to-be-ignored files
     :param limit_file_paths:   list of globs that the files are limited to
+    :param changed_files:      collection of real, normcased paths the
+                               files are restricted to, e.g. files changed
+                               in version control. If given, the file system
+                               is not searched, the given paths are only
+                               matched against the globs.
+    :param walk_threads:       number of threads to search the subdirectories
+                               of recursive globs (``**``) with, 0 to search
+                               them sequentially. Helps on network
+                               filesystems.
     :return:                   list of paths of all matching files
     """
-    limit_fnmatch = (functools.partial(fnmatch, patterns=limit_file_paths)
+    limit_fnmatch = (GlobMatcher(limit_file_paths).match
                      if limit_file_paths else lambda fname: True)
 
-    valid_files = list(filter(lambda fname: os.path.isfile(fname[0]),
-                              icollect(file_paths, ignored_file_paths)))
+    if changed_files is not None:
+        collected_files = _match_changed_files(file_paths,
+                                               ignored_file_paths,
+                                               changed_files)
+        return list(filter(limit_fnmatch, collected_files))
+
+    executor = ThreadPoolExecutor(walk_threads) if walk_threads > 0 else None
+    try:
+        valid_files = [
+            (match, file_path)
+            for match, file_path, is_dir, is_file in _icollect_entries(
+                file_paths, ignored_file_paths, executor)
+            if (is_file if is_file is not None else os.path.isfile(match))]
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     # Find globs that gave no files and warn the user
     if valid_files:
@@ -90,8 +200,11 @@ def collect_dirs(dir_paths, ignored_dir_paths=None):
     :param ignored_dir_paths: list of globs that match to-be-ignored dirs
     :return:                  list of paths of all matching directories
     """
-    valid_dirs = list(filter(lambda fname: os.path.isdir(fname[0]),
-                             icollect(dir_paths, ignored_dir_paths)))
+    valid_dirs = [
+        (match, dir_path)
+        for match, dir_path, is_dir, is_file in _icollect_entries(
+            dir_paths, ignored_dir_paths)
+        if (is_dir if is_dir is not None else os.path.isdir(match))]
     if valid_dirs:
         collected_dirs, _ = zip(*valid_dirs)
         return list(collected_dirs)
@@ -99,11 +212,73 @@ def collect_dirs(dir_paths, ignored_dir_paths=None):
         return []
 
 
+def _icollect_bear_files(bear_dirs, bear_globs):
+    """
+    Evaluate bear globs in bear directories.
+
+    :param bear_dirs:  directory name or list of such that can contain bears
+    :param bear_globs: globs of bears to collect
+    :return:           iterator that yields tuples of path of a matching bear
+                       file and the bear glob it was found with
+    """
+    for bear_dir, dir_glob in filter(lambda x: os.path.isdir(x[0]),
+                                     icollect(bear_dirs)):
+        # Since we get a real directory here and since we
+        # pass this later to iglob, we need to escape this.
+        bear_dir = glob_escape(bear_dir)
+        for bear_glob in bear_globs:
+            for matching_file in iglob(
+                    os.path.join(bear_dir, bear_glob + '.py')):
+                yield matching_file, bear_glob
+
+
+def _import_and_index_bears(file_path, bear_index, log_printer):
+    """
+    Imports the bears of a bear file and adds them to the bear index.
+
+    :param file_path:   The path of the bear file.
+    :param bear_index:  The ``BearIndex`` to add the bears to.
+    :param log_printer: log_printer to handle logging
+    :return:            A list of tuples of the bear classes and their kinds
+                        or None if the file can't be imported.
+    """
+    try:
+        bears = [(bear, _get_kind(bear))
+                 for bear in _import_bears(file_path)]
+    except pkg_resources.VersionConflict as exception:
+        log_printer.log_exception(
+            ("Unable to collect bears from {file} because there "
+             "is a conflict with the version of a dependency "
+             "you have installed. This may be resolved by "
+             "creating a separate virtual environment for coala "
+             "or running `pip install {pkg}`. Be aware that the "
+             "latter solution might break other python packages "
+             "that depend on the currently installed "
+             "version.").format(file=file_path, pkg=exception.req),
+            exception, log_level=LOG_LEVEL.WARNING)
+        return None
+    except BaseException as exception:
+        log_printer.log_exception(
+            "Unable to collect bears from {file}. Probably the "
+            "file is malformed or the module code raises an "
+            "exception.".format(file=file_path),
+            exception,
+            log_level=LOG_LEVEL.WARNING)
+        return None
+
+    bear_index.update(file_path, bears)
+    return bears
+
+
 @yield_once
 def icollect_bears(bear_dirs, bear_globs, kinds, log_printer):
     """
     Collect all bears from bear directories that have a matching kind.
 
+    Bear files are looked up in the bear index first (see
+    ``Constants.BEAR_INDEX_FILE``), files that are known to contain no bears
+    of the given kinds aren't imported.
+
     :param bear_dirs:   directory name or list of such that can contain bears
     :param bear_globs:  globs of bears to collect
     :param kinds:       list of bear kinds to be collected
@@ -111,37 +286,21 @@ def icollect_bears(bear_dirs, bear_globs, kinds, log_printer):
     :return:            iterator that yields a tuple with bear class and
                         which bear_glob was used to find that bear class.
     """
-    for bear_dir, dir_glob in filter(lambda x: os.path.isdir(x[0]),
-                                     icollect(bear_dirs)):
-        # Since we get a real directory here and since we
-        # pass this later to iglob, we need to escape this.
-        bear_dir = glob_escape(bear_dir)
-        for bear_glob in bear_globs:
-            for matching_file in iglob(
-                    os.path.join(bear_dir, bear_glob + '.py')):
+    bear_index = BearIndex(Constants.BEAR_INDEX_FILE)
+    for matching_file, bear_glob in _icollect_bear_files(bear_dirs,
+                                                         bear_globs):
+        entries = bear_index.get(matching_file)
+        if entries is not None and not any(entry["kind"] in kinds
+                                           for entry in entries):
+            continue
 
-                try:
-                    for bear in _import_bears(matching_file, kinds):
-                        yield bear, bear_glob
-                except pkg_resources.VersionConflict as exception:
-                    log_printer.log_exception(
-                        ("Unable to collect bears from {file} because there "
-                         "is a conflict with the version of a dependency "
-                         "you have installed. This may be resolved by "
-                         "creating a separate virtual environment for coala "
-                         "or running `pip install {pkg}`. Be aware that the "
-                         "latter solution might break other python packages "
-                         "that depend on the currently installed "
-                         "version.").format(file=matching_file,
-                                            pkg=exception.req),
-                        exception, log_level=LOG_LEVEL.WARNING)
-                except BaseException as exception:
-                    log_printer.log_exception(
-                        "Unable to collect bears from {file}. Probably the "
-                        "file is malformed or the module code raises an "
-                        "exception.".format(file=matching_file),
-                        exception,
-                        log_level=LOG_LEVEL.WARNING)
+        for bear, kind in _import_and_index_bears(matching_file,
+                                                  bear_index,
+                                                  log_printer) or ():
+            if kind in kinds:
+                yield bear, bear_glob
+
+    bear_index.save()
 
 
 def collect_bears(bear_dirs, bear_globs, kinds, log_printer,
@@ -199,15 +358,29 @@ def filter_section_bears_by_languages(bears, languages):
 
 
 def get_all_bears_names():
+    """
+    Retrieves the names of all local and global bears in the default bear
+    directories. Only the bear files that changed since they were added to
+    the bear index are imported.
+
+    :return: A list of bear names.
+    """
     from coalib.settings.Section import Section
     printer = LogPrinter(NullPrinter())
-    local_bears, global_bears = collect_bears(
-        Section("").bear_dirs(),
-        ["**"],
-        [BEAR_KIND.LOCAL, BEAR_KIND.GLOBAL],
-        printer,
-        warn_if_unused_glob=False)
-    return [bear.name for bear in itertools.chain(local_bears, global_bears)]
+    bear_index = BearIndex(Constants.BEAR_INDEX_FILE)
+    names = []
+    for matching_file, bear_glob in _icollect_bear_files(
+            Section("").bear_dirs(), ["**"]):
+        entries = bear_index.get(matching_file)
+        if entries is None:
+            entries = [get_bear_entry(bear, kind)
+                       for bear, kind in _import_and_index_bears(
+                           matching_file, bear_index, printer) or ()]
+        names.extend(entry["name"] for entry in entries
+                     if entry["kind"] in (BEAR_KIND.LOCAL, BEAR_KIND.GLOBAL))
+
+    bear_index.save()
+    return list(OrderedDict.fromkeys(names))
 
 
 def collect_all_bears_from_sections(sections, log_printer):
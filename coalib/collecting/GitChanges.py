@@ -0,0 +1,57 @@
+import os
+import subprocess
+
+
+def _git_file_list(arguments, directory):
+    output = subprocess.check_output(["git"] + arguments,
+                                     cwd=directory,
+                                     stderr=subprocess.DEVNULL,
+                                     universal_newlines=True)
+    return [name for name in output.split("\0") if name]
+
+
+def get_changed_files(log_printer, ref="HEAD", directory=None):
+    """
+    Retrieves all files that were changed in the git repository the given
+    directory belongs to. These are the files that differ between the given
+    ref and the working tree (staged or not) as well as untracked files that
+    are not ignored by git. Changes anywhere in the repository are
+    considered, also outside of the given directory.
+
+    :param log_printer: The log printer to warn to.
+    :param ref:         The git ref to compare the working tree against.
+    :param directory:   A directory in the repository to look for changes
+                        in. Defaults to the current working directory.
+    :return:            A set of real, normcased paths of all changed files
+                        or None if the changes could not be determined.
+    """
+    if ref.startswith("-"):
+        log_printer.warn("'{}' is not a valid git ref. Falling back to "
+                         "analyzing all files.".format(ref))
+        return None
+
+    directory = os.path.abspath(directory or os.getcwd())
+    try:
+        toplevel = subprocess.check_output(
+            ["git", "rev-parse", "--show-toplevel"],
+            cwd=directory,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True).rstrip("\n")
+        # Both list paths relative to the top level directory when run
+        # there.
+        changed = _git_file_list(["diff", "-z", "--name-only", ref, "--"],
+                                 toplevel)
+        untracked = _git_file_list(["ls-files",
+                                    "-z",
+                                    "--others",
+                                    "--exclude-standard"],
+                                   toplevel)
+    except (OSError, subprocess.CalledProcessError):
+        log_printer.warn("Unable to retrieve the files changed relative to "
+                         "'{}' from git. Falling back to analyzing all "
+                         "files.".format(ref))
+        return None
+
+    toplevel = os.path.realpath(toplevel)
+    return {os.path.normcase(os.path.join(toplevel, name))
+            for name in changed + untracked}
@@ -0,0 +1,146 @@
+import asyncio
+import locale
+import os
+import platform
+import shlex
+import threading
+from asyncio.subprocess import PIPE
+
+from coalib.misc.ContextManagers import subprocess_timeout
+from coalib.misc.Shell import run_shell_commands_sequentially
+
+
+def _decode(data):
+    """
+    Decodes process output like ``subprocess.Popen`` does in
+    ``universal_newlines`` mode.
+
+    >>> _decode(b"a\\r\\nb\\rc\\n")
+    'a\\nb\\nc\\n'
+    """
+    return (data.decode(locale.getpreferredencoding(False))
+            .replace("\r\n", "\n")
+            .replace("\r", "\n"))
+
+
+@asyncio.coroutine
+def run_shell_command_async(command, stdin=None, timeout=0, semaphore=None):
+    """
+    Coroutine that runs a single command and returns the read stdout and
+    stderr data. Other coroutines run while the process does.
+
+    See also ``coalib.misc.Shell.run_shell_command()``.
+
+    :param command:       The command to run. This parameter can either be a
+                          sequence of arguments that are directly passed to
+                          the process or a string. A string gets splitted
+                          beforehand using ``shlex.split()``.
+    :param stdin:         Initial input to send to the process.
+    :param timeout:       The number of seconds the process may run. If set
+                          to 0 or a negative value, it waits indefinitely.
+    :param semaphore:     An ``asyncio.Semaphore`` that is held while the
+                          process runs to limit how many processes run at
+                          once or ``None``.
+    :raises TimeoutError: Raised when the process got interrupted because it
+                          didn't exit in time.
+    :return:              A tuple with ``(stdoutstring, stderrstring)``.
+    """
+    if isinstance(command, str):
+        command = shlex.split(command)
+
+    if semaphore is not None:
+        yield from semaphore.acquire()
+
+    try:
+        process = yield from asyncio.create_subprocess_exec(*command,
+                                                            stdin=PIPE,
+                                                            stdout=PIPE,
+                                                            stderr=PIPE)
+        with subprocess_timeout(process, timeout) as timedout:
+            stdout, stderr = yield from process.communicate(
+                None
+                if stdin is None else
+                stdin.encode(locale.getpreferredencoding(False)))
+    finally:
+        if semaphore is not None:
+            semaphore.release()
+
+    if timedout.value:
+        raise TimeoutError("{!r} didn't exit within {} seconds.".format(
+            " ".join(command), timeout))
+
+    return _decode(stdout), _decode(stderr)
+
+
+def run_shell_commands(commands, stdin=None, timeout=0, max_concurrency=0):
+    """
+    Runs the given commands concurrently and returns the read stdout and
+    stderr data of each one. One thread starts as many processes as allowed
+    and waits for all of them in an ``asyncio`` event loop.
+
+    >>> run_shell_commands([["echo", "a"], "echo b"])
+    [('a\\n', ''), ('b\\n', '')]
+
+    Failing commands don't affect the others, the exception is returned
+    instead of their output:
+
+    >>> output = run_shell_commands([["echo", "a"],
+    ...                              ["this-executable-does-not-exist"]])
+    >>> output[0]
+    ('a\\n', '')
+    >>> type(output[1]).__name__
+    'FileNotFoundError'
+
+    Child processes can only be watched from the main thread, the commands
+    run one after another when called from other threads.
+
+    :param commands:        A sequence of commands like passed to
+                            ``run_shell_command_async()``.
+    :param stdin:           Initial input to send to each process.
+    :param timeout:         The number of seconds each process may run. If
+                            set to 0 or a negative value, it waits
+                            indefinitely.
+    :param max_concurrency: The maximum number of processes of the same
+                            executable to run at once. Defaults to the number
+                            of CPUs if 0.
+    :return:                A list containing a tuple with
+                            ``(stdoutstring, stderrstring)`` for each
+                            command, or the exception (e.g. a
+                            ``TimeoutError``) raised when running it.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return run_shell_commands_sequentially(commands, stdin, timeout)
+
+    max_concurrency = max_concurrency or os.cpu_count() or 1
+    semaphores = {}
+
+    @asyncio.coroutine
+    def run_all():
+        futures = []
+        for command in commands:
+            executable = (shlex.split(command)
+                          if isinstance(command, str) else
+                          command)[0]
+            if executable not in semaphores:
+                semaphores[executable] = asyncio.Semaphore(max_concurrency)
+
+            futures.append(run_shell_command_async(command,
+                                                   stdin,
+                                                   timeout,
+                                                   semaphores[executable]))
+
+        return (yield from asyncio.gather(*futures, return_exceptions=True))
+
+    if platform.system() == "Windows":  # pragma: no cover
+        # Only the proactor event loop supports subprocesses on Windows.
+        loop = asyncio.ProactorEventLoop()
+    else:
+        loop = asyncio.new_event_loop()
+
+    # Setting the event loop attaches the child watcher to it as well.
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(run_all())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -74,6 +74,9 @@ default_coafile = ".coafile"
 
 TAGS_DIR = appdirs.user_data_dir('coala', version=VERSION)
 
+BEAR_INDEX_FILE = os.path.join(appdirs.user_cache_dir('coala', version=VERSION),
+                               'bear_index.json')
+
 GLOBBING_SPECIAL_CHARS = "()[]|?*"
 
 URL_REGEX = re.compile(
@@ -1,5 +1,10 @@
 import inspect
-from functools import total_ordering
+import keyword
+import os
+from functools import lru_cache, total_ordering
+from operator import attrgetter
+
+from coalib.misc import Constants
 
 
 def yield_once(iterator):
@@ -10,13 +15,19 @@ def yield_once(iterator):
     :return:         An iterator that yields every result only once at most.
     """
     def yield_once_generator(*args, **kwargs):
-        yielded = []
+        yielded = set()
+        # Unhashable items are looked up linearly.
+        yielded_unhashable = []
         for item in iterator(*args, **kwargs):
-            if item in yielded:
-                pass
-            else:
-                yielded.append(item)
-                yield item
+            try:
+                if item in yielded:
+                    continue
+                yielded.add(item)
+            except TypeError:
+                if item in yielded_unhashable:
+                    continue
+                yielded_unhashable.append(item)
+            yield item
 
     return yield_once_generator
 
@@ -176,6 +187,46 @@ def generate_repr(*members):
     return decorator
 
 
+def _create_function(name, parameters, body, namespace):
+    """
+    Creates a function from source code, so generated functions can be as
+    fast as handwritten ones.
+
+    >>> add = _create_function("add", ["a", "b=_b"], ["return a + b"],
+    ...                        {"_b": 1})
+    >>> add(1), add(1, 2)
+    (2, 3)
+
+    :param name:       The name of the function.
+    :param parameters: A list of the parameters of the function as source.
+    :param body:       A list of the lines of the function body without
+                       indentation.
+    :param namespace:  A dict of the global names the function uses.
+    :return:           The function.
+    """
+    source = "def {}({}):\n{}".format(name,
+                                      ", ".join(parameters),
+                                      "\n".join("    " + line
+                                                for line in body))
+    namespace = dict(namespace)
+    exec(source, namespace)
+    return namespace[name]
+
+
+def _get_member_source(obj, member):
+    """
+    Retrieves the source code accessing the given member of an object.
+
+    >>> _get_member_source("self", "line")
+    'self.line'
+    >>> _get_member_source("self", "not an identifier")
+    "getattr(self, 'not an identifier')"
+    """
+    if member.isidentifier() and not keyword.iskeyword(member):
+        return obj + "." + member
+    return "getattr({}, {!r})".format(obj, member)
+
+
 def generate_eq(*members):
     """
     Decorator that generates equality and inequality operators for the
@@ -187,12 +238,16 @@ def generate_eq(*members):
     :param members: A list of members to compare for equality.
     """
     def decorator(cls):
-        def eq(self, other):
-            if type(other) is not type(self):
-                return False
-
-            return all(getattr(self, member) == getattr(other, member)
-                       for member in members)
+        comparisons = ["{} == {}".format(_get_member_source("self", member),
+                                         _get_member_source("other", member))
+                       for member in members]
+        eq = _create_function(
+            "__eq__",
+            ["self", "other"],
+            ["if type(other) is not type(self):",
+             "    return False",
+             "return bool({})".format(" and ".join(comparisons) or "True")],
+            {})
 
         def ne(self, other):
             return not eq(self, other)
@@ -221,28 +276,111 @@ def generate_ordering(*members):
                     considered smaller than any other value except None.
     """
     def decorator(cls):
-        def lt(self, other):
-            if not isinstance(other, cls):
-                raise TypeError("Comparison with unrelated classes is "
-                                "unsupported.")
+        body = ["if not isinstance(other, _cls):",
+                "    raise TypeError('Comparison with unrelated classes is '",
+                "                    'unsupported.')"]
+        for member in members:
+            body += ["a = " + _get_member_source("self", member),
+                     "b = " + _get_member_source("other", member),
+                     "if not a == b:",
+                     "    if a is None or b is None:",
+                     "        return a is None",
+                     "    return a < b"]
+        body.append("return False")
+
+        cls.__lt__ = _create_function("__lt__",
+                                      ["self", "other"],
+                                      body,
+                                      {"_cls": cls})
+        return total_ordering(generate_eq(*members)(cls))
 
-            for member in members:
-                if getattr(self, member) == getattr(other, member):
-                    continue
+    return decorator
 
-                if (
-                        getattr(self, member) is None or
-                        getattr(other, member) is None):
-                    return getattr(self, member) is None
 
-                return getattr(self, member) < getattr(other, member)
+@lru_cache(maxsize=None)
+def _get_slots(cls):
+    """
+    Retrieves the names of the slots of a class and its bases and a function
+    getting their values from an object as a tuple.
+    """
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend((slots,) if isinstance(slots, str) else slots)
+    names = tuple(name for name in names
+                  if name not in ("__dict__", "__weakref__"))
 
-            return False
+    if len(names) == 1:
+        getter = attrgetter(names[0])
+        return names, lambda obj: (getter(obj),)
+    return names, attrgetter(*names) if names else lambda obj: ()
 
-        cls.__lt__ = lt
-        return total_ordering(generate_eq(*members)(cls))
 
-    return decorator
+def generate_slots_state(cls):
+    """
+    Decorator that generates ``__getstate__`` and ``__setstate__`` for a class
+    using ``__slots__``. Objects are pickled as a tuple of their slot values,
+    which is more compact and faster than the default state of objects with
+    ``__slots__``. The dictionary of attributes objects without ``__slots__``
+    are pickled with is still accepted, so objects pickled before the class
+    got ``__slots__`` can be unpickled.
+
+    >>> import copy
+    >>> @generate_slots_state
+    ... class Point:
+    ...     __slots__ = ("x", "y")
+    ...     def __init__(self, x, y):
+    ...         self.x, self.y = x, y
+    >>> point = copy.deepcopy(Point(1, 2))
+    >>> point.x, point.y
+    (1, 2)
+    >>> point.__getstate__()
+    (1, 2)
+    >>> point.__setstate__({"x": 3, "y": 4})
+    >>> point.x, point.y
+    (3, 4)
+
+    Note that this decorator modifies the given class in place!
+    """
+    def getstate(self):
+        names, getter = _get_slots(type(self))
+        try:
+            state = getter(self)
+        except AttributeError:
+            # Not all slots are set, fall back to a dictionary of the set
+            # ones.
+            state = {name: getattr(self, name)
+                     for name in names if hasattr(self, name)}
+            state.update(getattr(self, "__dict__", {}))
+            return state
+
+        if type(self).__dictoffset__:
+            # Instances of subclasses without __slots__ have a __dict__.
+            state += (self.__dict__,)
+        return state
+
+    def setstate(self, state):
+        if isinstance(state, dict):
+            items = state.items()
+        else:
+            names = _get_slots(type(self))[0]
+            if len(state) > len(names):
+                self.__dict__.update(state[-1])
+            items = zip(names, state)
+
+        for name, value in items:
+            setattr(self, name, value)
+
+    cls.__getstate__ = getstate
+    cls.__setstate__ = setstate
+    return cls
+
+
+# Set the environment variable COALA_NO_TYPE_CHECKS to a true value like "1"
+# or "yes" to skip the type checks of enforce_signature(), e.g. in
+# production.
+ENFORCE_SIGNATURE = (os.environ.get("COALA_NO_TYPE_CHECKS", "").lower()
+                     not in Constants.TRUE_STRINGS)
 
 
 def assert_right_type(value, types, argname):
@@ -257,6 +395,32 @@ def assert_right_type(value, types, argname):
                     "{!r})".format(argname, types, value))
 
 
+def _get_fast_types(types):
+    """
+    Retrieves a tuple of types that certainly pass ``assert_right_type()``
+    for the given types if an object is an instance of them.
+
+    >>> _get_fast_types((int, None, "value"))
+    (<class 'int'>, <class 'NoneType'>)
+    """
+    if isinstance(types, type) or types is None:
+        types = (types,)
+    try:
+        return tuple(type(None) if typ is None else typ
+                     for typ in types
+                     if typ is None or isinstance(typ, type))
+    except TypeError:
+        return ()
+
+
+def _matches_annotation(value, types):
+    try:
+        assert_right_type(value, types, "")
+        return True
+    except TypeError:
+        return False
+
+
 def enforce_signature(function):
     """
     Enforces the signature of the function by throwing TypeError's if invalid
@@ -275,29 +439,100 @@ def enforce_signature(function):
 
     Any string value for any parameter e.g. would then trigger a TypeError.
 
+    The checking function is generated once with the same parameters as the
+    given function, so calling it costs little more than the checks. If the
+    environment variable ``COALA_NO_TYPE_CHECKS`` is set to a true value like
+    ``1`` or ``yes`` when the function is decorated, it is returned
+    unchanged.
+
     :param function: The function to check.
     """
-    argspec = inspect.getfullargspec(function)
-    annotations = argspec.annotations
-    argnames = argspec.args
-
-    unnamed_annotations = {}
-    for i, arg in enumerate(argnames):
-        if arg in annotations:
-            unnamed_annotations[i] = (annotations[arg], arg)
-
-    def decorated(*args, **kwargs):
-        for i, annotation in unnamed_annotations.items():
-            if i < len(args):
-                assert_right_type(args[i], annotation[0], annotation[1])
-
-        for argname, argval in kwargs.items():
-            if argname in annotations:
-                assert_right_type(argval, annotations[argname], argname)
-
-        return function(*args, **kwargs)
-
-    return decorated
+    if not ENFORCE_SIGNATURE:
+        return function
+
+    signature_parameters = inspect.signature(function).parameters
+
+    # The names the generated function uses besides the parameters get a
+    # prefix no parameter starts with, so they can't be shadowed.
+    prefix = "_coala_"
+    while any(name.startswith(prefix) for name in signature_parameters):
+        prefix = "_" + prefix
+    function_name = prefix + "function"
+    assert_name = prefix + "assert_right_type"
+    isinstance_name = prefix + "isinstance"
+    missing_name = prefix + "missing"
+
+    parameters = []
+    arguments = []
+    checks = []
+    namespace = {function_name: function,
+                 assert_name: assert_right_type,
+                 isinstance_name: isinstance,
+                 missing_name: object()}
+    keyword_only = False
+    for index, parameter in enumerate(signature_parameters.values()):
+        name = parameter.name
+        if parameter.kind == parameter.VAR_POSITIONAL:
+            keyword_only = True
+            parameters.append("*" + name)
+            arguments.append("*" + name)
+            continue
+        if parameter.kind == parameter.VAR_KEYWORD:
+            parameters.append("**" + name)
+            arguments.append("**" + name)
+            continue
+
+        if parameter.kind == parameter.KEYWORD_ONLY:
+            if not keyword_only:
+                keyword_only = True
+                parameters.append("*")
+            arguments.append("{0}={0}".format(name))
+        else:
+            arguments.append(name)
+
+        default_name = "{}default_{}".format(prefix, index)
+        if parameter.default is not parameter.empty:
+            namespace[default_name] = parameter.default
+
+        if parameter.annotation is parameter.empty:
+            parameters.append(name if parameter.default is parameter.empty
+                              else name + "=" + default_name)
+            continue
+
+        types_name = "{}types_{}".format(prefix, index)
+        fast_types_name = "{}fast_types_{}".format(prefix, index)
+        namespace[types_name] = parameter.annotation
+        namespace[fast_types_name] = _get_fast_types(parameter.annotation)
+        check = "{}({}, {}, {!r})".format(assert_name,
+                                          name,
+                                          types_name,
+                                          name)
+        if namespace[fast_types_name]:
+            check_lines = ["if not {}({}, {}):".format(
+                               isinstance_name, name, fast_types_name),
+                           "    " + check]
+        else:
+            check_lines = [check]
+
+        if parameter.default is parameter.empty:
+            parameters.append(name)
+        elif _matches_annotation(parameter.default, parameter.annotation):
+            parameters.append(name + "=" + default_name)
+        else:
+            # Defaults are only checked when passed explicitly.
+            parameters.append(name + "=" + missing_name)
+            check_lines = (["if {} is {}:".format(name, missing_name),
+                            "    {} = {}".format(name, default_name),
+                            "else:"] +
+                           ["    " + line for line in check_lines])
+        checks += check_lines
+
+    return _create_function(
+        "decorated",
+        parameters,
+        checks + ["return {}({})".format(function_name,
+                                         ", ".join(arguments))],
+        namespace)
 
 
 class classproperty(property):
@@ -0,0 +1,147 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import accumulate
+
+
+class FileContents(Sequence):
+    """
+    The contents of a file as an immutable sequence of lines that behaves like
+    a tuple of lines. The contents are stored as one string together with the
+    offsets of the lines in it, which takes a fraction of the memory of a
+    string object per line.
+
+    >>> file = FileContents(("a\\n", "bc\\n", "d"))
+    >>> len(file), file[1], file[-1]
+    (3, 'bc\\n', 'd')
+    >>> file[1:]
+    ('bc\\n', 'd')
+    >>> file == ("a\\n", "bc\\n", "d")
+    True
+    >>> file.text
+    'a\\nbc\\nd'
+    """
+
+    __slots__ = ("text", "_offsets")
+
+    def __init__(self, lines=()):
+        """
+        :param lines: An iterable of lines, each but the last one ending with
+                      a newline.
+        """
+        lines = list(lines)
+        self.text = "".join(lines)
+        self._offsets = array("Q", [0])
+        self._offsets.extend(accumulate(len(line) for line in lines))
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Splits the given text into lines at ``\\n`` like ``readlines()``.
+
+        >>> FileContents.from_text("a\\n\\nb")
+        FileContents(('a\\n', '\\n', 'b'))
+        >>> FileContents.from_text("a\\n")
+        FileContents(('a\\n',))
+
+        :param text: The text to split.
+        :return:     The ``FileContents`` of the text.
+        """
+        file = cls.__new__(cls)
+        file.text = text
+        file._offsets = array("Q", [0])
+        line_lengths = [len(line) + 1 for line in text.split("\n")]
+        line_lengths[-1] -= 1
+        if line_lengths[-1] == 0:
+            del line_lengths[-1]
+        file._offsets.extend(accumulate(line_lengths))
+        return file
+
+    @classmethod
+    def from_line_offsets(cls, text, offsets):
+        """
+        Creates the contents from a text and the offsets of its lines, e.g.
+        stored along with it, without splitting it again.
+
+        >>> FileContents.from_line_offsets("a\\nb", array("Q", [0, 2, 3]))
+        FileContents(('a\\n', 'b'))
+
+        :param text:    The text.
+        :param offsets: An ``array("Q")`` of the index of the first character
+                        of each line in the text followed by the length of
+                        the text.
+        :return:        The ``FileContents`` of the text.
+        """
+        file = cls.__new__(cls)
+        file.text = text
+        file._offsets = offsets
+        return file
+
+    def get_line_col(self, position):
+        """
+        Calculates the line and column of the character at the given index
+        of the text by a binary search of the line offsets.
+
+        >>> FileContents(("a\\n", "b\\n")).get_line_col(2)
+        (2, 1)
+
+        :param position:    The index of the character in ``text``.
+        :return:            A tuple of the line and column, both starting
+                            from 1.
+        :raises ValueError: If the position is outside of the text.
+        """
+        if not 0 <= position < len(self.text):
+            raise ValueError("Position not found in text")
+
+        line_index = bisect_right(self._offsets, position) - 1
+        return line_index + 1, position - self._offsets[line_index] + 1
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FileContents index out of range")
+
+        return self.text[self._offsets[index]:self._offsets[index + 1]]
+
+    def __iter__(self):
+        text = self.text
+        start = 0
+        for end in self._offsets[1:]:
+            yield text[start:end]
+            start = end
+
+    def __eq__(self, other):
+        if isinstance(other, FileContents):
+            return self.text == other.text and self._offsets == other._offsets
+        if isinstance(other, tuple):
+            return tuple(self) == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __add__(self, other):
+        if not isinstance(other, (tuple, FileContents)):
+            return NotImplemented
+        return tuple(self) + tuple(other)
+
+    def __radd__(self, other):
+        if not isinstance(other, tuple):
+            return NotImplemented
+        return other + tuple(self)
+
+    def __getstate__(self):
+        return self.text, self._offsets
+
+    def __setstate__(self, state):
+        self.text, self._offsets = state
+
+    def __repr__(self):
+        return "FileContents({!r})".format(tuple(self))
@@ -2,6 +2,8 @@ from contextlib import contextmanager
 import shlex
 from subprocess import PIPE, Popen
 
+from coalib.misc.ContextManagers import subprocess_timeout
+
 
 @contextmanager
 def run_interactive_shell_command(command, **kwargs):
@@ -97,6 +99,51 @@ def run_shell_command(command, stdin=None, **kwargs):
     return ret
 
 
+def run_shell_commands_sequentially(commands, stdin=None, timeout=0):
+    """
+    Runs the given commands one after another and returns the read stdout and
+    stderr data of each one.
+
+    Failing commands don't affect the others, the exception is returned
+    instead of their output:
+
+    >>> output = run_shell_commands_sequentially(
+    ...     [["echo", "a"], ["this-executable-does-not-exist"]])
+    >>> output[0]
+    ('a\\n', '')
+    >>> type(output[1]).__name__
+    'FileNotFoundError'
+
+    :param commands: A sequence of commands like passed to
+                     ``run_shell_command()``.
+    :param stdin:    Initial input to send to each process.
+    :param timeout:  The number of seconds each process may run. If set to 0
+                     or a negative value, it waits indefinitely.
+    :return:         A list containing a tuple with
+                     ``(stdoutstring, stderrstring)`` for each command, or
+                     the exception (e.g. a ``TimeoutError``) raised when
+                     running it.
+    """
+    outputs = []
+    for command in commands:
+        try:
+            with run_interactive_shell_command(command) as process:
+                with subprocess_timeout(process, timeout) as timedout:
+                    output = process.communicate(stdin)
+        except OSError as exception:
+            output = exception
+        else:
+            if timedout.value:
+                output = TimeoutError(
+                    "{!r} didn't exit within {} seconds.".format(
+                        command if isinstance(command, str)
+                        else " ".join(command),
+                        timeout))
+        outputs.append(output)
+
+    return outputs
+
+
 def get_shell_type():  # pragma: no cover
     """
     Finds the current shell type based on the outputs of common pre-defined
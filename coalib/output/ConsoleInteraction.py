@@ -7,6 +7,7 @@ import os.path
 
 from pyprint.ConsolePrinter import ConsolePrinter
 
+from coalib.misc.Decorators import get_public_members
 from coalib.misc.DictUtilities import inverse_dicts
 from coalib.bearlib.spacing.SpacingHelper import SpacingHelper
 from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
@@ -278,7 +279,7 @@ def print_results_formatted(log_printer,
                                         column=None,
                                         end_column=None,
                                         severity_str=severity_str,
-                                        **result.__dict__))
+                                        **get_public_members(result)))
                 continue
 
             for range in result.affected_code:
@@ -288,7 +289,7 @@ def print_results_formatted(log_printer,
                                         column=range.start.column,
                                         end_column=range.end.column,
                                         severity_str=severity_str,
-                                        **result.__dict__))
+                                        **get_public_members(result)))
         except KeyError as exception:
             log_printer.log_exception(
                 "Unable to print the result with the given format string.",
@@ -0,0 +1,246 @@
+from collections import Counter, OrderedDict
+import hashlib
+import os
+import pickle
+import sqlite3
+
+# Increase it when the schema changes incompatibly.
+SCHEMA_VERSION = 1
+
+# SQLite limits the number of parameters of a statement to 999 by default.
+MAX_QUERY_PARAMETERS = 999
+
+_SCHEMA = """
+CREATE TABLE sections (
+    name TEXT PRIMARY KEY);
+CREATE TABLE results (
+    id INTEGER PRIMARY KEY,
+    section TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    severity INTEGER NOT NULL,
+    file TEXT,
+    line INTEGER,
+    fingerprint TEXT NOT NULL,
+    result BLOB NOT NULL);
+CREATE INDEX results_file ON results (file);
+CREATE INDEX results_origin ON results (origin);
+CREATE INDEX results_severity ON results (severity);
+CREATE INDEX results_fingerprint ON results (fingerprint);
+"""
+
+
+def _get_relative_path(path, directory):
+    try:
+        return os.path.relpath(path, directory)
+    except ValueError:
+        # The path is on another drive than the directory.
+        return path
+
+
+def get_fingerprint(result, project_dir=None):
+    """
+    Calculates a fingerprint identifying a result across runs. It consists of
+    the origin, message, severity and debug message of the result and the
+    files it affects but not the lines, so it doesn't change when code
+    before the result is edited. The files are taken relative to the project
+    directory, so the fingerprint doesn't change when the project is moved.
+
+    >>> from coalib.results.Result import Result
+    >>> (get_fingerprint(Result.from_values("Bear", "msg", "f", 1)) ==
+    ...  get_fingerprint(Result.from_values("Bear", "msg", "f", 5)))
+    True
+    >>> (get_fingerprint(Result.from_values("Bear", "msg", "f", 1)) ==
+    ...  get_fingerprint(Result.from_values("Bear", "msg", "g", 1)))
+    False
+    >>> result = Result.from_values("Bear", "msg", "/project/f", 1)
+    >>> moved_result = Result.from_values("Bear", "msg", "/moved/f", 1)
+    >>> (get_fingerprint(result, "/project") ==
+    ...  get_fingerprint(moved_result, "/moved"))
+    True
+
+    :param result:      The result.
+    :param project_dir: The directory the files are taken relative to. By
+                        default the files are taken as they are.
+    :return:            A hexadecimal digest string.
+    """
+    files = {source_range.file for source_range in result.affected_code}
+    if project_dir is not None:
+        files = {_get_relative_path(file, project_dir) for file in files}
+
+    digest = hashlib.sha1()
+    for value in ([result.origin,
+                   result.message,
+                   str(result.severity),
+                   str(result.debug_msg)] +
+                  sorted(files)):
+        digest.update(value.encode("utf-8", "surrogateescape") + b"\0")
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """
+    An SQLite database holding the results of a coala run per section. The
+    results are stored row-wise, so they can be appended as sections finish
+    and subsets of them can be queried without loading the others.
+
+    >>> from coalib.results.Result import Result
+    >>> with ResultStore(":memory:") as store:
+    ...     store.add_results("python", [Result("PyBear", "message")])
+    ...     store.add_results("empty", [])
+    ...     results = store.get_results()
+    >>> sorted(results)
+    ['empty', 'python']
+    >>> results["python"][0].message
+    'message'
+    """
+
+    def __init__(self, path, project_dir=None):
+        """
+        Opens the store, creating it if it doesn't exist.
+
+        :param path:                   The path of the database file or
+                                       ``":memory:"`` for a temporary store.
+        :param project_dir:            The directory the files of results
+                                       are taken relative to for their
+                                       fingerprints, see
+                                       ``get_fingerprint()``.
+        :raises ValueError:            If the store has an incompatible
+                                       schema version.
+        :raises sqlite3.DatabaseError: If the file is no SQLite database.
+        """
+        self.path = path
+        self.project_dir = project_dir
+        self._connection = sqlite3.connect(path)
+        try:
+            version = self._connection.execute(
+                "PRAGMA user_version").fetchone()[0]
+            if version == 0:
+                self._connection.executescript(_SCHEMA)
+                self._connection.execute(
+                    "PRAGMA user_version = {}".format(SCHEMA_VERSION))
+            elif version != SCHEMA_VERSION:
+                raise ValueError("The result store '{}' has version {}, only "
+                                 "version {} is supported.".format(
+                                     path, version, SCHEMA_VERSION))
+        except BaseException:
+            self._connection.close()
+            raise
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_results(self, section_name, results):
+        """
+        Appends results of a section to the store.
+
+        :param section_name: The name of the section the results belong to.
+        :param results:      An iterable of results.
+        """
+        rows = []
+        for result in results:
+            first_range = (result.affected_code[0] if result.affected_code
+                           else None)
+            rows.append((section_name,
+                         result.origin,
+                         result.severity,
+                         first_range and first_range.file,
+                         first_range and first_range.start.line,
+                         get_fingerprint(result, self.project_dir),
+                         pickle.dumps(result)))
+
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO sections VALUES (?)", (section_name,))
+            self._connection.executemany(
+                "INSERT INTO results (section, origin, severity, file, line, "
+                "fingerprint, result) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows)
+
+    def get_results(self,
+                    section_name=None,
+                    file=None,
+                    origin=None,
+                    min_severity=None):
+        """
+        Retrieves the results matching all given conditions.
+
+        :param section_name: The name of the section to retrieve the results
+                             of.
+        :param file:         The file of the first code the results affect.
+        :param origin:       The name of the bear that yielded the results.
+        :param min_severity: The minimum severity of the results.
+        :return:             A dict with section names as keys and lists of
+                             the matching results in the order they were
+                             added as values. All sections are contained, even
+                             if they have no matching results.
+        """
+        conditions = []
+        parameters = []
+        for condition, value in (("section = ?", section_name),
+                                 ("file = ?", file),
+                                 ("origin = ?", origin),
+                                 ("severity >= ?", min_severity)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+
+        results = self._get_sections(section_name)
+        for section, data in self._connection.execute(
+                "SELECT section, result FROM results" +
+                "".join((" WHERE " if index == 0 else " AND ") + condition
+                        for index, condition in enumerate(conditions)) +
+                " ORDER BY id",
+                parameters):
+            results[section].append(pickle.loads(data))
+        return results
+
+    def get_new_results(self, base):
+        """
+        Retrieves the results of this store that aren't in the base store,
+        e.g. the issues a change introduced compared to a baseline run.
+        Results are matched by section and fingerprint (see
+        ``get_fingerprint()``). If a section has more results with the same
+        fingerprint than the base store, the results added last count as new.
+
+        Only the results found to be new are loaded.
+
+        :param base: The ``ResultStore`` to compare with.
+        :return:     A dict like the one ``get_results()`` returns.
+        """
+        base_counts = {
+            (section, fingerprint): count
+            for section, fingerprint, count in base._connection.execute(
+                "SELECT section, fingerprint, COUNT(*) FROM results "
+                "GROUP BY section, fingerprint")}
+
+        counts = Counter()
+        new_ids = []
+        for row_id, section, fingerprint in self._connection.execute(
+                "SELECT id, section, fingerprint FROM results ORDER BY id"):
+            counts[section, fingerprint] += 1
+            if counts[section, fingerprint] > base_counts.get(
+                    (section, fingerprint), 0):
+                new_ids.append(row_id)
+
+        results = self._get_sections()
+        for start in range(0, len(new_ids), MAX_QUERY_PARAMETERS):
+            ids = new_ids[start:start + MAX_QUERY_PARAMETERS]
+            for section, data in self._connection.execute(
+                    "SELECT section, result FROM results WHERE id IN ({}) "
+                    "ORDER BY id".format(", ".join("?" * len(ids))),
+                    ids):
+                results[section].append(pickle.loads(data))
+        return results
+
+    def _get_sections(self, section_name=None):
+        return OrderedDict(
+            (name, [])
+            for name, in self._connection.execute(
+                "SELECT name FROM sections ORDER BY rowid")
+            if section_name is None or name == section_name)
@@ -1,8 +1,12 @@
+import errno
 import hashlib
 import os
 import pickle
+import sqlite3
+import tempfile
 
 from coalib.misc import Constants
+from coalib.output.ResultStore import ResultStore
 
 
 def get_tags_dir(log_printer):
@@ -33,6 +37,61 @@ def get_tag_path(tag, project, log_printer):
     return None
 
 
+def _get_project_dir(project):
+    return os.path.dirname(os.path.abspath(project))
+
+
+def create_tag(tag, project, log_printer):
+    """
+    Creates an empty result store for the tag. Results can be added to it as
+    sections finish, they only replace the results tagged before once the
+    store is passed to ``save_tag()``. Pass it to ``discard_tag()`` instead
+    if the run fails.
+
+    :param tag:         Tag provided by user.
+    :param project:     Path to the coafile the results belong to.
+    :param log_printer: The logger which logs errors.
+    :return:            A ``ResultStore`` in a temporary file or None if
+                        results aren't to be tagged.
+    """
+    if tag == "None":
+        return None
+    tag_path = get_tag_path(tag, project, log_printer)
+    if tag_path is None:
+        return None
+
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(tag_path))
+    os.close(file_descriptor)
+    return ResultStore(temp_path, _get_project_dir(project))
+
+
+def save_tag(result_store, tag, project, log_printer):
+    """
+    Closes a result store created by ``create_tag()`` and atomically replaces
+    the results tagged before with it.
+
+    :param result_store: The ``ResultStore`` returned by ``create_tag()``.
+    :param tag:          Tag provided by user.
+    :param project:      Path to the coafile the results belong to.
+    :param log_printer:  The logger which logs errors.
+    """
+    result_store.close()
+    os.replace(result_store.path, get_tag_path(tag, project, log_printer))
+
+
+def discard_tag(result_store):
+    """
+    Closes a result store created by ``create_tag()`` and deletes it, keeping
+    the results tagged before.
+
+    :param result_store: The ``ResultStore`` returned by ``create_tag()``.
+    """
+    result_store.close()
+    if os.path.exists(result_store.path):
+        os.remove(result_store.path)
+
+
 def tag_results(tag, project, results, log_printer):
     """
     This method takes a tag provided from the user and saves the results
@@ -44,30 +103,106 @@ def tag_results(tag, project, results, log_printer):
     :param log_printer: The logger which logs errors.
     :param results:     Results dictionary generated by coala.
     """
-    if tag == "None":
+    result_store = create_tag(tag, project, log_printer)
+    if result_store is None:
         return
-    tag_path = get_tag_path(tag, project, log_printer)
-    if tag_path is not None:
-        with open(tag_path, 'wb+') as file:
-            pickle.dump(results, file)
+
+    try:
+        for section_name, section_results in results.items():
+            result_store.add_results(section_name, section_results)
+        save_tag(result_store, tag, project, log_printer)
+    finally:
+        discard_tag(result_store)
 
 
-def load_tagged_results(tag, project, log_printer):
+def open_tag(tag, project, log_printer):
     """
-    Retrieves results previously stored with tag_results.
+    Opens the result store of results previously stored with
+    ``tag_results()``. Results tagged by older coala versions are pickled,
+    they are loaded into a temporary store.
 
-    :param tag:         The tag name.
-    :param project:     Path to the coafile the results belong to.
-    :param log_printer: The logger which logs errors.
-    :return:            A results dictionary, as generated by coala.
+    :param tag:                The tag name.
+    :param project:            Path to the coafile the results belong to.
+    :param log_printer:        The logger which logs errors.
+    :return:                   A ``ResultStore`` or None if results aren't
+                               tagged.
+    :raises FileNotFoundError: If no results are tagged with the tag.
     """
     if tag == "None":
         return None
     tag_path = get_tag_path(tag, project, log_printer)
-    if tag_path is not None:
+    if tag_path is None:
+        return None
+
+    if not os.path.exists(tag_path):
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT),
+                                tag_path)
+    try:
+        return ResultStore(tag_path, _get_project_dir(project))
+    except sqlite3.DatabaseError:
         with open(tag_path, 'rb') as file:
-            return pickle.load(file)
-    return None
+            results = pickle.load(file)
+        result_store = ResultStore(":memory:", _get_project_dir(project))
+        for section_name, section_results in results.items():
+            result_store.add_results(section_name, section_results)
+        return result_store
+
+
+def load_tagged_results(tag,
+                        project,
+                        log_printer,
+                        section_name=None,
+                        file=None,
+                        origin=None,
+                        min_severity=None):
+    """
+    Retrieves results previously stored with tag_results. Only the results
+    matching all given conditions are loaded.
+
+    :param tag:          The tag name.
+    :param project:      Path to the coafile the results belong to.
+    :param log_printer:  The logger which logs errors.
+    :param section_name: The name of the section to retrieve the results of.
+    :param file:         The file of the first code the results affect.
+    :param origin:       The name of the bear that yielded the results.
+    :param min_severity: The minimum severity of the results.
+    :return:             A results dictionary, as generated by coala.
+    """
+    result_store = open_tag(tag, project, log_printer)
+    if result_store is None:
+        return None
+
+    with result_store:
+        return dict(result_store.get_results(section_name,
+                                             file,
+                                             origin,
+                                             min_severity))
+
+
+def diff_tagged_results(base_tag, tag, project, log_printer):
+    """
+    Retrieves the results tagged with a tag that aren't tagged with the base
+    tag, e.g. to only show new issues compared to a baseline. See
+    ``ResultStore.get_new_results()`` for how results are matched.
+
+    :param base_tag:    The tag name of the baseline results.
+    :param tag:         The tag name of the results to compare.
+    :param project:     Path to the coafile the results belong to.
+    :param log_printer: The logger which logs errors.
+    :return:            A results dictionary, as generated by coala, or None
+                        if results aren't tagged.
+    """
+    base_store = open_tag(base_tag, project, log_printer)
+    if base_store is None:
+        return None
+
+    with base_store:
+        result_store = open_tag(tag, project, log_printer)
+        if result_store is None:
+            return None
+
+        with result_store:
+            return dict(result_store.get_new_results(base_store))
 
 
 def delete_tagged_results(tag, project, log_printer):
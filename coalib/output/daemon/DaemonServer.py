@@ -0,0 +1,309 @@
+import multiprocessing
+import os
+import queue
+import socket
+import socketserver
+import stat
+
+from coalib.collecting import Dependencies
+from coalib.collecting.Collectors import collect_files
+from coalib.misc.Exceptions import get_exitcode
+from coalib.output.daemon.Protocol import receive_messages, send_message
+from coalib.output.Interactions import fail_acquire_settings
+from coalib.output.JSONEncoder import create_json_encoder
+from coalib.output.printers.ListLogPrinter import ListLogPrinter
+from coalib.processes.BearRunning import (
+    get_global_dependency_results, run_global_bear, run_local_bears_on_file)
+from coalib.processes.communication.ResultTransport import ResultTransport
+from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+from coalib.processes.IgnoreRangeIndex import IgnoreRangeIndex
+from coalib.processes.Processing import (
+    get_cpu_count, get_file_dict, get_max_file_size_from_section,
+    instantiate_bears, print_result)
+from coalib.settings.ConfigurationGathering import gather_configuration
+from coalib.settings.Setting import glob_list
+
+# State of a bear running process of the pool. The local bears are
+# instantiated once per section and process and reused for all requests.
+_worker = {}
+
+
+def _drain(message_queue):
+    messages = []
+    try:
+        while True:
+            messages.append(message_queue.get(timeout=0))
+    except queue.Empty:
+        return messages
+
+
+def _init_worker(sections, local_bears):
+    _worker["sections"] = sections
+    _worker["local_bears"] = local_bears
+    _worker["instances"] = {}
+    _worker["message_queue"] = queue.Queue()
+
+
+def _analyze_file(task):
+    """
+    Runs all local bears of a section on one file inside a pool process.
+
+    :param task: A tuple of the section name, the filename and the file
+                 contents.
+    :return:     A tuple of the filename, the results and all log messages
+                 the bears emitted.
+    """
+    section_name, filename, file = task
+    message_queue = _worker["message_queue"]
+    if section_name not in _worker["instances"]:
+        _worker["instances"][section_name], _ = instantiate_bears(
+            _worker["sections"][section_name],
+            _worker["local_bears"][section_name],
+            [],
+            {},
+            message_queue)
+
+    control_queue = queue.Queue()
+    run_local_bears_on_file(message_queue,
+                            0,
+                            {filename: file},
+                            _worker["instances"][section_name],
+                            ResultTransport(control_queue,
+                                            CONTROL_ELEMENT.LOCAL,
+                                            batch_size=1),
+                            filename)
+    results = []
+    if not control_queue.empty():
+        _, [(_, results)] = control_queue.get()
+
+    return filename, results, _drain(message_queue)
+
+
+class DaemonServer:
+    """
+    Keeps the configuration, the bear classes and a pool of bear running
+    processes alive to analyze files on request.
+
+    Results are filtered like in a usual coala run (ignore comments,
+    ``min_severity``) but patches are never applied automatically.
+    """
+
+    def __init__(self, arg_list=None, log_printer=None):
+        """
+        Loads the configuration and starts the bear running processes.
+
+        :param arg_list:    The CLI argument list to load the configuration
+                            from, None for ``sys.argv``.
+        :param log_printer: The log printer to log startup problems to.
+        """
+        log_printer = log_printer or ListLogPrinter()
+        (sections,
+         local_bears,
+         global_bears,
+         targets) = gather_configuration(fail_acquire_settings,
+                                         log_printer,
+                                         autoapply=False,
+                                         arg_list=arg_list)
+
+        self.sections = {name: section
+                         for name, section in sections.items()
+                         if section.is_enabled(targets)}
+        self.local_bears = {name: Dependencies.resolve(local_bears[name])
+                            for name in self.sections}
+        self.global_bears = {name: Dependencies.resolve(global_bears[name])
+                             for name in self.sections}
+        self.log_level = log_printer.log_level
+
+        try:
+            job_count = int(sections["default"]["jobs"])
+        except (IndexError, ValueError):
+            job_count = get_cpu_count()
+
+        self.pool = multiprocessing.Pool(job_count,
+                                         initializer=_init_worker,
+                                         initargs=(self.sections,
+                                                   self.local_bears))
+        self._running = False
+
+    def close(self):
+        """
+        Stops the bear running processes.
+        """
+        self.pool.terminate()
+        self.pool.join()
+
+    def analyze(self, filenames):
+        """
+        Analyzes the given files with all sections they belong to.
+
+        :param filenames: The paths of the files to analyze.
+        :return:          A generator yielding the protocol messages for the
+                          client. The last message contains the exitcode.
+        """
+        changed_files = {os.path.normcase(os.path.abspath(filename))
+                         for filename in filenames}
+        yielded = False
+
+        for section_name, section in self.sections.items():
+            log_printer = ListLogPrinter(log_level=self.log_level)
+            file_dict = get_file_dict(
+                collect_files(
+                    glob_list(section.get('files', "")),
+                    log_printer,
+                    ignored_file_paths=glob_list(section.get('ignore', "")),
+                    limit_file_paths=glob_list(section.get('limit_files',
+                                                           "")),
+                    changed_files=changed_files),
+                log_printer,
+                max_file_size=get_max_file_size_from_section(section,
+                                                             log_printer))
+            if file_dict:
+                for message in self._analyze_section(section_name,
+                                                     section,
+                                                     file_dict,
+                                                     log_printer):
+                    yielded = True
+                    yield message
+
+            for log in log_printer.logs:
+                yield {"log": log.to_string_dict()}
+
+        yield {"exitcode": 1 if yielded else 0}
+
+    def _analyze_section(self, section_name, section, file_dict, log_printer):
+        ignore_ranges = IgnoreRangeIndex(file_dict=file_dict)
+        file_diff_dict = {}
+
+        tasks = [(section_name, filename, file)
+                 for filename, file in file_dict.items()]
+        for filename, results, messages in self.pool.imap_unordered(
+                _analyze_file, tasks):
+            for message in messages:
+                log_printer.log_message(message)
+            _, results = print_result(results,
+                                      file_dict,
+                                      False,
+                                      lambda *args: None,
+                                      section,
+                                      log_printer,
+                                      file_diff_dict,
+                                      ignore_ranges)
+            if results:
+                yield {"section": section_name,
+                       "file": filename,
+                       "results": results}
+
+        # Global bears need all files, they are run right here.
+        message_queue = queue.Queue()
+        _, global_bears = instantiate_bears(section,
+                                            [],
+                                            self.global_bears[section_name],
+                                            file_dict,
+                                            message_queue)
+        global_result_dict = {}
+        for bear in global_bears:
+            dependency_results = get_global_dependency_results(
+                global_result_dict, bear)
+            if dependency_results is False:
+                continue
+
+            bearname = bear.__class__.__name__
+            global_result_dict[bearname] = run_global_bear(message_queue,
+                                                           0,
+                                                           bear,
+                                                           dependency_results)
+            for message in _drain(message_queue):
+                log_printer.log_message(message)
+            if global_result_dict[bearname]:
+                _, results = print_result(
+                    global_result_dict[bearname],
+                    file_dict,
+                    False,
+                    lambda *args: None,
+                    section,
+                    log_printer,
+                    file_diff_dict,
+                    ignore_ranges)
+                if results:
+                    yield {"section": section_name,
+                           "bear": bearname,
+                           "results": results}
+
+    def handle_request(self, rfile, wfile):
+        """
+        Answers a single client request.
+
+        :param rfile: The binary stream to read the request from.
+        :param wfile: The binary stream to write the answer to.
+        """
+        request = next(receive_messages(rfile), {})
+        if request.get("command") == "shutdown":
+            self._running = False
+            send_message(wfile, {"exitcode": 0})
+            return
+
+        encoder = create_json_encoder()
+        for message in self.analyze(request.get("files", [])):
+            send_message(wfile, message, encoder)
+
+    def serve(self, socket_path):
+        """
+        Answers requests on the given UNIX socket until a client requests a
+        shutdown. Requests are answered one after another.
+
+        :param socket_path: The path of the socket to listen on.
+        """
+        daemon = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                daemon.handle_request(self.rfile, self.wfile)
+
+        if (os.path.exists(socket_path) and
+                stat.S_ISSOCK(os.stat(socket_path).st_mode)):
+            with socket.socket(socket.AF_UNIX) as client:
+                try:
+                    client.connect(socket_path)
+                except ConnectionRefusedError:
+                    # Left behind by a daemon that didn't shut down cleanly.
+                    os.remove(socket_path)
+                else:
+                    raise OSError("A coala daemon is already listening on "
+                                  "'{}'.".format(socket_path))
+
+        server = socketserver.UnixStreamServer(socket_path, RequestHandler)
+        self._running = True
+        try:
+            while self._running:
+                server.handle_request()
+        finally:
+            server.server_close()
+            os.remove(socket_path)
+
+
+def run_daemon(socket_path, log_printer):
+    """
+    Runs the coala daemon with the configuration given on the command line
+    until it's shut down by a client or interrupted.
+
+    :param socket_path: The path of the UNIX socket to listen on.
+    :param log_printer: The log printer to log to.
+    :return:            The exitcode.
+    """
+    try:
+        daemon = DaemonServer(log_printer=log_printer)
+    except BaseException as exception:  # pylint: disable=broad-except
+        return get_exitcode(exception, log_printer)
+
+    log_printer.info("Listening on '{}'.".format(socket_path))
+    try:
+        daemon.serve(socket_path)
+    except KeyboardInterrupt:
+        pass
+    except BaseException as exception:  # pylint: disable=broad-except
+        return get_exitcode(exception, log_printer)
+    finally:
+        daemon.close()
+
+    return 0
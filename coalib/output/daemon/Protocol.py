@@ -0,0 +1,63 @@
+"""
+The wire format between the daemon and its clients. Each message is a JSON
+object on its own line.
+
+A client sends exactly one request per connection:
+
+-  ``{"files": [...]}`` to analyze the given files. Relative paths are
+   resolved against the working directory of the daemon.
+-  ``{"command": "shutdown"}`` to stop the daemon.
+
+The daemon answers with any number of messages and closes the connection:
+
+-  ``{"section": ..., "file": ..., "results": [...]}`` for local bear results.
+-  ``{"section": ..., "bear": ..., "results": [...]}`` for global bear
+   results.
+-  ``{"log": {...}}`` for log messages.
+-  ``{"exitcode": ...}`` as the last message.
+
+This module intentionally depends on the standard library only so clients
+start up fast.
+"""
+
+import json
+
+# The default socket the daemon listens on, relative to the project
+# directory.
+DEFAULT_SOCKET = ".coala.sock"
+
+
+def send_message(stream, message, encoder=None):
+    """
+    Writes a message to the given binary stream.
+
+    >>> from io import BytesIO
+    >>> stream = BytesIO()
+    >>> send_message(stream, {"files": ["a.py"]})
+    >>> stream.getvalue()
+    b'{"files": ["a.py"]}\\n'
+
+    :param stream:  The binary stream to write to.
+    :param message: The message, a JSON serializable dictionary.
+    :param encoder: The ``json.JSONEncoder`` class to serialize the message
+                    with.
+    """
+    stream.write((json.dumps(message, cls=encoder) + "\n").encode("utf-8"))
+    stream.flush()
+
+
+def receive_messages(stream):
+    """
+    Reads all messages from the given binary stream.
+
+    >>> from io import BytesIO
+    >>> list(receive_messages(BytesIO(b'{"exitcode": 0}\\n\\n')))
+    [{'exitcode': 0}]
+
+    :param stream: The binary stream to read from.
+    :return:       A generator yielding the messages as dictionaries.
+    """
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line.decode("utf-8"))
@@ -0,0 +1,11 @@
+"""
+This package holds the coala daemon. The daemon is a long running server that
+keeps the configuration, the imported bears and a pool of bear running
+processes alive, so analyzing a few files doesn't pay for the startup of coala
+each time.
+
+Clients connect to the daemon through a local UNIX socket and send a request
+for the files to analyze. The daemon answers with a stream of messages
+containing the results per file and bear. All messages are JSON objects, one
+per line.
+"""
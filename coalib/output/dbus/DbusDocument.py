@@ -5,7 +5,7 @@ import dbus.service  # Ignore PyImportSortBear
 from coalib.misc.Exceptions import get_exitcode
 from coalib.output.Interactions import fail_acquire_settings
 from coalib.output.printers.ListLogPrinter import ListLogPrinter
-from coalib.parsing.Globbing import fnmatch
+from coalib.parsing.Globbing import GlobMatcher
 from coalib.processes.Processing import execute_section
 from coalib.results.HiddenResult import HiddenResult
 from coalib.settings.ConfigurationGathering import (
@@ -123,8 +123,8 @@ class DbusDocument(dbus.service.Object):
                 if not section.is_enabled(targets):
                     continue
 
-                if any([fnmatch(self.path, file_pattern)
-                        for file_pattern in glob_list(section["files"])]):
+                file_globs = glob_list(section["files"])
+                if file_globs and GlobMatcher(file_globs).match(self.path):
 
                     section["files"].value = self.path
                     section_result = execute_section(
@@ -4,13 +4,13 @@ import sys
 from coalib.misc import Constants
 from coalib.collecting.Collectors import get_all_bears_names
 
-try:
-    from argcomplete.completers import ChoicesCompleter
-except ImportError:
-    class ChoicesCompleter:
 
-        def __init__(self, *args, **kwargs):
-            pass
+def _complete_bear_names(**kwargs):
+    """
+    Completes the names of bears. The names are only collected when
+    completing, so parsing arguments doesn't need to import any bear.
+    """
+    return get_all_bears_names()
 
 
 def default_arg_parser(formatter_class=None):
@@ -86,7 +86,7 @@ def default_arg_parser(formatter_class=None):
                             nargs='+',
                             metavar='NAME',
                             help='Names of bears to use').completer =\
-        ChoicesCompleter(get_all_bears_names())
+        _complete_bear_names
     BEAR_DIRS_HELP = 'Additional directories where bears may lie'
     arg_parser.add_argument('-d',
                             '--bear-dirs',
@@ -129,6 +129,14 @@ def default_arg_parser(formatter_class=None):
                                 metavar='BOOL',
                                 help='Write the logs as json to a file '
                                 'where filename is specified as argument.')
+        arg_parser.add_argument('--format',
+                                choices=('json', 'ndjson'),
+                                help='Write all results as one json '
+                                     'document at the end (json) or one '
+                                     'compact json record per line as soon '
+                                     'as they are found, followed by a '
+                                     'summary record (ndjson). Defaults '
+                                     'to json.')
     if parser_type == 'coala':
         SHOW_BEARS_HELP = ("Display bears and its metadata with the sections "
                            "that they belong to")
@@ -150,6 +158,18 @@ def default_arg_parser(formatter_class=None):
                                 metavar='LANG',
                                 help="Display all bears for the given "
                                 "languages.")
+        arg_parser.add_argument('--daemon',
+                                nargs='?',
+                                const=True,
+                                metavar='BOOL',
+                                help="Run as a daemon that keeps the bears "
+                                     "loaded and analyzes files on request "
+                                     "of coala-client.")
+        arg_parser.add_argument('--daemon-socket',
+                                nargs=1,
+                                metavar='PATH',
+                                help="The UNIX socket the daemon listens "
+                                     "on, '.coala.sock' by default.")
     SAVE_HELP = ('Filename of file to be saved to, if provided with no '
                  'arguments, settings will be stored back to the file given '
                  'by -c')
@@ -181,6 +201,43 @@ def default_arg_parser(formatter_class=None):
                             type=int,
                             help="Number of jobs to use in parallel.")
 
+    arg_parser.add_argument('--cache-dir',
+                            nargs=1,
+                            metavar='DIR',
+                            help="Directory to cache bear results in. Files "
+                                 "that did not change since the last run "
+                                 "will not be analyzed again.")
+    arg_parser.add_argument('--no-cache',
+                            nargs='?',
+                            const=True,
+                            metavar='BOOL',
+                            help="Don't use cached bear results.")
+    arg_parser.add_argument('--changed-only',
+                            nargs='?',
+                            const=True,
+                            metavar='REF',
+                            help="Only analyze files changed in git relative "
+                                 "to REF (HEAD if not given), including "
+                                 "untracked files. Global bears only see the "
+                                 "changed files as well.")
+    arg_parser.add_argument('--mmap-file-dict',
+                            nargs='?',
+                            const=True,
+                            metavar='BOOL',
+                            help="Share the file contents between jobs "
+                                 "through a memory-mapped snapshot instead of "
+                                 "copying them into each job.")
+    arg_parser.add_argument('--profile',
+                            nargs='?',
+                            const=True,
+                            metavar='FILE',
+                            dest='profile_output',
+                            help="Record the time spent in each bear run and "
+                                 "write it as a Chrome trace to FILE "
+                                 "(coala_profile_{section}.json if not "
+                                 "given) along with a summary of the "
+                                 "slowest runs.")
+
     arg_parser.add_argument('-v',
                             '--version',
                             action='version',
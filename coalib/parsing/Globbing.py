@@ -1,3 +1,4 @@
+from functools import lru_cache
 import os
 import platform
 import re
@@ -5,6 +6,12 @@ import re
 from coalib.misc.Decorators import yield_once
 from coalib.misc.Constants import GLOBBING_SPECIAL_CHARS
 
+try:
+    from os import scandir
+except ImportError:  # pragma: no cover
+    # Python < 3.5, the directory entries are stat'ed instead.
+    scandir = None
+
 
 def _end_of_set_index(string, start_index):
     """
@@ -154,6 +161,18 @@ def translate(pattern):
     """
     Translates a pattern into a regular expression.
 
+    :param pattern: Glob pattern with wildcards
+    :return:        Regular expression with the same meaning
+    """
+    return _translate_unanchored(pattern) + '\\Z(?ms)'
+
+
+@lru_cache(maxsize=1024)
+def _translate_unanchored(pattern):
+    """
+    Translates a pattern into a regular expression that is not anchored at
+    the end and relies on the ``s`` flag being set.
+
     :param pattern: Glob pattern with wildcards
     :return:        Regular expression with the same meaning
     """
@@ -165,6 +184,9 @@ def translate(pattern):
         if char == '*':
             # '**' matches everything
             if index < length and pattern[index] == '*':
+                # Skip the second '*', a following '[^/]*' is redundant and
+                # makes matching backtrack a lot.
+                index += 1
                 regex += '.*'
             # on Windows, '*' matches everything but the filesystem
             # separators '/' and '\'.
@@ -190,13 +212,143 @@ def translate(pattern):
                 regex += '[' + sequence + ']'
         else:
             regex = regex + re.escape(char)
-    return regex + '\\Z(?ms)'
+    return regex
+
+
+@lru_cache(maxsize=1024)
+def _get_alternatives(pattern):
+    """
+    Caches the patterns without alternatives of the given pattern.
+
+    :param pattern: Glob pattern with wildcards
+    :return:        A tuple of all glob patterns without alternatives that can
+                    be created from the given pattern.
+    """
+    return tuple(_iter_alternatives(pattern))
+
+
+def _get_literal_check(pattern):
+    """
+    Checks whether the pattern only matches names ending with a literal
+    string, like ``**.py`` or ``**/*.py``, or containing one, like
+    ``**/build/**``. Those names can be matched without a regular
+    expression.
+
+    >>> _get_literal_check("**.py")
+    ('.py', False, False)
+    >>> _get_literal_check(os.path.join("**", "*.py")) == (".py", True, False)
+    True
+    >>> _get_literal_check("**build**")
+    ('build', False, True)
+    >>> _get_literal_check("src/*.py") is None
+    True
+
+    :param pattern: Glob pattern without alternatives.
+    :return:        None if the pattern is no such pattern, else a tuple of
+                    the literal string, whether the name needs to contain a
+                    path separator in front of it and whether the literal may
+                    be anywhere in the name instead of at its end.
+    """
+    if not pattern.startswith('**'):
+        return None
+
+    literal = pattern[2:]
+    if not has_wildcard(literal):
+        return literal, False, False
+    if literal.startswith(os.sep + '*') and not has_wildcard(literal[2:]):
+        return literal[2:], True, False
+    if (len(literal) > 2 and literal.endswith('**') and
+            not has_wildcard(literal[:-2])):
+        return literal[:-2], False, True
+    return None
+
+
+class GlobMatcher:
+    """
+    Matches names against a list of glob patterns. All patterns are
+    translated once and merged into a single regular expression, so create a
+    matcher once to match many names against the same patterns.
+
+    >>> matcher = GlobMatcher(["*.py", "(a|b)"])
+    >>> matcher.match("test.py"), matcher.match("b"), matcher.match("c")
+    (True, True, False)
+
+    An empty list of patterns matches everything:
+
+    >>> GlobMatcher([]).match("anything")
+    True
+
+    The syntax is the one of ``fnmatch()``.
+    """
+
+    def __init__(self, patterns):
+        """
+        :param patterns: Glob string with wildcards or list of globs
+        """
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        self.patterns = list(patterns)
+
+        suffixes = set()
+        separated_suffixes = set()
+        infixes = set()
+        regexes = []
+        for pattern in self.patterns:
+            for pat in _get_alternatives(pattern):
+                pat = os.path.normcase(os.path.expanduser(pat))
+                literal_check = _get_literal_check(pat)
+                if literal_check is None:
+                    regexes.append(_translate_unanchored(pat))
+                elif literal_check[2]:
+                    infixes.add(literal_check[0])
+                elif literal_check[1]:
+                    separated_suffixes.add(literal_check[0])
+                else:
+                    suffixes.add(literal_check[0])
+
+        self._suffixes = tuple(suffixes)
+        self._separated_suffixes = tuple(separated_suffixes)
+        self._infix_search = (
+            re.compile('|'.join(map(re.escape, sorted(infixes)))).search
+            if infixes else None)
+        self._regex_match = (
+            re.compile('(?ms)(?:' +
+                       '|'.join('(?:' + regex + ')\\Z'
+                                for regex in regexes) +
+                       ')').match
+            if regexes else None)
+
+    def match(self, name):
+        """
+        Tests whether the name is matched by any of the patterns.
+
+        :param name: File or directory name
+        :return:     Boolean: Whether or not name is matched by the patterns
+        """
+        if len(self.patterns) == 0:
+            return True
+
+        name = os.path.normcase(name)
+        if name.endswith(self._suffixes):
+            return True
+        if name.endswith(self._separated_suffixes):
+            for suffix in self._separated_suffixes:
+                if (name.endswith(suffix) and
+                        os.sep in name[:len(name) - len(suffix)]):
+                    return True
+        if self._infix_search is not None and self._infix_search(name):
+            return True
+
+        return (self._regex_match is not None and
+                self._regex_match(name) is not None)
 
 
 def fnmatch(name, patterns):
     """
     Tests whether name matches pattern
 
+    To match many names against the same patterns, use a ``GlobMatcher``.
+
     :param name:     File or directory name
     :param patterns: Glob string with wildcards or list of globs
     :return:         Boolean: Whether or not name is matched by pattern
@@ -213,20 +365,7 @@ def fnmatch(name, patterns):
     -  '*':             Matches everything but os.sep.
     -  '**':            Matches everything.
     """
-    if isinstance(patterns, str):
-        patterns = [patterns]
-    if len(patterns) == 0:
-        return True
-
-    name = os.path.normcase(name)
-    for pattern in patterns:
-        for pat in _iter_alternatives(pattern):
-            pat = os.path.expanduser(pat)
-            pat = os.path.normcase(pat)
-            match = re.compile(translate(pat)).match
-            if match(name) is not None:
-                return True
-    return False
+    return GlobMatcher(patterns).match(name)
 
 
 def _absolute_flat_glob(pattern):
@@ -248,6 +387,67 @@ def _absolute_flat_glob(pattern):
     return
 
 
+def _scan_dir(dirname):
+    """
+    Lists a directory along with the types of its entries. The types are
+    retrieved while listing if ``os.scandir`` is available.
+
+    :param dirname: Directory name
+    :return:        List of tuples of the name of each entry and whether it
+                    is a directory and whether it is a file, following
+                    symlinks. Empty if the directory can't be listed.
+    """
+    dirname = dirname or os.curdir
+    try:
+        if scandir is None:  # pragma: no cover
+            return [(name,
+                     os.path.isdir(os.path.join(dirname, name)),
+                     os.path.isfile(os.path.join(dirname, name)))
+                    for name in os.listdir(dirname)]
+        return [(entry.name, entry.is_dir(), entry.is_file())
+                for entry in scandir(dirname)]
+    except OSError:
+        return []
+
+
+def _iter_relative_entries(dirname, prune=None, executor=None):
+    """
+    Recursively iterates the files and subdirectories of all levels from
+    dirname.
+
+    :param dirname:  Directory name
+    :param prune:    A function taking the path of a subdirectory that returns
+                     True if it is not to be descended into, or None.
+    :param executor: A ``concurrent.futures.Executor`` to walk the
+                     subdirectories of dirname concurrently with, or None.
+    :return:         Iterator that yields tuples of the path of each file and
+                     directory relative to dirname, whether it is a
+                     directory and whether it is a file
+    """
+    dirname = dirname or os.curdir
+    entries = _scan_dir(dirname)
+    subdirs = [name for name, is_dir, is_file in entries
+               if is_dir and not (prune and
+                                  prune(os.path.join(dirname, name)))]
+    if executor is not None:
+        futures = {name: executor.submit(
+                       list,
+                       _iter_relative_entries(os.path.join(dirname, name),
+                                              prune))
+                   for name in subdirs}
+        sub_entries = {name: future.result()
+                       for name, future in futures.items()}
+    else:
+        sub_entries = {name: _iter_relative_entries(
+                           os.path.join(dirname, name), prune)
+                       for name in subdirs}
+
+    for name, is_dir, is_file in entries:
+        yield name, is_dir, is_file
+        for sub_name, sub_is_dir, sub_is_file in sub_entries.get(name, ()):
+            yield os.path.join(name, sub_name), sub_is_dir, sub_is_file
+
+
 def _iter_relative_dirs(dirname):
     """
     Recursively iterates subdirectories of all levels from dirname
@@ -256,17 +456,15 @@ def _iter_relative_dirs(dirname):
     :return:        Iterator that yields files and directory from the given dir
                     and all it's (recursive) subdirectories
     """
-    if not dirname:
-        dirname = os.curdir
-    try:
-        files_or_dirs = os.listdir(dirname)
-    except os.error:
-        return
-    for file_or_dir in files_or_dirs:
-        yield file_or_dir
-        path = os.path.join(dirname, file_or_dir)
-        for sub_file_or_dir in _iter_relative_dirs(path):
-            yield os.path.join(file_or_dir, sub_file_or_dir)
+    for name, is_dir, is_file in _iter_relative_entries(dirname):
+        yield name
+
+
+def _relative_wildcard_entries(dirname, pattern):
+    pattern = os.path.normcase(pattern)
+    match = re.compile(translate(pattern)).match
+    return [entry for entry in _scan_dir(dirname)
+            if match(os.path.normcase(entry[0]))]
 
 
 def relative_wildcard_glob(dirname, pattern):
@@ -277,19 +475,8 @@ def relative_wildcard_glob(dirname, pattern):
     :param pattern: Glob pattern with wildcards
     :return:        List of files in the dir of dirname that match the pattern
     """
-    if not dirname:
-        dirname = os.curdir
-    try:
-        names = os.listdir(dirname)
-    except OSError:
-        return []
-    result = []
-    pattern = os.path.normcase(pattern)
-    match = re.compile(translate(pattern)).match
-    for name in names:
-        if match(os.path.normcase(name)):
-            result.append(name)
-    return result
+    return [name for name, is_dir, is_file
+            in _relative_wildcard_entries(dirname, pattern)]
 
 
 def relative_flat_glob(dirname, basename):
@@ -336,13 +523,44 @@ def has_wildcard(pattern):
     return match is not None
 
 
-def iglob(pattern):
+def iter_literal_directories(pattern):
     """
-    Iterates all filesystem paths that get matched by the glob pattern.
-    Syntax is equal to that of fnmatch.
+    Iterates the alternatives of a glob pattern along with the directory
+    each one starts with that contains no wildcards.
+
+    >>> list(iter_literal_directories(os.path.join("a", "(b|c)", "*.py"))
+    ...      ) == [(os.path.join("a", "b"), os.path.join("a", "b", "*.py")),
+    ...            (os.path.join("a", "c"), os.path.join("a", "c", "*.py"))]
+    True
 
     :param pattern: Glob pattern with wildcards
-    :return:        Iterator that yields all file names that match pattern
+    :return:        Iterator that yields tuples of the directory and the
+                    alternative. The directory is the whole alternative if it
+                    contains no wildcards and empty if it starts with one.
+    """
+    for pat in _iter_alternatives(pattern):
+        pat = os.path.normcase(os.path.expanduser(pat))
+        dirname = pat
+        while has_wildcard(dirname) and os.path.dirname(dirname) != dirname:
+            dirname = os.path.dirname(dirname)
+        yield dirname, pat
+
+
+def iglob_entries(pattern, prune=None, executor=None):
+    """
+    Iterates all filesystem paths that get matched by the glob pattern along
+    with their types, as far as they are known from listing directories.
+    Syntax is equal to that of fnmatch.
+
+    :param pattern:  Glob pattern with wildcards
+    :param prune:    A function taking the path of a directory that returns
+                     True if the directories and files in it are not to be
+                     searched, or None. Only applies to ``**``.
+    :param executor: A ``concurrent.futures.Executor`` to walk directory
+                     trees for ``**`` with concurrently, or None.
+    :return:         Iterator that yields tuples of each file name that
+                     matches the pattern, whether it is a directory and
+                     whether it is a file. The types are None if unknown.
     """
     for pat in _iter_alternatives(pattern):
         pat = os.path.expanduser(pat)
@@ -350,31 +568,51 @@ def iglob(pattern):
         dirname, basename = os.path.split(pat)
         if not has_wildcard(pat):
             for file in _absolute_flat_glob(pat):
-                yield file
+                yield file, None, None
             return
 
         if basename == '**':
-            relative_glob_function = relative_recursive_glob
+            def relative_glob_function(dirname, basename):
+                if dirname:
+                    yield basename[:0], True, False
+                yield from _iter_relative_entries(dirname, prune, executor)
         elif has_wildcard(basename):
-            relative_glob_function = relative_wildcard_glob
+            relative_glob_function = _relative_wildcard_entries
         else:
-            relative_glob_function = relative_flat_glob
+            def relative_glob_function(dirname, basename):
+                return [(name, None, None)
+                        for name in relative_flat_glob(dirname, basename)]
 
         if not dirname:
-            for file in relative_glob_function(dirname, basename):
-                yield file
+            yield from relative_glob_function(dirname, basename)
             return
 
         # Prevent an infinite recursion if a drive or UNC path contains
         # wildcard characters (i.e. r'\\?\C:').
         if dirname != pat and has_wildcard(dirname):
-            dirs = iglob(dirname)
+            # Only directories can contain further matches.
+            dirs = (name for name, is_dir, is_file
+                    in iglob_entries(dirname, prune, executor)
+                    if is_dir or (is_dir is None and os.path.isdir(name)))
         else:
             dirs = [dirname]
 
         for dirname in dirs:
-            for name in relative_glob_function(dirname, basename):
-                yield os.path.join(dirname, name)
+            for name, is_dir, is_file in relative_glob_function(dirname,
+                                                                basename):
+                yield os.path.join(dirname, name), is_dir, is_file
+
+
+def iglob(pattern):
+    """
+    Iterates all filesystem paths that get matched by the glob pattern.
+    Syntax is equal to that of fnmatch.
+
+    :param pattern: Glob pattern with wildcards
+    :return:        Iterator that yields all file names that match pattern
+    """
+    for file, is_dir, is_file in iglob_entries(pattern):
+        yield file
 
 
 def glob(pattern):
@@ -1,3 +1,4 @@
+import os
 import queue
 import traceback
 
@@ -6,7 +7,9 @@ from coalib.bears.GlobalBear import GlobalBear
 from coalib.bears.LocalBear import LocalBear
 from coalib.misc import Constants
 from coalib.processes.communication.LogMessage import LOG_LEVEL, LogMessage
+from coalib.processes.communication.ResultTransport import ResultTransport
 from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+from coalib.processes.Profiler import Profiler, profile, set_active_profiler
 from coalib.results.Result import Result
 
 
@@ -101,7 +104,8 @@ def run_bear(message_queue, timeout, bear_instance, *args, **kwargs):
     name = bear_instance.name
 
     try:
-        result_list = bear_instance.execute(*args, **kwargs)
+        with profile(name, "bear", file=args[0] if args else None):
+            result_list = bear_instance.execute(*args, **kwargs)
     except:
         send_msg(message_queue,
                  timeout,
@@ -206,7 +210,8 @@ def run_local_bear(message_queue,
 def run_global_bear(message_queue,
                     timeout,
                     global_bear_instance,
-                    dependency_results):
+                    dependency_results,
+                    result_cache=None):
     """
     Runs an instance of a global bear. Checks if bear_instance is of type
     GlobalBear and then passes it to the run_bear to execute.
@@ -222,6 +227,9 @@ def run_global_bear(message_queue,
     :param dependency_results:   The results of all the bears on which the
                                  instance of the passed bear to be run depends
                                  on.
+    :param result_cache:         A ``ResultCache`` to look up results of
+                                 previous runs on the same files in or None to
+                                 always run the bear.
     :return:                     Returns a list of results generated by the
                                  passed bear_instance.
     """
@@ -237,20 +245,34 @@ def run_global_bear(message_queue,
 
         return None
 
+    cache_key = None
+    if (result_cache is not None and
+            result_cache.is_cacheable(global_bear_instance)):
+        cache_key = result_cache.get_key(
+            global_bear_instance,
+            result_cache.get_file_dict_hash(global_bear_instance.file_dict))
+        result = result_cache.get(cache_key)
+        if result is not None:
+            return result
+
     kwargs = {"dependency_results": dependency_results}
-    return run_bear(message_queue,
-                    timeout,
-                    global_bear_instance,
-                    **kwargs)
+    result = run_bear(message_queue,
+                      timeout,
+                      global_bear_instance,
+                      **kwargs)
+    if result is not None and cache_key is not None:
+        result_cache.put(cache_key, result)
+
+    return result
 
 
 def run_local_bears_on_file(message_queue,
                             timeout,
                             file_dict,
                             local_bear_list,
-                            local_result_dict,
-                            control_queue,
-                            filename):
+                            result_transport,
+                            filename,
+                            result_cache=None):
     """
     This method runs a list of local bears on one file.
 
@@ -262,15 +284,13 @@ def run_local_bears_on_file(message_queue,
                               the timeout it returns queue Full exception.
     :param file_dict:         Dictionary that contains contents of files.
     :param local_bear_list:   List of local bears to run on file.
-    :param local_result_dict: A Manager.dict that will be used to store local
-                              bear results. A list of all local bear results
-                              will be stored with the filename as key.
-    :param control_queue:     If any result gets written to the result_dict a
-                              tuple containing a CONTROL_ELEMENT (to indicate
-                              what kind of event happened) and either a bear
-                              name(for global results) or a file name to
-                              indicate the result will be put to the queue.
+    :param result_transport:  A ``ResultTransport`` the list of all local bear
+                              results is sent through with the filename as
+                              index.
     :param filename:          The name of file on which to run the bears.
+    :param result_cache:      A ``ResultCache`` to look up results of
+                              previous runs in or None to always run the
+                              bears.
     """
     if filename not in file_dict:
         send_msg(message_queue,
@@ -288,6 +308,18 @@ def run_local_bears_on_file(message_queue,
 
     local_result_list = []
     for bear_instance in local_bear_list:
+        cache_key = None
+        if (result_cache is not None and
+                isinstance(bear_instance, LocalBear) and
+                result_cache.is_cacheable(bear_instance)):
+            cache_key = result_cache.get_key(bear_instance,
+                                             file_dict[filename],
+                                             filename=filename)
+            result = result_cache.get(cache_key)
+            if result is not None:
+                local_result_list.extend(result)
+                continue
+
         result = run_local_bear(message_queue,
                                 timeout,
                                 local_result_list,
@@ -296,9 +328,10 @@ def run_local_bears_on_file(message_queue,
                                 filename)
         if result is not None:
             local_result_list.extend(result)
+            if cache_key is not None:
+                result_cache.put(cache_key, result)
 
-    local_result_dict[filename] = local_result_list
-    control_queue.put((CONTROL_ELEMENT.LOCAL, filename))
+    result_transport.send(filename, local_result_list)
 
 
 def get_global_dependency_results(global_result_dict, bear_instance):
@@ -332,39 +365,6 @@ def get_global_dependency_results(global_result_dict, bear_instance):
     return dependency_results
 
 
-def get_next_global_bear(timeout,
-                         global_bear_queue,
-                         global_bear_list,
-                         global_result_dict):
-    """
-    Retrieves the next global bear.
-
-    :param timeout:            The queue blocks at most timeout seconds for a
-                               free slot to execute the put operation on. After
-                               the timeout it returns queue Full exception.
-    :param global_bear_queue:  queue (read, write) of indexes of global bear
-                               instances in the global_bear_list.
-    :param global_bear_list:   A list containing all global bears to be
-                               executed.
-    :param global_result_dict: A Manager.dict that will be used to store global
-                               results. The list of results of one global bear
-                               will be stored with the bear name as key.
-    :return:                   (bear, bearname, dependency_results)
-    """
-    dependency_results = False
-
-    while dependency_results is False:
-        bear_id = global_bear_queue.get(timeout=timeout)
-        bear = global_bear_list[bear_id]
-
-        dependency_results = (
-            get_global_dependency_results(global_result_dict, bear))
-        if dependency_results is False:
-            global_bear_queue.put(bear_id)
-
-    return bear, dependency_results
-
-
 def task_done(obj):
     """
     Invokes task_done if the given queue provides this operation. Otherwise
@@ -376,114 +376,25 @@ def task_done(obj):
         obj.task_done()
 
 
-def run_local_bears(filename_queue,
-                    message_queue,
-                    timeout,
-                    file_dict,
-                    local_bear_list,
-                    local_result_dict,
-                    control_queue):
-    """
-    Run local bears on all the files given.
-
-    :param filename_queue:    queue (read) of file names to check with
-                              local bears.
-    :param message_queue:     A queue that contains messages of type
-                              errors/warnings/debug statements to be printed
-                              in the Log.
-    :param timeout:           The queue blocks at most timeout seconds for a
-                              free slot to execute the put operation on. After
-                              the timeout it returns queue Full exception.
-    :param file_dict:         Dictionary that contains contents of files.
-    :param local_bear_list:   List of local bears to run.
-    :param local_result_dict: A Manager.dict that will be used to store local
-                              bear results. A list of all local bear results
-                              will be stored with the filename as key.
-    :param control_queue:     If any result gets written to the result_dict a
-                              tuple containing a CONTROL_ELEMENT (to indicate
-                              what kind of event happened) and either a bear
-                              name(for global results) or a file name to
-                              indicate the result will be put to the queue.
-    """
-    try:
-        while True:
-            filename = filename_queue.get(timeout=timeout)
-            run_local_bears_on_file(message_queue,
-                                    timeout,
-                                    file_dict,
-                                    local_bear_list,
-                                    local_result_dict,
-                                    control_queue,
-                                    filename)
-            task_done(filename_queue)
-    except queue.Empty:
-        return
-
-
-def run_global_bears(message_queue,
-                     timeout,
-                     global_bear_queue,
-                     global_bear_list,
-                     global_result_dict,
-                     control_queue):
-    """
-    Run all global bears.
-
-    :param message_queue:      A queue that contains messages of type
-                               errors/warnings/debug statements to be printed
-                               in the Log.
-    :param timeout:            The queue blocks at most timeout seconds for a
-                               free slot to execute the put operation on. After
-                               the timeout it returns queue Full exception.
-    :param global_bear_queue:  queue (read, write) of indexes of global bear
-                               instances in the global_bear_list.
-    :param global_bear_list:   list of global bear instances
-    :param global_result_dict: A Manager.dict that will be used to store global
-                               results. The list of results of one global bear
-                               will be stored with the bear name as key.
-    :param control_queue:      If any result gets written to the result_dict a
-                               tuple containing a CONTROL_ELEMENT (to indicate
-                               what kind of event happened) and either a bear
-                               name(for global results) or a file name to
-                               indicate the result will be put to the queue.
-    """
-    try:
-        while True:
-            bear, dep_results = (
-                get_next_global_bear(timeout,
-                                     global_bear_queue,
-                                     global_bear_list,
-                                     global_result_dict))
-            bearname = bear.__class__.__name__
-            result = run_global_bear(message_queue, timeout, bear, dep_results)
-            if result:
-                global_result_dict[bearname] = result
-                control_queue.put((CONTROL_ELEMENT.GLOBAL, bearname))
-            else:
-                global_result_dict[bearname] = None
-            task_done(global_bear_queue)
-    except queue.Empty:
-        return
-
-
-def run(file_name_queue,
+def run(task_queue,
         local_bear_list,
         global_bear_list,
-        global_bear_queue,
         file_dict,
-        local_result_dict,
-        global_result_dict,
         message_queue,
         control_queue,
-        timeout=0):
+        timeout=0,
+        result_cache=None,
+        profile_directory=None):
     """
     This is the method that is actually runs by processes.
 
+    It runs the tasks from the task queue until it gets a None task. Tasks are
+    put there by the controlling process, see ``BearScheduler``.
+
     If parameters type is 'queue (read)' this means it has to implement the
-    get(timeout=TIMEOUT) method and it shall raise queue.Empty if the queue
-    is empty up until the end of the timeout. If the queue has the
-    (optional!) task_done() attribute, the run method will call it after
-    processing each item.
+    get(block=True) method and it shall raise queue.Empty if the queue is
+    empty and block is False. If the queue has the (optional!) task_done()
+    attribute, the run method will call it after processing each item.
 
     If parameters type is 'queue (write)' it shall implement the
     put(object, timeout=TIMEOUT) method.
@@ -491,56 +402,84 @@ def run(file_name_queue,
     If the queues raise any exception not specified here the user will get
     an 'unknown error' message. So beware of that.
 
-    :param file_name_queue:    queue (read) of file names to check with local
-                               bears. Each invocation of the run method needs
-                               one such queue which it checks with all the
-                               local bears. The queue could be empty.
-                               (Repeat until queue empty.)
-    :param local_bear_list:    List of local bear instances.
-    :param global_bear_list:   List of global bear instances.
-    :param global_bear_queue:  queue (read, write) of indexes of global bear
-                               instances in the global_bear_list.
-    :param file_dict:          dict of all files as {filename:file}, file as in
-                               file.readlines().
-    :param local_result_dict:  A Manager.dict that will be used to store local
-                               results. A list of all local results.
-                               will be stored with the filename as key.
-    :param global_result_dict: A Manager.dict that will be used to store global
-                               results. The list of results of one global bear
-                               will be stored with the bear name as key.
-    :param message_queue:      queue (write) for debug/warning/error
-                               messages (type LogMessage)
-    :param control_queue:      queue (write). If any result gets written to the
-                               result_dict a tuple containing a CONTROL_ELEMENT
-                               (to indicate what kind of event happened) and
-                               either a bear name (for global results) or a
-                               file name to indicate the result will be put to
-                               the queue. If the run method finished all its
-                               local bears it will put
-                               (CONTROL_ELEMENT.LOCAL_FINISHED, None) to the
-                               queue, if it finished all global ones,
-                               (CONTROL_ELEMENT.GLOBAL_FINISHED, None) will
-                               be put there.
-    :param timeout:            The queue blocks at most timeout seconds for a
-                               free slot to execute the put operation on. After
-                               the timeout it returns queue Full exception.
+    :param task_queue:        queue (read) of tasks. A task is either a tuple
+                              of CONTROL_ELEMENT.LOCAL and a file name to run
+                              all local bears on or a tuple of
+                              CONTROL_ELEMENT.GLOBAL and a tuple of the index
+                              of a global bear in the global_bear_list and its
+                              dependency results. A None task ends the run.
+    :param local_bear_list:   List of local bear instances.
+    :param global_bear_list:  List of global bear instances.
+    :param file_dict:         dict of all files as {filename:file}, file as in
+                              file.readlines().
+    :param message_queue:     queue (write) for debug/warning/error
+                              messages (type LogMessage)
+    :param control_queue:     queue (write). Results are sent through this
+                              queue as a tuple containing a CONTROL_ELEMENT
+                              (to indicate what kind of event happened) and
+                              either a list of (file name, results) tuples
+                              (CONTROL_ELEMENT.LOCAL) or a (bear name,
+                              results) tuple (CONTROL_ELEMENT.GLOBAL). A
+                              message is sent for every global bear, even if
+                              it yielded no results.
+    :param timeout:           The queue blocks at most timeout seconds for a
+                              free slot to execute the put operation on. After
+                              the timeout it returns queue Full exception.
+    :param result_cache:      A ``ResultCache`` to look up bear results of
+                              previous runs in or None to always run the
+                              bears.
+    :param profile_directory: The directory to write the spans recorded
+                              while running to, see ``Profiler``, or None to
+                              not profile.
     """
+    # Don't record to a profiler inherited from the controlling process.
+    profiler = (None
+                if profile_directory is None else
+                Profiler("coala bear runner"))
+    set_active_profiler(profiler)
     try:
-        run_local_bears(file_name_queue,
-                        message_queue,
-                        timeout,
-                        file_dict,
-                        local_bear_list,
-                        local_result_dict,
-                        control_queue)
-        control_queue.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
-
-        run_global_bears(message_queue,
-                         timeout,
-                         global_bear_queue,
-                         global_bear_list,
-                         global_result_dict,
-                         control_queue)
-        control_queue.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
+        result_transport = ResultTransport(control_queue,
+                                           CONTROL_ELEMENT.LOCAL)
+        while True:
+            try:
+                task = task_queue.get(block=False)
+            except queue.Empty:
+                # Don't hold results back while waiting for more tasks, the
+                # scheduler may wait for them.
+                result_transport.flush()
+                with profile("wait for task", "queue"):
+                    task = task_queue.get()
+
+            if task is None:
+                break
+
+            control_elem, index = task
+            if control_elem == CONTROL_ELEMENT.LOCAL:
+                run_local_bears_on_file(message_queue,
+                                        timeout,
+                                        file_dict,
+                                        local_bear_list,
+                                        result_transport,
+                                        index,
+                                        result_cache)
+            else:
+                # Global bears take long, local results are not held back
+                # meanwhile.
+                result_transport.flush()
+                bear_index, dependency_results = index
+                bear = global_bear_list[bear_index]
+                result = run_global_bear(message_queue,
+                                         timeout,
+                                         bear,
+                                         dependency_results,
+                                         result_cache)
+                control_queue.put((CONTROL_ELEMENT.GLOBAL,
+                                   (bear.__class__.__name__, result)))
+            task_done(task_queue)
+
+        result_transport.flush()
+        if profiler is not None:
+            profiler.save_events(os.path.join(profile_directory,
+                                              "{}.json".format(os.getpid())))
     except (OSError, KeyboardInterrupt):  # pragma: no cover
         pass
@@ -0,0 +1,170 @@
+import queue
+
+from coalib.processes.BearRunning import get_global_dependency_results
+from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+
+
+class BearScheduler:
+    """
+    Schedules the bear runs of a section to the bear running processes.
+
+    Local bears are run on every file, dependencies between local bears are
+    resolved per file inside the bear running processes. Global bears are
+    scheduled as soon as the results of all global bears they depend on are
+    available, global bears without dependencies are scheduled right away
+    before any local bear runs.
+
+    >>> from queue import Queue
+    >>> from coalib.bears.GlobalBear import GlobalBear
+    >>> from coalib.settings.Section import Section
+    >>> class GlobalA(GlobalBear):
+    ...     pass
+    >>> class GlobalB(GlobalBear):
+    ...     @staticmethod
+    ...     def get_dependencies():
+    ...         return [GlobalA]
+    >>> task_queue = Queue()
+    >>> scheduler = BearScheduler(task_queue,
+    ...                           ["file"],
+    ...                           [GlobalB({}, Section("name"), None),
+    ...                            GlobalA({}, Section("name"), None)])
+    >>> scheduler.start()
+
+    ``GlobalA`` doesn't wait for any other bear:
+
+    >>> task_queue.get() == (CONTROL_ELEMENT.GLOBAL, (1, None))
+    True
+    >>> task_queue.get() == (CONTROL_ELEMENT.LOCAL, "file")
+    True
+
+    ``GlobalB`` is scheduled with the results of ``GlobalA`` once they
+    arrive:
+
+    >>> scheduler.global_done("GlobalA", [])
+    >>> task_queue.get() == (CONTROL_ELEMENT.GLOBAL, (0, {"GlobalA": []}))
+    True
+    >>> scheduler.global_done("GlobalB", None)
+    >>> scheduler.finished
+    False
+    >>> scheduler.local_done(1)
+    >>> scheduler.finished
+    True
+    """
+
+    def __init__(self, task_queue, filenames, global_bear_list):
+        """
+        :param task_queue:       The queue (write) tasks are put to. A task
+                                 is a tuple of CONTROL_ELEMENT.LOCAL and a
+                                 filename or a tuple of CONTROL_ELEMENT.GLOBAL
+                                 and a tuple of the index of the bear in the
+                                 global bear list and its dependency results.
+        :param filenames:        The files to run the local bears on.
+        :param global_bear_list: The list of global bear instances.
+        """
+        self.task_queue = task_queue
+        self.filenames = list(filenames)
+        self.global_bear_list = global_bear_list
+        self.global_results = {}
+        self.unsatisfiable = self._get_unsatisfiable()
+        self._waiting = [index
+                         for index, bear in enumerate(global_bear_list)
+                         if type(bear).__name__ not in self.unsatisfiable]
+        self._local_tasks = len(self.filenames)
+        self._global_tasks = len(self._waiting)
+
+    def _get_unsatisfiable(self):
+        """
+        Retrieves all global bears that can never run because a bear they
+        (transitively) depend on is not available, e.g. because it could not
+        be instantiated.
+
+        :return: A set of bear names.
+        """
+        available = {type(bear).__name__ for bear in self.global_bear_list}
+        unsatisfiable = set()
+        changed = True
+        while changed:
+            changed = False
+            for bear in self.global_bear_list:
+                bearname = type(bear).__name__
+                try:
+                    dependencies = {dependency.__name__
+                                    for dependency in bear.get_dependencies()}
+                except AttributeError:
+                    # An invalid bear, it will be warned about when run.
+                    continue
+
+                if (bearname not in unsatisfiable and
+                        not dependencies <= available - unsatisfiable):
+                    unsatisfiable.add(bearname)
+                    changed = True
+
+        return unsatisfiable
+
+    def _schedule_global_bears(self):
+        for index in list(self._waiting):
+            dependency_results = get_global_dependency_results(
+                self.global_results,
+                self.global_bear_list[index])
+            if dependency_results is not False:
+                self._waiting.remove(index)
+                self.task_queue.put((CONTROL_ELEMENT.GLOBAL,
+                                     (index, dependency_results)))
+
+    def start(self):
+        """
+        Schedules all global bears without dependencies and all local bear
+        runs.
+        """
+        self._schedule_global_bears()
+        for filename in self.filenames:
+            self.task_queue.put((CONTROL_ELEMENT.LOCAL, filename))
+
+    def cancel(self):
+        """
+        Removes the tasks no bear running process has taken yet, e.g. because
+        their results aren't needed anymore.
+        """
+        try:
+            while True:
+                self.task_queue.get(block=False)
+        except queue.Empty:
+            pass
+
+    def local_done(self, count):
+        """
+        Marks local bear runs as done.
+
+        :param count: The number of files all local bears ran on.
+        """
+        self._local_tasks -= count
+
+    def global_done(self, bearname, results):
+        """
+        Marks a global bear as done and schedules all global bears that
+        depend on it and have no other pending dependencies.
+
+        :param bearname: The name of the bear.
+        :param results:  The results of the bear.
+        """
+        self._global_tasks -= 1
+        self.global_results[bearname] = results
+        self._schedule_global_bears()
+
+    @property
+    def local_finished(self):
+        return self._local_tasks <= 0
+
+    @property
+    def finished(self):
+        return self.local_finished and self._global_tasks <= 0
+
+    def stop(self, process_count):
+        """
+        Tells the given number of bear running processes to exit once they
+        processed all scheduled tasks.
+
+        :param process_count: The number of bear running processes.
+        """
+        for i in range(process_count):
+            self.task_queue.put(None)
@@ -1,3 +1,3 @@
 from coalib.misc.Enum import enum
 
-CONTROL_ELEMENT = enum("LOCAL", "GLOBAL", "LOCAL_FINISHED", "GLOBAL_FINISHED")
+CONTROL_ELEMENT = enum("LOCAL", "GLOBAL")
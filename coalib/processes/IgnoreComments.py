@@ -0,0 +1,126 @@
+from bisect import bisect_right
+from itertools import accumulate
+import re
+
+from coalib.misc.FileContents import FileContents
+from coalib.misc.StringConverter import StringConverter
+from coalib.processes.ResultCache import hash_file_contents
+from coalib.results.SourceRange import SourceRange
+
+# All ignore comments contain it, lines without it needn't be looked at.
+IGNORE_KEYWORD_REGEX = re.compile("ignor", re.IGNORECASE)
+
+# Maximum number of files whose ignore comments are cached.
+MAX_CACHED_FILES = 10000
+
+_ignore_comment_cache = {}
+
+
+def get_ignore_scope(line, keyword):
+    """
+    Retrieves the bears that are to be ignored defined in the given line.
+
+    :param line:    The line containing the ignore declaration.
+    :param keyword: The keyword that was found. Everything after the rightmost
+                    occurrence of it will be considered for the scope.
+    :return:        A list of lower cased bearnames or an empty list (-> "all")
+    """
+    toignore = line[line.rfind(keyword) + len(keyword):]
+    if toignore.startswith("all"):
+        return []
+    else:
+        return list(StringConverter(toignore, list_delimiters=', '))
+
+
+def _yield_ignore_comment_lines(file):
+    """
+    Yields the line numbers and lower cased contents of the lines that may
+    contain an ignore comment. A single regex is run over the whole file
+    instead of looking at each line.
+
+    >>> list(_yield_ignore_comment_lines(("a\\n", "# Ignore\\n", "b\\n")))
+    [(2, '# ignore\\n')]
+    """
+    text = file.text if isinstance(file, FileContents) else "".join(file)
+    match = IGNORE_KEYWORD_REGEX.search(text)
+    if match is None:
+        return
+
+    line_ends = list(accumulate(len(line) for line in file))
+    while match is not None:
+        line_index = bisect_right(line_ends, match.start())
+        yield line_index + 1, file[line_index].lower()
+        match = IGNORE_KEYWORD_REGEX.search(text, line_ends[line_index])
+
+
+def _scan_ignore_comments(file):
+    """
+    Scans the file for ignore comments.
+
+    :param file: The file contents as a sequence of lines.
+    :return:     A tuple of tuples of the list of affected bears and the start
+                 line, start column, end line and end column of the range to
+                 ignore for them.
+    """
+    ranges = []
+    start = None
+    bears = []
+    stop_ignoring = False
+    for line_number, line in _yield_ignore_comment_lines(file):
+        if "start ignoring " in line:
+            start = line_number
+            bears = get_ignore_scope(line, "start ignoring ")
+        elif "stop ignoring" in line:
+            stop_ignoring = True
+            if start:
+                ranges.append((bears,
+                               start,
+                               1,
+                               line_number,
+                               len(file[line_number-1])))
+        elif "ignore " in line:
+            ranges.append((get_ignore_scope(line, "ignore "),
+                           line_number,
+                           1,
+                           line_number+1,
+                           len(file[line_number])))
+    if stop_ignoring is False and start is not None:
+        ranges.append((bears, start, 1, len(file), len(file[-1])))
+
+    return tuple(ranges)
+
+
+def get_file_ignore_ranges(filename, file):
+    """
+    Retrieves the ranges of a file that shall be ignored as declared by its
+    ignore comments. The comments found are cached by the hash of the file
+    contents, so files are scanned only once even if they are checked
+    repeatedly.
+
+    >>> for bears, range in get_file_ignore_ranges(
+    ...         "f", ("# Ignore aBear\\n", "a = 1\\n", "b = 2\\n")):
+    ...     print(bears, range.start.line, range.end.line)
+    ['abear'] 1 2
+
+    :param filename: The name of the file.
+    :param file:     The file contents as a sequence of lines.
+    :return:         A list of tuples of a list of lower cased affected
+                     bearnames and a SourceRange to ignore for them. An
+                     empty list of bearnames stands for all bears.
+    """
+    digest = hash_file_contents(file)
+    ranges = _ignore_comment_cache.get(digest)
+    if ranges is None:
+        if len(_ignore_comment_cache) >= MAX_CACHED_FILES:
+            _ignore_comment_cache.clear()
+        ranges = _scan_ignore_comments(file)
+        _ignore_comment_cache[digest] = ranges
+
+    return [(list(bears),
+             SourceRange.from_values(filename,
+                                     start_line,
+                                     start_column,
+                                     end_line,
+                                     end_column))
+            for bears, start_line, start_column, end_line, end_column
+            in ranges]
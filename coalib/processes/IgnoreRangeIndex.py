@@ -0,0 +1,154 @@
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate
+from os.path import abspath
+
+from coalib.parsing.Globbing import GlobMatcher
+from coalib.processes.IgnoreComments import get_file_ignore_ranges
+
+
+def _position_key(position):
+    """
+    Creates a key of the line and column of the given position that sorts
+    like the position itself does within its file, i.e. a line or column of
+    None is smaller than any other.
+
+    >>> from coalib.results.TextPosition import TextPosition
+    >>> _position_key(TextPosition(3, None))
+    (3, -inf)
+    """
+    return tuple(float("-inf") if value is None else value
+                 for value in (position.line, position.column))
+
+
+def _make_bear_matcher(bears):
+    """
+    Creates a function telling whether a lower cased bear name is one of the
+    given bear names or matched by one of them as a glob. The results are
+    cached per bear name.
+
+    >>> matches = _make_bear_matcher(["(line*|space*)", "pybear"])
+    >>> matches("linelengthbear"), matches("pybear"), matches("xmlbear")
+    (True, True, False)
+    >>> _make_bear_matcher([])("xmlbear")
+    True
+
+    :param bears: A list of lower cased bear names or globs matching them. If
+                  it is empty, all bears are matched.
+    :return:      A function taking a lower cased bear name.
+    """
+    if len(bears) == 0:
+        return lambda bearname: True
+
+    bear_set = set(bears)
+    glob_match = GlobMatcher(bears).match
+    cache = {}
+
+    def matches(bearname):
+        if bearname not in cache:
+            cache[bearname] = bearname in bear_set or glob_match(bearname)
+        return cache[bearname]
+
+    return matches
+
+
+class IgnoreRangeIndex:
+    """
+    Indexes ignore ranges by file so that checking whether a result is to be
+    ignored takes logarithmic time in the number of ignore ranges of the
+    affected files.
+
+    >>> from coalib.results.Result import Result
+    >>> from coalib.results.SourceRange import SourceRange
+    >>> index = IgnoreRangeIndex([
+    ...     ([], SourceRange.from_values("a.py", 1, 1, 2, 5)),
+    ...     (["py*"], SourceRange.from_values("a.py", 10, 1, 20, 1))])
+    >>> index.ignores(Result.from_values("SomeBear", "msg", "a.py", line=2))
+    True
+    >>> index.ignores(Result.from_values("SomeBear", "msg", "a.py", line=15))
+    False
+    >>> index.ignores(Result.from_values("PyBear", "msg", "a.py", line=15))
+    True
+    >>> index.ignores(Result.from_values("SomeBear", "msg", "b.py", line=2))
+    False
+
+    Given a file dictionary, the ignore comments of a file are only scanned
+    once a result affecting it is checked:
+
+    >>> index = IgnoreRangeIndex(file_dict={
+    ...     "c.py": ("# Ignore PyBear\\n", "a = 1\\n")})
+    >>> index.ignores(Result.from_values("PyBear", "msg", "c.py", line=2))
+    True
+    """
+
+    def __init__(self, ignore_ranges=(), file_dict=None):
+        """
+        :param ignore_ranges: An iterable of tuples, each containing a list of
+                              lower cased affected bearnames and a SourceRange
+                              to ignore, as yielded by
+                              ``yield_ignore_ranges()``. If the list of
+                              bearnames is empty, it is considered an ignore
+                              range for all bears. This may be a list of
+                              globbed bear wildcards.
+        :param file_dict:     A file dictionary whose files' ignore comments
+                              are scanned for ignore ranges when a result
+                              affecting them is checked.
+        """
+        self._file_dict = file_dict if file_dict is not None else {}
+        # Source positions hold absolute paths.
+        self._filenames = {abspath(filename): filename
+                           for filename in self._file_dict}
+        self._matchers = {}
+        # Maps each file to a list of tuples of a bear matcher, the sorted
+        # starts of the ranges to ignore for the matched bears and the
+        # maximum end of the ranges up to each start.
+        self._files = {}
+        self._scanned = set()
+        self._add_ranges(ignore_ranges)
+
+    def _add_ranges(self, ignore_ranges):
+        groups = defaultdict(list)
+        for bears, range in ignore_ranges:
+            groups[range.file, tuple(bears)].append(
+                (_position_key(range.start), _position_key(range.end)))
+
+        for (filename, bears), ranges in groups.items():
+            if bears not in self._matchers:
+                self._matchers[bears] = _make_bear_matcher(bears)
+
+            ranges.sort()
+            self._files.setdefault(filename, []).append(
+                (self._matchers[bears],
+                 [start for start, end in ranges],
+                 list(accumulate((end for start, end in ranges), max))))
+
+    def _get_file_groups(self, filename):
+        if filename in self._filenames and filename not in self._scanned:
+            self._scanned.add(filename)
+            self._add_ranges(get_file_ignore_ranges(
+                filename, self._file_dict[self._filenames[filename]]))
+
+        return self._files.get(filename, ())
+
+    def ignores(self, result):
+        """
+        Determines if the result has to be ignored.
+
+        :param result: The result that needs to be checked.
+        :return:       True if the result overlaps an ignore range of its
+                       origin.
+        """
+        bearname = result.origin.lower()
+        for affected_range in result.affected_code:
+            start = _position_key(affected_range.start)
+            end = _position_key(affected_range.end)
+            for matches, starts, max_ends in self._get_file_groups(
+                    affected_range.file):
+                # The ranges starting before the affected range ends overlap
+                # it if any of them ends after it starts.
+                count = bisect_right(starts, end)
+                if count and max_ends[count - 1] >= start and matches(
+                        bearname):
+                    return True
+
+        return False
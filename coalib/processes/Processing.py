@@ -1,31 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
 import multiprocessing
 import os
 import platform
 import queue
+import shutil
 import subprocess
+import tempfile
 from itertools import chain
 
 from coalib.collecting import Dependencies
 from coalib.collecting.Collectors import collect_files
-from coalib.misc.StringConverter import StringConverter
+from coalib.collecting.GitChanges import get_changed_files
+from coalib.misc.FileContents import FileContents
 from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
 from coalib.processes.BearRunning import run
+from coalib.processes.BearScheduler import BearScheduler
 from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+from coalib.processes.IgnoreComments import get_file_ignore_ranges
+from coalib.processes.IgnoreRangeIndex import IgnoreRangeIndex
 from coalib.processes.LogPrinterThread import LogPrinterThread
+from coalib.processes.Profiler import (
+    Profiler, profile, set_active_profiler)
+from coalib.processes.ResultCache import get_result_cache
+from coalib.processes.SharedFileDict import SharedFileDict
+from coalib.processes.communication.ResultTransport import join_senders
 from coalib.results.Result import Result
 from coalib.results.result_actions.ApplyPatchAction import ApplyPatchAction
 from coalib.results.result_actions.PrintDebugMessageAction import (
     PrintDebugMessageAction)
 from coalib.results.result_actions.ShowPatchAction import ShowPatchAction
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
-from coalib.results.SourceRange import SourceRange
+from coalib.settings.ConfigurationGathering import get_config_directory
 from coalib.settings.Setting import glob_list
-from coalib.parsing.Globbing import fnmatch
 
 ACTIONS = [ApplyPatchAction,
            PrintDebugMessageAction,
            ShowPatchAction]
 
+# Seconds to wait for a result before checking if the bear running processes
+# are still alive. Results are taken as soon as they arrive, this only bounds
+# how long a crashed process goes unnoticed.
+PROCESS_LIVENESS_TIMEOUT = 1
+
+# Number of threads reading files by default.
+DEFAULT_READ_THREADS = 8
+
+# Files with a null byte in their first bytes are considered binary.
+BINARY_DETECTION_SIZE = 8192
+
 
 def get_cpu_count():
     try:
@@ -162,20 +184,19 @@ def check_result_ignore(result, ignore_ranges):
     Determines if the result has to be ignored.
 
     :param result:        The result that needs to be checked.
-    :param ignore_ranges: A list of tuples, each containing a list of lower
-                          cased affected bearnames and a SourceRange to
-                          ignore. If any of the bearname lists is empty, it
-                          is considered an ignore range for all bears.
-                          This may be a list of globbed bear wildcards.
+    :param ignore_ranges: An ``IgnoreRangeIndex`` or a list of tuples, each
+                          containing a list of lower cased affected bearnames
+                          and a SourceRange to ignore. If any of the bearname
+                          lists is empty, it is considered an ignore range
+                          for all bears. This may be a list of globbed bear
+                          wildcards. Pass an ``IgnoreRangeIndex`` when
+                          checking many results against the same ranges.
     :return:              True if the result has to be ignored.
     """
-    for bears, range in ignore_ranges:
-        orig = result.origin.lower()
-        if (result.overlaps(range) and
-                (len(bears) == 0 or orig in bears or fnmatch(orig, bears))):
-            return True
+    if not isinstance(ignore_ranges, IgnoreRangeIndex):
+        ignore_ranges = IgnoreRangeIndex(ignore_ranges)
 
-    return False
+    return ignore_ranges.ignores(result)
 
 
 def print_result(results,
@@ -201,66 +222,229 @@ def print_result(results,
                            to the output medium.
     :param file_diff_dict: A dictionary that contains filenames as keys and
                            diff objects as values.
-    :param ignore_ranges:  A list of SourceRanges. Results that affect code in
-                           any of those ranges will be ignored.
+    :param ignore_ranges:  An ``IgnoreRangeIndex`` of the ranges to ignore
+                           results in, see ``check_result_ignore()``.
     :return:               Returns False if any results were yielded. Else
                            True.
     """
-    min_severity_str = str(section.get('min_severity', 'INFO')).upper()
-    min_severity = RESULT_SEVERITY.str_dict.get(min_severity_str, 'INFO')
-    results = list(filter(lambda result:
-                          type(result) is Result and
-                          result.severity >= min_severity and
-                          not check_result_ignore(result, ignore_ranges),
-                          results))
-
-    if bool(section.get('autoapply', 'true')):
-        patched_results = autoapply_actions(results,
-                                            file_dict,
-                                            file_diff_dict,
-                                            section,
-                                            log_printer)
-    else:
-        patched_results = results
+    with profile("print_result", "output"):
+        min_severity_str = str(section.get('min_severity', 'INFO')).upper()
+        min_severity = RESULT_SEVERITY.str_dict.get(min_severity_str, 'INFO')
+        results = list(filter(lambda result:
+                              type(result) is Result and
+                              result.severity >= min_severity and
+                              not check_result_ignore(result, ignore_ranges),
+                              results))
+
+        if bool(section.get('autoapply', 'true')):
+            patched_results = autoapply_actions(results,
+                                                file_dict,
+                                                file_diff_dict,
+                                                section,
+                                                log_printer)
+        else:
+            patched_results = results
+
+        print_results(log_printer,
+                      section,
+                      patched_results,
+                      file_dict,
+                      file_diff_dict)
+        return retval or len(results) > 0, patched_results
+
+
+def _read_file(filename, max_file_size):
+    """
+    Reads a file, in a reader thread of ``iter_file_dict()``.
+
+    :param filename:      The name of the file.
+    :param max_file_size: The maximum size in bytes of the file to read or
+                          None.
+    :return:              A tuple of the outcome, which is ``"read"``,
+                          ``"too large"``, ``"binary"`` or ``"failed"``, and
+                          the ``FileContents`` of the file, its size or the
+                          exception raised respectively.
+    """
+    try:
+        with profile("read", "file", file=filename), \
+                open(filename, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if max_file_size is not None and size > max_file_size:
+                return "too large", size
+            data = file.read()
+
+        if b"\0" in data[:BINARY_DETECTION_SIZE]:
+            return "binary", None
+        # Translates newlines like reading the file in text mode does.
+        text = data.decode("utf-8")
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return "read", FileContents.from_text(text)
+    except (OSError, UnicodeDecodeError) as exception:
+        return "failed", exception
+
+
+def iter_file_dict(filename_list,
+                   log_printer,
+                   max_file_size=None,
+                   threads=DEFAULT_READ_THREADS):
+    """
+    Reads files concurrently and yields their contents in the order of the
+    given file names as soon as they are read. Files that can't be read are
+    left out with a warning.
 
-    print_results(log_printer,
-                  section,
-                  patched_results,
-                  file_dict,
-                  file_diff_dict)
-    return retval or len(results) > 0, patched_results
+    :param filename_list: List of names of paths to files to get contents of.
+    :param log_printer:   The logger which logs errors.
+    :param max_file_size: The maximum size in bytes of the files to read or
+                          None to read all files.
+    :param threads:       The number of threads to read the files with.
+    :return:              An iterator yielding tuples of file names and their
+                          ``FileContents``.
+    """
+    executor = ThreadPoolExecutor(threads) if threads > 1 else None
+    try:
+        outcomes = (executor.map if executor is not None else map)(
+            lambda filename: _read_file(filename, max_file_size),
+            filename_list)
+        for filename, (outcome, value) in zip(filename_list, outcomes):
+            if outcome == "read":
+                yield filename, value
+            elif outcome == "too large":
+                log_printer.warn("Skipping file '{}' as it has {} bytes, "
+                                 "more than the maximum file size of {} "
+                                 "bytes.".format(filename,
+                                                 value,
+                                                 max_file_size))
+            elif outcome == "binary":
+                log_printer.warn("Failed to read file '{}'. It seems to be "
+                                 "a binary file. Leaving it "
+                                 "out.".format(filename))
+            elif isinstance(value, UnicodeDecodeError):
+                log_printer.warn("Failed to read file '{}'. It seems to "
+                                 "contain non-unicode characters. Leaving it "
+                                 "out.".format(filename))
+            else:
+                log_printer.log_exception("Failed to read file '{}' because "
+                                          "of an unknown error. Leaving it "
+                                          "out.".format(filename),
+                                          value,
+                                          log_level=LOG_LEVEL.WARNING)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
 
 
-def get_file_dict(filename_list, log_printer):
+def get_file_dict(filename_list,
+                  log_printer,
+                  max_file_size=None,
+                  threads=DEFAULT_READ_THREADS):
     """
     Reads all files into a dictionary.
 
     :param filename_list: List of names of paths to files to get contents of.
     :param log_printer:   The logger which logs errors.
+    :param max_file_size: The maximum size in bytes of the files to read or
+                          None to read all files.
+    :param threads:       The number of threads to read the files with.
     :return:              Reads the content of each file into a dictionary
                           with filenames as keys.
     """
-    file_dict = {}
-    for filename in filename_list:
-        try:
-            with open(filename, "r", encoding="utf-8") as _file:
-                file_dict[filename] = tuple(_file.readlines())
-        except UnicodeDecodeError:
-            log_printer.warn("Failed to read file '{}'. It seems to contain "
-                             "non-unicode characters. Leaving it "
-                             "out.".format(filename))
-        except OSError as exception:  # pragma: no cover
-            log_printer.log_exception("Failed to read file '{}' because of "
-                                      "an unknown error. Leaving it "
-                                      "out.".format(filename),
-                                      exception,
-                                      log_level=LOG_LEVEL.WARNING)
+    file_dict = dict(iter_file_dict(filename_list,
+                                    log_printer,
+                                    max_file_size,
+                                    threads))
 
     log_printer.debug("Files that will be checked:\n" +
                       "\n".join(file_dict.keys()))
     return file_dict
 
 
+def get_max_file_size_from_section(section, log_printer):
+    """
+    Parses the key ``max_file_size`` in the given section, the maximum size
+    of files to analyze in KiB.
+
+    :param section:     The section where to parse from.
+    :param log_printer: The log printer to warn to if the setting is invalid.
+    :return:            The maximum file size in bytes or None if it's
+                        unlimited.
+    """
+    max_file_size = str(section.get('max_file_size', '')).strip()
+    if not max_file_size:
+        return None
+
+    try:
+        return int(float(max_file_size) * 1024)
+    except (ValueError, OverflowError):
+        log_printer.warn("Unable to convert setting 'max_file_size' into a "
+                         "number. Falling back to analyzing files of any "
+                         "size.")
+        return None
+
+
+def _get_int_from_section(section, key, default, log_printer):
+    """
+    Parses an integer setting from the given section.
+
+    :param section:     The section where to parse from.
+    :param key:         The key of the setting.
+    :param default:     The value to use if the setting isn't given or
+                        invalid.
+    :param log_printer: The log printer to warn to if the setting is invalid.
+    :return:            The integer.
+    """
+    try:
+        return int(section.get(key, default))
+    except ValueError:
+        log_printer.warn("Unable to convert setting '{}' into a number. "
+                         "Falling back to {}.".format(key, default))
+        return default
+
+
+def get_changed_files_from_section(section, log_printer):
+    """
+    Parses the key ``changed_only`` in the given section. It can be set to a
+    boolean or to a git ref the working tree is compared against (``HEAD`` if
+    it's set to true). The changes are looked up in the repository the
+    configuration directory of the section belongs to.
+
+    :param section:     The section where to parse from.
+    :param log_printer: The log printer to warn to.
+    :return:            A set of paths of all changed files or None if all
+                        files shall be analyzed.
+    """
+    changed_only = section.get('changed_only', 'False')
+    try:
+        if not bool(changed_only):
+            return None
+        ref = "HEAD"
+    except ValueError:
+        ref = str(changed_only)
+
+    return get_changed_files(log_printer, ref, get_config_directory(section))
+
+
+def get_profile_output_from_section(section):
+    """
+    Parses the key ``profile_output`` in the given section. It can be set to a
+    boolean or to the path to write the profile to (``coala_profile_`` and
+    the section name if it's set to true). ``{section}`` in the path is
+    replaced by the section name.
+
+    :param section: The section where to parse from.
+    :return:        The path to write the profile to or None if the bear runs
+                    shall not be profiled.
+    """
+    profile_output = section.get('profile_output', 'False')
+    try:
+        if not bool(profile_output):
+            return None
+        path = "coala_profile_{section}.json"
+    except ValueError:
+        path = str(profile_output)
+
+    return path.replace("{section}", section.name)
+
+
 def filter_raising_callables(it, exception, *args, **kwargs):
     """
     Filters all callable items inside the given iterator that raise the
@@ -319,45 +503,69 @@ def instantiate_processes(section,
                           local_bear_list,
                           global_bear_list,
                           job_count,
-                          log_printer):
+                          log_printer,
+                          profile_directory=None):
     """
     Instantiate the number of processes that will run bears which will be
     responsible for running bears in a multiprocessing environment.
 
-    :param section:          The section the bears belong to.
-    :param local_bear_list:  List of local bears belonging to the section.
-    :param global_bear_list: List of global bears belonging to the section.
-    :param job_count:        Max number of processes to create.
-    :param log_printer:      The log printer to warn to.
-    :return:                 A tuple containing a list of processes,
-                             and the arguments passed to each process which are
-                             the same for each object.
+    If the ``changed_only`` setting is given only files changed in git are
+    collected, global bears thus only see the changed files as well. The
+    ``walk_threads`` setting gives the number of threads to
+    search directories for files with. The files are read with
+    ``read_threads`` threads and left out if they are larger than
+    ``max_file_size`` KiB. If the ``mmap_file_dict`` setting is
+    enabled the processes share a memory-mapped snapshot of the files instead
+    of getting a copy each.
+
+    :param section:           The section the bears belong to.
+    :param local_bear_list:   List of local bears belonging to the section.
+    :param global_bear_list:  List of global bears belonging to the section.
+    :param job_count:         Max number of processes to create.
+    :param log_printer:       The log printer to warn to.
+    :param profile_directory: The directory the processes write their
+                              profiles to or None to not profile them.
+    :return:                  A tuple containing a list of processes,
+                              and the arguments passed to each process which
+                              are the same for each object. The processes run
+                              the tasks a ``BearScheduler`` puts to the task
+                              queue.
     """
     filename_list = collect_files(
         glob_list(section.get('files', "")),
         log_printer,
         ignored_file_paths=glob_list(section.get('ignore', "")),
-        limit_file_paths=glob_list(section.get('limit_files', "")))
-    file_dict = get_file_dict(filename_list, log_printer)
-
-    manager = multiprocessing.Manager()
-    global_bear_queue = multiprocessing.Queue()
-    filename_queue = multiprocessing.Queue()
-    local_result_dict = manager.dict()
-    global_result_dict = manager.dict()
+        limit_file_paths=glob_list(section.get('limit_files', "")),
+        changed_files=get_changed_files_from_section(section, log_printer),
+        walk_threads=_get_int_from_section(section,
+                                           'walk_threads',
+                                           0,
+                                           log_printer))
+    file_dict = get_file_dict(
+        filename_list,
+        log_printer,
+        max_file_size=get_max_file_size_from_section(section, log_printer),
+        threads=_get_int_from_section(section,
+                                      'read_threads',
+                                      DEFAULT_READ_THREADS,
+                                      log_printer))
+    if bool(section.get('mmap_file_dict', 'False')):
+        file_dict = SharedFileDict(file_dict)
+
+    task_queue = multiprocessing.Queue()
     message_queue = multiprocessing.Queue()
     control_queue = multiprocessing.Queue()
 
-    bear_runner_args = {"file_name_queue": filename_queue,
+    bear_runner_args = {"task_queue": task_queue,
                         "local_bear_list": local_bear_list,
                         "global_bear_list": global_bear_list,
-                        "global_bear_queue": global_bear_queue,
                         "file_dict": file_dict,
-                        "local_result_dict": local_result_dict,
-                        "global_result_dict": global_result_dict,
                         "message_queue": message_queue,
                         "control_queue": control_queue,
-                        "timeout": 0.1}
+                        "timeout": 0.1,
+                        "result_cache": get_result_cache(section,
+                                                         log_printer),
+                        "profile_directory": profile_directory}
 
     local_bear_list[:], global_bear_list[:] = instantiate_bears(
         section,
@@ -366,30 +574,11 @@ def instantiate_processes(section,
         file_dict,
         message_queue)
 
-    fill_queue(filename_queue, file_dict.keys())
-    fill_queue(global_bear_queue, range(len(global_bear_list)))
-
     return ([multiprocessing.Process(target=run, kwargs=bear_runner_args)
              for i in range(job_count)],
             bear_runner_args)
 
 
-def get_ignore_scope(line, keyword):
-    """
-    Retrieves the bears that are to be ignored defined in the given line.
-
-    :param line:    The line containing the ignore declaration.
-    :param keyword: The keyword that was found. Everything after the rightmost
-                    occurrence of it will be considered for the scope.
-    :return:        A list of lower cased bearnames or an empty list (-> "all")
-    """
-    toignore = line[line.rfind(keyword) + len(keyword):]
-    if toignore.startswith("all"):
-        return []
-    else:
-        return list(StringConverter(toignore, list_delimiters=', '))
-
-
 def yield_ignore_ranges(file_dict):
     """
     Yields tuples of affected bears and a SourceRange that shall be ignored for
@@ -398,37 +587,7 @@ def yield_ignore_ranges(file_dict):
     :param file_dict: The file dictionary.
     """
     for filename, file in file_dict.items():
-        start = None
-        bears = []
-        stop_ignoring = False
-        for line_number, line in enumerate(file, start=1):
-            line = line.lower()
-            if "start ignoring " in line:
-                start = line_number
-                bears = get_ignore_scope(line, "start ignoring ")
-            elif "stop ignoring" in line:
-                stop_ignoring = True
-                if start:
-                    yield (bears,
-                           SourceRange.from_values(filename,
-                                                   start,
-                                                   1,
-                                                   line_number,
-                                                   len(file[line_number-1])))
-            elif "ignore " in line:
-                yield (get_ignore_scope(line, "ignore "),
-                       SourceRange.from_values(filename,
-                                               line_number,
-                                               1,
-                                               line_number+1,
-                                               len(file[line_number])))
-        if stop_ignoring is False and start is not None:
-            yield (bears,
-                   SourceRange.from_values(filename,
-                                           start,
-                                           1,
-                                           len(file),
-                                           len(file[-1])))
+        yield from get_file_ignore_ranges(filename, file)
 
 
 def process_queues(processes,
@@ -438,89 +597,70 @@ def process_queues(processes,
                    file_dict,
                    print_results,
                    section,
-                   log_printer):
+                   log_printer,
+                   scheduler):
     """
     Iterate the control queue and send the results recieved to the print_result
-    method so that they can be presented to the user.
+    method so that they can be presented to the user. Every result received is
+    reported to the scheduler so it can schedule the bears depending on them.
+
+    Global bears run concurrently to local ones but their results are only
+    presented once all local bear results are.
+
+    This blocks until results arrive. If no result is available and none of
+    the processes is alive anymore it gives up waiting.
 
     :param processes:          List of processes which can be used to run
                                Bears.
     :param control_queue:      Containing control elements that indicate
                                whether there is a result available and which
                                bear it belongs to.
-    :param local_result_dict:  Dictionary containing results respective to
-                               local bears. It is modified by the processes
-                               i.e. results are added to it by multiple
-                               processes.
-    :param global_result_dict: Dictionary containing results respective to
-                               global bears. It is modified by the processes
-                               i.e. results are added to it by multiple
-                               processes.
+    :param local_result_dict:  Dictionary the results respective to local
+                               bears are stored in with the file name as key.
+    :param global_result_dict: Dictionary the results respective to global
+                               bears are stored in with the bear name as
+                               key.
     :param file_dict:          Dictionary containing file contents with
                                filename as keys.
     :param print_results:      Prints all given results appropriate to the
                                output medium.
+    :param scheduler:          The ``BearScheduler`` that scheduled the tasks
+                               of the processes.
     :return:                   Return True if all bears execute succesfully and
                                Results were delivered to the user. Else False.
     """
     file_diff_dict = {}
     retval = False
-    # Number of processes working on local/global bears. They are count down
-    # when the last queue element of that process is processed which may be
-    # *after* the process has ended!
-    local_processes = len(processes)
-    global_processes = len(processes)
     global_result_buffer = []
-    ignore_ranges = list(yield_ignore_ranges(file_dict))
-
-    # One process is the logger thread
-    while local_processes > 1:
+    ignore_ranges = IgnoreRangeIndex(file_dict=file_dict)
+
+    def print_global_result(bearname):
+        nonlocal retval
+        retval, global_result_dict[bearname] = print_result(
+            global_result_dict[bearname],
+            file_dict,
+            retval,
+            print_results,
+            section,
+            log_printer,
+            file_diff_dict,
+            ignore_ranges)
+
+    while not scheduler.finished:
+        # Results put before a process exited are still taken.
+        alive = get_running_processes(processes) > 0
         try:
-            control_elem, index = control_queue.get(timeout=0.1)
-
-            if control_elem == CONTROL_ELEMENT.LOCAL_FINISHED:
-                local_processes -= 1
-            elif control_elem == CONTROL_ELEMENT.GLOBAL_FINISHED:
-                global_processes -= 1
-            elif control_elem == CONTROL_ELEMENT.LOCAL:
-                assert local_processes != 0
-                retval, res = print_result(local_result_dict[index],
-                                           file_dict,
-                                           retval,
-                                           print_results,
-                                           section,
-                                           log_printer,
-                                           file_diff_dict,
-                                           ignore_ranges)
-                local_result_dict[index] = res
-            else:
-                assert control_elem == CONTROL_ELEMENT.GLOBAL
-                global_result_buffer.append(index)
+            with profile("wait for results", "queue"):
+                control_elem, index = control_queue.get(
+                    timeout=PROCESS_LIVENESS_TIMEOUT if alive else 0)
         except queue.Empty:
-            if get_running_processes(processes) < 2:  # pragma: no cover
-                # Recover silently, those branches are only
-                # nondeterministically covered.
-                break
-
-    # Flush global result buffer
-    for elem in global_result_buffer:
-        retval, res = print_result(global_result_dict[elem],
-                                   file_dict,
-                                   retval,
-                                   print_results,
-                                   section,
-                                   log_printer,
-                                   file_diff_dict,
-                                   ignore_ranges)
-        global_result_dict[elem] = res
-
-    # One process is the logger thread
-    while global_processes > 1:
-        try:
-            control_elem, index = control_queue.get(timeout=0.1)
+            if alive:  # pragma: no cover
+                continue
+            break
 
-            if control_elem == CONTROL_ELEMENT.GLOBAL:
-                retval, res = print_result(global_result_dict[index],
+        if control_elem == CONTROL_ELEMENT.LOCAL:
+            for filename, results in index:
+                retval, res = print_result(results,
                                            file_dict,
                                            retval,
                                            print_results,
@@ -528,19 +668,56 @@ def process_queues(processes,
                                            log_printer,
                                            file_diff_dict,
                                            ignore_ranges)
-                global_result_dict[index] = res
-            else:
-                assert control_elem == CONTROL_ELEMENT.GLOBAL_FINISHED
-                global_processes -= 1
-        except queue.Empty:
-            if get_running_processes(processes) < 2:  # pragma: no cover
-                # Recover silently, those branches are only
-                # nondeterministically covered.
-                break
+                local_result_dict[filename] = res
+            scheduler.local_done(len(index))
+
+            if scheduler.local_finished:
+                for bearname in global_result_buffer:
+                    print_global_result(bearname)
+                global_result_buffer = []
+        else:
+            assert control_elem == CONTROL_ELEMENT.GLOBAL
+            bearname, results = index
+            scheduler.global_done(bearname, results)
+            if results:
+                global_result_dict[bearname] = results
+                if scheduler.local_finished:
+                    print_global_result(bearname)
+                else:
+                    global_result_buffer.append(bearname)
+
+    # Flush the global result buffer if processes died before finishing
+    # all local bears.
+    for bearname in global_result_buffer:
+        print_global_result(bearname)
 
     return retval
 
 
+def write_profile(profiler, profile_directory, profile_output, log_printer):
+    """
+    Writes the spans recorded by the profiler and the bear running processes
+    as a Chrome trace and a summary of the slowest bear runs next to it.
+
+    :param profiler:          The ``Profiler`` of the controlling process.
+    :param profile_directory: The directory the processes wrote their spans
+                              to. It is removed afterwards.
+    :param profile_output:    The path to write the trace to.
+    :param log_printer:       The log printer to inform to.
+    """
+    for filename in sorted(os.listdir(profile_directory)):
+        profiler.load_events(os.path.join(profile_directory, filename))
+    shutil.rmtree(profile_directory)
+
+    summary_output = os.path.splitext(profile_output)[0] + ".txt"
+    profiler.write_trace(profile_output)
+    with open(summary_output, "w") as file:
+        file.write(profiler.get_summary() + "\n")
+
+    log_printer.info("Wrote the profile to {} and a summary of it to "
+                     "{}.".format(profile_output, summary_output))
+
+
 def simplify_section_result(section_result):
     """
     Takes in a section's result from ``execute_section`` and simplifies it
@@ -582,8 +759,13 @@ def execute_section(section,
        -  Load files
        -  Create queues
     2. Spawn up one or more Processes
-    3. Output results from the Processes
-    4. Join all processes
+    3. Schedule the bear runs to the Processes
+    4. Output results from the Processes
+    5. Join all processes
+
+    If the ``profile_output`` setting is given the time spent in each bear
+    run, file read, queue wait and result output is written as a Chrome
+    trace to it along with a summary of the slowest bear runs.
 
     :param section:          The section to execute.
     :param global_bear_list: List of global bears belonging to the section.
@@ -592,11 +774,10 @@ def execute_section(section,
                              output medium.
     :param log_printer:      The log_printer to warn to.
     :return:                 Tuple containing a bool (True if results were
-                             yielded, False otherwise), a Manager.dict
-                             containing all local results(filenames are key)
-                             and a Manager.dict containing all global bear
-                             results (bear names are key) as well as the
-                             file dictionary.
+                             yielded, False otherwise), a dict containing all
+                             local results (filenames are key) and a dict
+                             containing all global bear results (bear names
+                             are key) as well as the file dictionary.
     """
     local_bear_list = Dependencies.resolve(local_bear_list)
     global_bear_list = Dependencies.resolve(global_bear_list)
@@ -610,34 +791,68 @@ def execute_section(section,
     except IndexError:
         running_processes = get_cpu_count()
 
+    profile_output = get_profile_output_from_section(section)
+    profiler = profile_directory = None
+    if profile_output is not None:
+        profiler = Profiler()
+        set_active_profiler(profiler)
+        profile_directory = tempfile.mkdtemp(prefix="coala_profile_")
+
     processes, arg_dict = instantiate_processes(section,
                                                 local_bear_list,
                                                 global_bear_list,
                                                 running_processes,
-                                                log_printer)
+                                                log_printer,
+                                                profile_directory)
+    scheduler = BearScheduler(arg_dict["task_queue"],
+                              arg_dict["file_dict"].keys(),
+                              arg_dict["global_bear_list"])
+    for bearname in sorted(scheduler.unsatisfiable):
+        log_printer.warn("The bear {} cannot be run because a bear it "
+                         "depends on is not available. Leaving it "
+                         "out.".format(bearname))
 
     logger_thread = LogPrinterThread(arg_dict["message_queue"],
                                      log_printer)
-    # Start and join the logger thread along with the processes to run bears
-    processes.append(logger_thread)
-
+    logger_thread.start()
     for runner in processes:
         runner.start()
+    scheduler.start()
 
+    local_result_dict = {}
+    global_result_dict = {}
     try:
         return (process_queues(processes,
                                arg_dict["control_queue"],
-                               arg_dict["local_result_dict"],
-                               arg_dict["global_result_dict"],
+                               local_result_dict,
+                               global_result_dict,
                                arg_dict["file_dict"],
                                print_results,
                                section,
-                               log_printer),
-                arg_dict["local_result_dict"],
-                arg_dict["global_result_dict"],
-                arg_dict["file_dict"])
+                               log_printer,
+                               scheduler),
+                local_result_dict,
+                global_result_dict,
+                dict(arg_dict["file_dict"]))
+    except BaseException:
+        # The results of the remaining tasks won't be presented anyway.
+        scheduler.cancel()
+        raise
     finally:
-        logger_thread.running = False
+        scheduler.stop(running_processes)
+        join_senders(arg_dict["control_queue"], processes)
+
+        # All messages of the processes are queued once they exited.
+        logger_thread.stop()
+        logger_thread.join()
+
+        if isinstance(arg_dict["file_dict"], SharedFileDict):
+            arg_dict["file_dict"].close()
+
+        if arg_dict["result_cache"] is not None:
+            arg_dict["result_cache"].evict()
 
-        for runner in processes:
-            runner.join()
+        if profiler is not None:
+            set_active_profiler(None)
+            write_profile(profiler, profile_directory, profile_output,
+                          log_printer)
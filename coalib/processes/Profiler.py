@@ -0,0 +1,211 @@
+from collections import defaultdict
+import json
+import os
+import threading
+import time
+
+_active_profiler = None
+
+
+def _get_cpu_clock():
+    """
+    Retrieves the clock measuring the CPU time of the current thread.
+    ``time.thread_time()`` is only available since Python 3.7, before that
+    the CPU time of the whole process is only attributed to spans on the
+    main thread, other threads like the file readers would count the work
+    of all threads.
+
+    :return: A function returning the CPU time in seconds or None if it
+             can't be measured for the current thread.
+    """
+    thread_time = getattr(time, "thread_time", None)
+    if thread_time is not None:
+        return thread_time
+    if threading.current_thread() is threading.main_thread():
+        return time.process_time
+    return None
+
+
+class Profiler:
+    """
+    Records spans of wall and CPU time, e.g. of bear runs, and exports them
+    as Chrome trace events (viewable in ``chrome://tracing``).
+
+    >>> profiler = Profiler()
+    >>> with profiler.span("SomeBear", "bear", file="a.py"):
+    ...     pass
+    >>> event = profiler.get_trace_events()[-1]
+    >>> event["name"], event["cat"], event["ph"], event["args"]["file"]
+    ('SomeBear', 'bear', 'X', 'a.py')
+
+    Code records spans of the profiler set with ``set_active_profiler()`` via
+    ``profile()``, which does nothing if no profiler is active.
+    """
+
+    def __init__(self, process_name="coala"):
+        """
+        :param process_name: The name to show for this process in the trace.
+        """
+        self.process_name = process_name
+        self.events = []
+
+    def span(self, name, category, **args):
+        """
+        Records the time spent in a ``with`` block. The CPU time is stored
+        as ``cpu_time`` argument if it can be measured for the thread, see
+        ``_get_cpu_clock()``.
+
+        :param name:     The name of the span, e.g. the bear name.
+        :param category: The category of the span, e.g. ``"bear"``.
+        :param args:     Additional information to store with the span.
+        :return:         A context manager measuring the block.
+        """
+        return _Span(self, name, category, args)
+
+    def get_trace_events(self):
+        """
+        :return: The recorded spans as trace events, preceded by a metadata
+                 event naming this process.
+        """
+        return [{"name": "process_name",
+                 "ph": "M",
+                 "pid": os.getpid(),
+                 "tid": 0,
+                 "args": {"name": self.process_name}}] + self.events
+
+    def save_events(self, filename):
+        """
+        Writes the trace events to the given file so another process can load
+        them via ``load_events()``.
+        """
+        with open(filename, "w") as file:
+            json.dump(self.get_trace_events(), file)
+
+    def load_events(self, filename):
+        """
+        Adds the trace events written by ``save_events()`` to the ones
+        recorded by this profiler.
+        """
+        with open(filename) as file:
+            self.events.extend(json.load(file))
+
+    def write_trace(self, filename):
+        """
+        Writes all recorded spans as Chrome trace-event JSON.
+        """
+        with open(filename, "w") as file:
+            json.dump({"traceEvents": self.get_trace_events(),
+                       "displayTimeUnit": "ms"},
+                      file)
+
+    def get_summary(self, count=20):
+        """
+        Summarizes the slowest bear runs.
+
+        >>> profiler = Profiler()
+        >>> profiler.events = [
+        ...     {"name": "ABear", "cat": "bear", "ph": "X", "dur": 3000,
+        ...      "args": {"file": "a.py", "cpu_time": 2000}},
+        ...     {"name": "ABear", "cat": "bear", "ph": "X", "dur": 1000,
+        ...      "args": {"file": "b.py", "cpu_time": 500}},
+        ...     {"name": "BBear", "cat": "bear", "ph": "X", "dur": 2000,
+        ...      "args": {"file": None, "cpu_time": 0}},
+        ...     {"name": "read", "cat": "file", "ph": "X", "dur": 9000,
+        ...      "args": {"file": "a.py", "cpu_time": 0}}]
+        >>> print(profiler.get_summary(2))
+        Wall (ms)   CPU (ms)  Bear                            File
+            3.000      2.000  ABear                           a.py
+            2.000      0.000  BBear                           (all files)
+
+        :param count: The number of (bear, file) pairs to list.
+        :return:      A table of the ``count`` (bear, file) pairs with the
+                      highest total wall time.
+        """
+        totals = defaultdict(lambda: [0, 0])
+        for event in self.events:
+            if event.get("cat") == "bear":
+                total = totals[event["name"], event["args"].get("file")]
+                total[0] += event["dur"]
+                total[1] += event["args"].get("cpu_time", 0)
+
+        rows = sorted(totals.items(), key=lambda item: -item[1][0])[:count]
+        return "\n".join(
+            ["{:>9}  {:>9}  {:<30}  {}".format("Wall (ms)", "CPU (ms)",
+                                               "Bear", "File")] +
+            ["{:9.3f}  {:9.3f}  {:<30}  {}".format(
+                wall / 1000, cpu / 1000, bear,
+                "(all files)" if filename is None else filename)
+             for (bear, filename), (wall, cpu) in rows])
+
+
+class _Span:
+
+    def __init__(self, profiler, name, category, args):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.cpu_clock = _get_cpu_clock()
+        if self.cpu_clock is not None:
+            self.cpu_start = self.cpu_clock()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.cpu_clock is not None:
+            self.args["cpu_time"] = (self.cpu_clock() - self.cpu_start) * 1e6
+        self.profiler.events.append({
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": self.timestamp * 1e6,
+            "dur": (time.perf_counter() - self.start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.args})
+
+
+class _NullSpan:
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def set_active_profiler(profiler):
+    """
+    Sets the profiler ``profile()`` records spans with.
+
+    :param profiler: A ``Profiler`` or None to disable profiling.
+    """
+    global _active_profiler
+    _active_profiler = profiler
+
+
+def get_active_profiler():
+    """
+    :return: The profiler set with ``set_active_profiler()`` or None.
+    """
+    return _active_profiler
+
+
+def profile(name, category, **args):
+    """
+    Records the time spent in a ``with`` block if a profiler is active.
+
+    >>> with profile("SomeBear", "bear"):
+    ...     pass
+
+    See ``Profiler.span()`` for the parameters.
+    """
+    if _active_profiler is None:
+        return _NULL_SPAN
+
+    return _active_profiler.span(name, category, **args)
@@ -0,0 +1,282 @@
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+
+from coalib import VERSION
+from coalib.settings.Setting import path
+
+# Default upper bound for the size of the cache directory in MiB.
+DEFAULT_MAX_CACHE_SIZE = 256
+
+
+def hash_file_contents(file):
+    """
+    Calculates a hash identifying the contents of a file.
+
+    :param file: The file contents as a sequence of lines.
+    :return:     A hexadecimal digest string.
+    """
+    digest = hashlib.sha1()
+    for line in file:
+        digest.update(line.encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def hash_file_dict(file_dict):
+    """
+    Calculates a hash identifying the names and contents of all files in a
+    file dictionary.
+
+    :param file_dict: A dictionary with filenames as keys and file contents
+                      as values.
+    :return:          A hexadecimal digest string.
+    """
+    digest = hashlib.sha1()
+    for filename in sorted(file_dict):
+        digest.update(filename.encode("utf-8", "surrogateescape"))
+        digest.update(hash_file_contents(file_dict[filename]).encode())
+    return digest.hexdigest()
+
+
+def _hash_bear_source(bear_class):
+    """
+    Retrieves a hash of the source file the given bear class is defined in.
+    Editing a bear thus invalidates all of its cached results.
+
+    :param bear_class: The bear class.
+    :return:           A hexadecimal digest string or an empty string if the
+                       source is unavailable.
+    """
+    try:
+        with open(inspect.getsourcefile(bear_class), "rb") as source:
+            return hashlib.sha1(source.read()).hexdigest()
+    except (OSError, TypeError):
+        return ""
+
+
+class ResultCache:
+    """
+    An on-disk cache that maps a bear run to the results it yielded. A run is
+    identified by the bear class, the bear source, the section settings the
+    bear uses, the contents of the analyzed files and for local bears the
+    name of the file. Entries are evicted
+    least recently used first once the cache grows over its size limit.
+
+    The cache holds no open resources and is thus safe to be sent to worker
+    processes.
+
+    >>> from tempfile import TemporaryDirectory
+    >>> from coalib.bears.LocalBear import LocalBear
+    >>> from coalib.results.Result import Result
+    >>> from coalib.settings.Section import Section
+    >>> class SomeBear(LocalBear):
+    ...     def run(self, filename, file, some_setting: int=1):
+    ...         pass
+    >>> with TemporaryDirectory() as cache_dir:
+    ...     cache = ResultCache(cache_dir)
+    ...     key = cache.get_key(SomeBear(Section("name"), None),
+    ...                         ("a\\n",),
+    ...                         filename="a.py")
+    ...     cache.get(key) is None
+    ...     cache.put(key, [Result("SomeBear", "message")])
+    ...     cache.get(key)[0].message
+    True
+    'message'
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_CACHE_SIZE):
+        """
+        :param cache_dir: The directory to store the cache entries in. It has
+                          to exist already.
+        :param max_size:  The maximum size of the cache in MiB.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._bear_params = {}
+        self._bear_keys = {}
+        self._file_dict_hashes = {}
+
+    def __getstate__(self):
+        # The memoized keys depend on objects of the process that created
+        # them.
+        state = self.__dict__.copy()
+        state["_bear_params"] = {}
+        state["_bear_keys"] = {}
+        state["_file_dict_hashes"] = {}
+        return state
+
+    @staticmethod
+    def is_cacheable(bear_instance):
+        """
+        Checks whether results of the given bear can be cached. Bears that
+        depend on other bears get additional input via their dependency
+        results and are thus always run.
+
+        :param bear_instance: The bear instance.
+        :return:              True if the results may be cached.
+        """
+        return not bear_instance.get_dependencies()
+
+    def _get_bear_key(self, bear_instance):
+        bear_class = type(bear_instance)
+        if bear_class not in self._bear_params:
+            metadata = bear_instance.get_metadata()
+            self._bear_params[bear_class] = (
+                list(metadata.non_optional_params) +
+                list(metadata.optional_params),
+                _hash_bear_source(bear_class))
+
+        params, source_hash = self._bear_params[bear_class]
+        section = bear_instance.section
+        settings = tuple(sorted((param, str(section[param]))
+                                for param in params if param in section))
+        if (bear_class, settings) not in self._bear_keys:
+            self._bear_keys[bear_class, settings] = repr((
+                VERSION,
+                bear_class.__module__,
+                bear_class.__name__,
+                source_hash,
+                list(settings)))
+
+        return self._bear_keys[bear_class, settings]
+
+    def get_file_dict_hash(self, file_dict):
+        """
+        Retrieves the hash of the given file dictionary, see
+        ``hash_file_dict()``. Global bears usually share one file dictionary
+        so it's hashed only once.
+
+        :param file_dict: A dictionary with filenames as keys and file
+                          contents as values.
+        :return:          A hexadecimal digest string.
+        """
+        file_dict_id = id(file_dict)
+        # The file dict is kept referenced so its id can't be reused.
+        if file_dict_id not in self._file_dict_hashes:
+            self._file_dict_hashes[file_dict_id] = (file_dict,
+                                                    hash_file_dict(file_dict))
+
+        return self._file_dict_hashes[file_dict_id][1]
+
+    def get_key(self, bear_instance, *contents_hashes, filename=None):
+        """
+        Creates the key a bear run is stored under.
+
+        :param bear_instance:   The bear instance that is run.
+        :param contents_hashes: Any number of file contents (or hashes of
+                                them as strings) the run depends upon.
+        :param filename:        The name of the file a local bear is run on.
+                                The results refer to it, so files with equal
+                                contents don't share results.
+        :return:                The key as a string.
+        """
+        digest = hashlib.sha1(self._get_bear_key(bear_instance).encode())
+        if filename is not None:
+            digest.update(filename.encode("utf-8", "surrogateescape") + b"\0")
+        for contents in contents_hashes:
+            if not isinstance(contents, str):
+                contents = hash_file_contents(contents)
+            digest.update(contents.encode())
+        return digest.hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """
+        Retrieves the results stored under the given key.
+
+        :param key: The key, see ``get_key()``.
+        :return:    The list of results or None if nothing is cached.
+        """
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as file:
+                results = pickle.load(file)
+            # Mark as recently used for eviction.
+            os.utime(path)
+            return results
+        except (OSError, EOFError, AttributeError, ImportError,
+                pickle.UnpicklingError):
+            return None
+
+    def put(self, key, results):
+        """
+        Stores the given results under the given key. Results that cannot be
+        pickled are silently not cached.
+
+        :param key:     The key, see ``get_key()``.
+        :param results: A list of results.
+        """
+        try:
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+        except OSError:
+            return
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                pickle.dump(results, file)
+            # Renaming is atomic so concurrent processes never read partial
+            # entries.
+            os.replace(temp_path, self._get_path(key))
+        except (OSError, AttributeError, TypeError, pickle.PicklingError):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits into its
+        size limit.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            try:
+                stat = os.stat(self._get_path(name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        size = sum(entry[1] for entry in entries)
+        max_size = self.max_size * 1024 * 1024
+        for _, entry_size, name in sorted(entries):
+            if size <= max_size:
+                break
+
+            try:
+                os.remove(self._get_path(name))
+                size -= entry_size
+            except OSError:
+                pass
+
+
+def get_result_cache(section, log_printer):
+    """
+    Creates the result cache configured for the given section.
+
+    :param section:     The section to get the ``cache_dir``,
+                        ``max_cache_size`` and ``no_cache`` settings from.
+    :param log_printer: The log printer to warn to.
+    :return:            A ``ResultCache`` or None if caching is disabled.
+    """
+    if bool(section.get("no_cache", "False")) or "cache_dir" not in section:
+        return None
+
+    cache_dir = path(section["cache_dir"])
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        log_printer.warn("Unable to create cache directory '{}'. Continuing "
+                         "without caching.".format(cache_dir))
+        return None
+
+    try:
+        max_size = int(section.get("max_cache_size", DEFAULT_MAX_CACHE_SIZE))
+    except ValueError:
+        log_printer.warn("Unable to convert setting 'max_cache_size' into a "
+                         "number. Falling back to {} MiB."
+                         .format(DEFAULT_MAX_CACHE_SIZE))
+        max_size = DEFAULT_MAX_CACHE_SIZE
+
+    return ResultCache(cache_dir, max_size)
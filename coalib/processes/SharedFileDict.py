@@ -0,0 +1,139 @@
+import mmap
+import os
+import tempfile
+from array import array
+from collections.abc import Mapping
+from itertools import accumulate
+
+from coalib.misc.FileContents import FileContents
+
+
+class SharedFileDict(Mapping):
+    """
+    A read-only file dictionary backed by a memory-mapped snapshot of all file
+    contents.
+
+    The contents are written once into an arena file together with an index
+    holding the byte offset of every line. The process that created the
+    snapshot keeps using the original dictionary. Other processes only get
+    the filename index, the contents are mapped into them lazily on first
+    access and shared between all processes through the page cache. This
+    keeps the memory usage of bear running processes flat no matter how many
+    of them are spawned. Other processes get the files as ``FileContents``.
+
+    >>> file_dict = SharedFileDict({"file": ("a\\n", "b\\n"), "empty": ()})
+    >>> file_dict["file"]
+    ('a\\n', 'b\\n')
+    >>> sorted(file_dict)
+    ['empty', 'file']
+    >>> file_dict["empty"]
+    ()
+    >>> file_dict.close()
+    """
+
+    def __init__(self, file_dict):
+        """
+        Writes the snapshot of the given file dictionary.
+
+        :param file_dict: A dictionary with filenames as keys and tuples of
+                          lines as values.
+        """
+        # filename -> (data offset, offsets offset, line count)
+        self._index = {}
+        file_descriptor, self.arena_path = tempfile.mkstemp(
+            prefix="coala_", suffix=".snapshot")
+        with os.fdopen(file_descriptor, "wb") as arena:
+            position = 0
+            for filename, file in file_dict.items():
+                data = "".join(file).encode("utf-8", "surrogateescape")
+                offsets = array("Q", [0])
+                for line in file:
+                    offsets.append(
+                        offsets[-1] +
+                        len(line.encode("utf-8", "surrogateescape")))
+
+                arena.write(data)
+                arena.write(offsets.tobytes())
+                self._index[filename] = (position,
+                                         position + len(data),
+                                         len(file))
+                position += len(data) + len(offsets) * offsets.itemsize
+
+        self._file_dict = file_dict
+        self._creator_pid = os.getpid()
+        self._mmap = None
+        self._cached = (None, None)
+
+    def __getstate__(self):
+        # Memory maps cannot be pickled, the receiver maps the arena itself.
+        state = self.__dict__.copy()
+        state["_file_dict"] = None
+        state["_mmap"] = None
+        state["_cached"] = (None, None)
+        return state
+
+    def _get_mmap(self):
+        if self._mmap is None:
+            with open(self.arena_path, "rb") as arena:
+                # Empty files cannot be mapped.
+                if os.fstat(arena.fileno()).st_size == 0:
+                    return b""
+                self._mmap = mmap.mmap(arena.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+
+        return self._mmap
+
+    def __getitem__(self, filename):
+        # Forked processes inherit the original dictionary but must not use
+        # it: touching the objects copies the memory pages holding them.
+        if self._creator_pid == os.getpid():
+            return self._file_dict[filename]
+
+        # Bears process one file after another, so remembering the last file
+        # avoids decoding it again for each bear.
+        if self._cached[0] == filename:
+            return self._cached[1]
+
+        data_start, offsets_start, line_count = self._index[filename]
+        arena = self._get_mmap()
+        offsets = array("Q")
+        offsets.frombytes(
+            arena[offsets_start:
+                  offsets_start + (line_count + 1) * offsets.itemsize])
+        data = arena[data_start:offsets_start]
+        text = data.decode("utf-8", "surrogateescape")
+        if len(text) != len(data):
+            # Multibyte characters make the byte offsets of the lines differ
+            # from their character offsets.
+            character_offsets = array("Q", [0])
+            character_offsets.extend(accumulate(
+                len(data[offsets[i]:offsets[i + 1]].decode(
+                    "utf-8", "surrogateescape"))
+                for i in range(line_count)))
+            offsets = character_offsets
+        file = FileContents.from_line_offsets(text, offsets)
+
+        self._cached = (filename, file)
+        return file
+
+    def __contains__(self, filename):
+        return filename in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """
+        Removes the arena file. This may only be called by the process that
+        created the snapshot once no other process accesses it anymore. The
+        creating process can still access the contents afterwards.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+        if os.path.exists(self.arena_path):
+            os.remove(self.arena_path)
@@ -0,0 +1,87 @@
+import queue
+
+# The time to wait for a process sending results to exit before reading the
+# results it still sends.
+JOIN_TIMEOUT = 0.01
+
+
+class ResultTransport:
+    """
+    Streams results from a bear running process back to the controlling
+    process. Results are sent through the control queue together with the
+    control element announcing them, so they are pickled only once and no
+    manager process is involved. To reduce the number of queue operations
+    results are sent in batches.
+
+    >>> from queue import Queue
+    >>> control_queue = Queue()
+    >>> transport = ResultTransport(control_queue, "LOCAL", batch_size=2)
+    >>> transport.send("file1", [])
+    >>> control_queue.empty()
+    True
+    >>> transport.send("file2", [])
+    >>> control_queue.get()
+    ('LOCAL', [('file1', []), ('file2', [])])
+
+    Remaining results have to be flushed explicitly:
+
+    >>> transport.send("file3", [])
+    >>> transport.flush()
+    >>> control_queue.get()
+    ('LOCAL', [('file3', [])])
+    """
+
+    def __init__(self, control_queue, control_element, batch_size=8):
+        """
+        :param control_queue:   The queue (write) to send the batches to.
+        :param control_element: The CONTROL_ELEMENT each batch is sent with.
+        :param batch_size:      The number of result lists to collect before
+                                sending them.
+        """
+        self.control_queue = control_queue
+        self.control_element = control_element
+        self.batch_size = batch_size
+        self._batch = []
+
+    def send(self, index, results):
+        """
+        Queues the given results for sending.
+
+        :param index:   The key the results belong to, e.g. a filename.
+        :param results: The list of results.
+        """
+        self._batch.append((index, results))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Sends all queued results.
+        """
+        if self._batch:
+            self.control_queue.put((self.control_element, self._batch))
+            self._batch = []
+
+
+def join_senders(control_queue, processes):
+    """
+    Joins the processes sending results through the control queue, this is
+    the last step of using the transport. Results still arriving meanwhile
+    are discarded: a process only exits once everything it put on the queue
+    is written to the underlying pipe, so joining it while nobody reads the
+    queue blocks forever if the pipe is full, e.g. when the controlling
+    process stopped presenting results.
+
+    :param control_queue: The queue (read) the processes send results to.
+    :param processes:     The processes to join.
+    """
+    for process in processes:
+        process.join(JOIN_TIMEOUT)
+        while process.is_alive():
+            # The process may be blocked on a full pipe.
+            try:
+                while True:
+                    control_queue.get_nowait()
+            except queue.Empty:
+                pass
+            process.join(JOIN_TIMEOUT)
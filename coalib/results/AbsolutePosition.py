@@ -1,12 +1,14 @@
-from coalib.results.TextPosition import TextPosition
 from coalib.misc.Decorators import enforce_signature
+from coalib.misc.FileContents import FileContents
+from coalib.results.TextPosition import TextPosition
 
 
 class AbsolutePosition(TextPosition):
+    __slots__ = ("_text", "_position")
 
     @enforce_signature
     def __init__(self,
-                 text: (tuple, list, None)=None,
+                 text: (tuple, list, FileContents, None)=None,
                  position: (int, None)=None):
         """
         Creates an AbsolutePosition object that represents the index of a
@@ -47,13 +49,23 @@ def calc_line_col(text, position):
     >>> calc_line_col(('a\n', 'b\n'), 2)
     (2, 1)
 
-    :param text:          A tuple/list of lines in which position is to
-                          be calculated.
+    A ``FileContents`` object is looked up by a binary search of its line
+    offsets instead of walking all lines before the position:
+
+    >>> from coalib.misc.FileContents import FileContents
+    >>> calc_line_col(FileContents(('a\n', 'b\n')), 3)
+    (2, 2)
+
+    :param text:          A tuple/list of lines or ``FileContents`` in which
+                          position is to be calculated.
     :param position:      Position (starting from 0) of character to be found
                           in the (line, column) form.
     :return:              A tuple of the form (line, column), where both line
                           and column start from 1.
     """
+    if isinstance(text, FileContents) and position >= 0:
+        return text.get_line_col(position)
+
     for linenum, line in enumerate(text, start=1):
         linelen = len(line)
         if position < linelen:
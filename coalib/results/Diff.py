@@ -1,6 +1,9 @@
 import copy
 import difflib
 
+from coalib.misc.FileContents import FileContents
+from coalib.results.DiffAlgorithms import (
+    DEFAULT_DIFF_ALGORITHM, DIFF_ALGORITHMS)
 from coalib.results.LineDiff import LineDiff, ConflictError
 from coalib.results.SourceRange import SourceRange
 
@@ -21,7 +24,10 @@ class Diff:
         self._file = file_list
 
     @classmethod
-    def from_string_arrays(cls, file_array_1, file_array_2):
+    def from_string_arrays(cls,
+                           file_array_1,
+                           file_array_2,
+                           algorithm=DEFAULT_DIFF_ALGORITHM):
         """
         Creates a Diff object from two arrays containing strings.
 
@@ -30,33 +36,41 @@ class Diff:
 
         :param file_array_1: Original array
         :param file_array_2: Array to compare
-        """
+        :param algorithm:    The name of the algorithm in
+                             ``DIFF_ALGORITHMS`` to compare the arrays with.
+                             The arrays may be aligned differently by each
+                             algorithm, but the diff always creates the second
+                             array.
+        :raises ValueError:  If the algorithm is unknown.
+        """
+        if algorithm not in DIFF_ALGORITHMS:
+            raise ValueError("Unknown diff algorithm {!r}, use one of "
+                             "{}.".format(algorithm,
+                                          ", ".join(sorted(DIFF_ALGORITHMS))))
+
         result = cls(file_array_1)
 
-        matcher = difflib.SequenceMatcher(None, file_array_1, file_array_2)
-        # We use this because its faster (generator) and doesnt yield as much
-        # useless information as get_opcodes.
-        for change_group in matcher.get_grouped_opcodes(1):
-            for (tag,
-                 a_index_1,
-                 a_index_2,
-                 b_index_1,
-                 b_index_2) in change_group:
-                if tag == "delete":
-                    for index in range(a_index_1+1, a_index_2+1):
-                        result.delete_line(index)
-                elif tag == "insert":
-                    # We add after line, they add before, so dont add 1 here
-                    result.add_lines(a_index_1,
-                                     file_array_2[b_index_1:b_index_2])
-                elif tag == "replace":
-                    result.change_line(a_index_1+1,
-                                       file_array_1[a_index_1],
-                                       file_array_2[b_index_1])
-                    result.add_lines(a_index_1+1,
-                                     file_array_2[b_index_1+1:b_index_2])
-                    for index in range(a_index_1+2, a_index_2+1):
-                        result.delete_line(index)
+        for (tag,
+             a_index_1,
+             a_index_2,
+             b_index_1,
+             b_index_2) in DIFF_ALGORITHMS[algorithm](file_array_1,
+                                                      file_array_2):
+            if tag == "delete":
+                for index in range(a_index_1+1, a_index_2+1):
+                    result.delete_line(index)
+            elif tag == "insert":
+                # We add after line, they add before, so dont add 1 here
+                result.add_lines(a_index_1,
+                                 file_array_2[b_index_1:b_index_2])
+            elif tag == "replace":
+                result.change_line(a_index_1+1,
+                                   file_array_1[a_index_1],
+                                   file_array_2[b_index_1])
+                result.add_lines(a_index_1+1,
+                                 file_array_2[b_index_1+1:b_index_2])
+                for index in range(a_index_1+2, a_index_2+1):
+                    result.delete_line(index)
 
         return result
 
@@ -69,7 +83,7 @@ class Diff:
         :param file:  A list of lines in the file to apply the fixit to.
         :return:      The corresponding Diff object.
         """
-        assert isinstance(file, (list, tuple))
+        assert isinstance(file, (list, tuple, FileContents))
 
         oldvalue = '\n'.join(file[fixit.range.start.line-1:
                                   fixit.range.end.line])
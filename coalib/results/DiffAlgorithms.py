@@ -0,0 +1,271 @@
+"""
+The algorithms ``Diff.from_string_arrays()`` can compare files with. Each
+algorithm takes two sequences of lines and returns a list of opcodes like
+``difflib.SequenceMatcher.get_opcodes()`` does, i.e. tuples of a tag, which
+is ``"equal"``, ``"replace"``, ``"delete"`` or ``"insert"``, and the start and
+end index of the lines of both sequences it applies to.
+"""
+
+import difflib
+import math
+
+# The histogram algorithm doesn't anchor on lines occurring more often than
+# this in a compared range, it falls back to the Myers algorithm there.
+MAX_CHAIN_LENGTH = 64
+
+# The Myers algorithm takes quadratic time in the number of edits, ranges
+# needing more edits are compared with difflib instead. Ranges get fewer
+# edits if that would take more steps than twice their number of lines, so
+# the search is never much slower than difflib when it has to be given up.
+MAX_MYERS_EDITS = 1000
+
+
+def difflib_opcodes(lines_1, lines_2):
+    """
+    Compares the lines with ``difflib.SequenceMatcher``, which takes
+    quadratic time on files with many repeated lines.
+
+    >>> difflib_opcodes(["a", "b"], ["a", "c"])
+    [('equal', 0, 1, 0, 1), ('replace', 1, 2, 1, 2)]
+
+    :param lines_1: The original lines.
+    :param lines_2: The lines to compare them to.
+    :return:        A list of opcodes.
+    """
+    return difflib.SequenceMatcher(None, lines_1, lines_2).get_opcodes()
+
+
+def _get_line_ids(lines_1, lines_2):
+    """
+    Maps equal lines to equal integers so they are hashed only once and
+    compared fast.
+
+    >>> _get_line_ids(["a", "b"], ["b", "c", "a"])
+    ([0, 1], [1, 2, 0])
+    """
+    ids = {}
+    return ([ids.setdefault(line, len(ids)) for line in lines_1],
+            [ids.setdefault(line, len(ids)) for line in lines_2])
+
+
+def _get_opcodes(matches, length_1, length_2):
+    """
+    Creates opcodes from the sorted pairs of indices of matching lines.
+
+    >>> _get_opcodes([(0, 0), (1, 1), (3, 2)], 4, 4)
+    ... # doctest: +NORMALIZE_WHITESPACE
+    [('equal', 0, 2, 0, 2), ('delete', 2, 3, 2, 2), ('equal', 3, 4, 2, 3),
+     ('insert', 4, 4, 3, 4)]
+    """
+    blocks = []
+    for index_1, index_2 in matches:
+        if (blocks and blocks[-1][0] + blocks[-1][2] == index_1 and
+                blocks[-1][1] + blocks[-1][2] == index_2):
+            blocks[-1][2] += 1
+        else:
+            blocks.append([index_1, index_2, 1])
+    blocks.append([length_1, length_2, 0])
+
+    opcodes = []
+    index_1 = index_2 = 0
+    for block_1, block_2, size in blocks:
+        if index_1 < block_1 and index_2 < block_2:
+            opcodes.append(("replace", index_1, block_1, index_2, block_2))
+        elif index_1 < block_1:
+            opcodes.append(("delete", index_1, block_1, index_2, block_2))
+        elif index_2 < block_2:
+            opcodes.append(("insert", index_1, block_1, index_2, block_2))
+        if size:
+            opcodes.append(("equal",
+                            block_1, block_1 + size,
+                            block_2, block_2 + size))
+        index_1, index_2 = block_1 + size, block_2 + size
+
+    return opcodes
+
+
+def _get_max_myers_edits(length_1, length_2):
+    """
+    Retrieves the number of edits the Myers algorithm may search for the
+    ranges with the given lengths, about the square root of their size.
+
+    >>> _get_max_myers_edits(5000, 5000)
+    141
+    >>> _get_max_myers_edits(10 ** 6, 10 ** 6)
+    1000
+    """
+    return min(MAX_MYERS_EDITS, int(math.sqrt(2 * (length_1 + length_2))))
+
+
+def _myers_matches(ids_1, ids_2, lo_1, hi_1, lo_2, hi_2,
+                   max_edits=MAX_MYERS_EDITS):
+    """
+    Finds a longest common subsequence of the given ranges with the greedy
+    algorithm by Eugene W. Myers, which takes O((N+M)D) time for D edits.
+
+    :return: A list of pairs of indices of matching lines or None if the
+             ranges need more than ``max_edits`` edits.
+    """
+    length_1 = hi_1 - lo_1
+    length_2 = hi_2 - lo_2
+    # Maps each diagonal k = x - y to the furthest x reached on it with d
+    # edits, only counting paths that stay within the edit graph.
+    furthest = {1: 0}
+    trace = []
+    for d in range(min(length_1 + length_2, max_edits) + 1):
+        current = {}
+        origins = {}
+        for k in range(-d, d + 1, 2):
+            # Insert a line of the second range or delete one of the first.
+            candidates = [(furthest[previous_k] + step, previous_k)
+                          for previous_k, step in ((k + 1, 0), (k - 1, 1))
+                          if previous_k in furthest]
+            candidates = [(x, previous_k) for x, previous_k in candidates
+                          if x <= length_1 and x - k <= length_2]
+            if not candidates:
+                continue
+
+            x, origins[k] = max(candidates)
+            while (x < length_1 and x - k < length_2 and
+                   ids_1[lo_1 + x] == ids_2[lo_2 + x - k]):
+                x += 1
+            current[k] = x
+            if x == length_1 and x - k == length_2:
+                trace.append((furthest, current, origins))
+                return _backtrack_myers(trace, lo_1, lo_2, length_1, k)
+
+        trace.append((furthest, current, origins))
+        furthest = current
+
+    return None
+
+
+def _backtrack_myers(trace, lo_1, lo_2, x, k):
+    matches = []
+    for previous, current, origins in reversed(trace):
+        previous_k = origins[k]
+        start = previous[previous_k] + (1 if previous_k == k - 1 else 0)
+        matches.extend((lo_1 + i, lo_2 + i - k) for i in range(start, x))
+        x, k = previous[previous_k], previous_k
+
+    return matches
+
+
+def _find_histogram_region(ids_1, ids_2, lo_1, hi_1, lo_2, hi_2):
+    """
+    Finds the longest region of equal lines among those containing the lines
+    that occur least often in the first range.
+
+    :return: A tuple of the start indices and the length of the region or
+             None if no line occurs at most ``MAX_CHAIN_LENGTH`` times, and
+             whether the ranges have any line in common.
+    """
+    occurrences = {}
+    for index in range(lo_1, hi_1):
+        occurrences.setdefault(ids_1[index], []).append(index)
+
+    region = None
+    best_count = MAX_CHAIN_LENGTH + 1
+    best_length = 0
+    has_common_line = False
+    index_2 = lo_2
+    while index_2 < hi_2:
+        next_index_2 = index_2 + 1
+        positions = occurrences.get(ids_2[index_2], ())
+        has_common_line = has_common_line or bool(positions)
+        if len(positions) > best_count:
+            positions = ()
+
+        for index_1 in positions:
+            start_1, start_2 = index_1, index_2
+            while (start_1 > lo_1 and start_2 > lo_2 and
+                   ids_1[start_1 - 1] == ids_2[start_2 - 1]):
+                start_1 -= 1
+                start_2 -= 1
+            end_1, end_2 = index_1 + 1, index_2 + 1
+            while (end_1 < hi_1 and end_2 < hi_2 and
+                   ids_1[end_1] == ids_2[end_2]):
+                end_1 += 1
+                end_2 += 1
+
+            count = min(len(occurrences[ids_1[index]])
+                        for index in range(start_1, end_1))
+            length = end_1 - start_1
+            if count < best_count or (count == best_count and
+                                      length > best_length):
+                region = start_1, start_2, length
+                best_count = count
+                best_length = length
+            next_index_2 = max(next_index_2, end_2)
+
+        index_2 = next_index_2
+
+    return region, has_common_line
+
+
+def histogram_opcodes(lines_1, lines_2):
+    """
+    Compares the lines with the histogram algorithm known from git: The
+    lines are aligned at the longest run of equal lines among those
+    occurring least often and the ranges before and after it are compared
+    the same way. Ranges without any rare line are compared with the Myers
+    algorithm. This takes about linear time on source code, repeated lines
+    like blank ones or braces don't slow it down.
+
+    >>> histogram_opcodes(["a", "b"], ["a", "c"])
+    [('equal', 0, 1, 0, 1), ('replace', 1, 2, 1, 2)]
+    >>> histogram_opcodes(["}", "a", "}", "b"], ["}", "b", "}"])
+    ... # doctest: +NORMALIZE_WHITESPACE
+    [('equal', 0, 1, 0, 1), ('delete', 1, 3, 1, 1), ('equal', 3, 4, 1, 2),
+     ('insert', 4, 4, 2, 3)]
+
+    :param lines_1: The original lines.
+    :param lines_2: The lines to compare them to.
+    :return:        A list of opcodes.
+    """
+    ids_1, ids_2 = _get_line_ids(lines_1, lines_2)
+    matches = []
+    ranges = [(0, len(ids_1), 0, len(ids_2))]
+    while ranges:
+        lo_1, hi_1, lo_2, hi_2 = ranges.pop()
+        while lo_1 < hi_1 and lo_2 < hi_2 and ids_1[lo_1] == ids_2[lo_2]:
+            matches.append((lo_1, lo_2))
+            lo_1 += 1
+            lo_2 += 1
+        while (lo_1 < hi_1 and lo_2 < hi_2 and
+               ids_1[hi_1 - 1] == ids_2[hi_2 - 1]):
+            hi_1 -= 1
+            hi_2 -= 1
+            matches.append((hi_1, hi_2))
+        if lo_1 == hi_1 or lo_2 == hi_2:
+            continue
+
+        region, has_common_line = _find_histogram_region(
+            ids_1, ids_2, lo_1, hi_1, lo_2, hi_2)
+        if region is not None:
+            start_1, start_2, length = region
+            matches.extend((start_1 + i, start_2 + i) for i in range(length))
+            ranges.append((lo_1, start_1, lo_2, start_2))
+            ranges.append((start_1 + length, hi_1, start_2 + length, hi_2))
+        elif has_common_line:
+            range_matches = _myers_matches(
+                ids_1, ids_2, lo_1, hi_1, lo_2, hi_2,
+                _get_max_myers_edits(hi_1 - lo_1, hi_2 - lo_2))
+            if range_matches is None:
+                range_matches = [
+                    (lo_1 + i + offset, lo_2 + j + offset)
+                    for i, j, size in difflib.SequenceMatcher(
+                        None,
+                        ids_1[lo_1:hi_1],
+                        ids_2[lo_2:hi_2]).get_matching_blocks()
+                    for offset in range(size)]
+            matches.extend(range_matches)
+
+    matches.sort()
+    return _get_opcodes(matches, len(ids_1), len(ids_2))
+
+
+DIFF_ALGORITHMS = {"difflib": difflib_opcodes,
+                   "histogram": histogram_opcodes}
+
+DEFAULT_DIFF_ALGORITHM = "histogram"
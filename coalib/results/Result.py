@@ -1,11 +1,33 @@
+import itertools
+import os
 import uuid
 from os.path import relpath
 
 from coalib.misc.Decorators import (
-    enforce_signature, generate_ordering, generate_repr, get_public_members)
+    enforce_signature, generate_ordering, generate_repr, generate_slots_state,
+    get_public_members)
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
 from coalib.results.SourceRange import SourceRange
 
+# Result id counters by process id, see _get_result_id().
+_result_ids = {}
+
+
+def _get_result_id():
+    """
+    Retrieves a new id for a result. Ids are unique across processes: the
+    upper 64 bits are random per process and the lower ones count up, which
+    is a lot cheaper than generating a random UUID for every result.
+
+    >>> _get_result_id() + 1 == _get_result_id()
+    True
+    """
+    pid = os.getpid()
+    ids = _result_ids.get(pid)
+    if ids is None:
+        ids = _result_ids[pid] = itertools.count(uuid.uuid4().int >> 64 << 64)
+    return next(ids)
+
 
 # Omit additional info, debug message and diffs for brevity
 @generate_repr(("id", hex),
@@ -20,12 +42,21 @@ from coalib.results.SourceRange import SourceRange
                    "additional_info",
                    "debug_msg",
                    "diffs")
+@generate_slots_state
 class Result:
     """
     A result is anything that has an origin and a message.
 
     Optionally it might affect a file.
     """
+    __slots__ = ("origin",
+                 "message",
+                 "debug_msg",
+                 "additional_info",
+                 "affected_code",
+                 "severity",
+                 "diffs",
+                 "id")
 
     @enforce_signature
     def __init__(self,
@@ -67,7 +98,7 @@ class Result:
         self.affected_code = tuple(sorted(affected_code))
         self.severity = severity
         self.diffs = diffs
-        self.id = uuid.uuid4().int
+        self.id = _get_result_id()
 
     @classmethod
     @enforce_signature
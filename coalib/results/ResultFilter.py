@@ -1,4 +1,3 @@
-import copy
 from difflib import SequenceMatcher
 
 from coalib.results.Diff import ConflictError, Diff
@@ -8,54 +7,167 @@ from coalib.results.SourceRange import SourceRange
 def filter_results(original_file_dict,
                    modified_file_dict,
                    original_results,
-                   modified_results):
+                   modified_results,
+                   compare_snippets=False):
     """
     Filters results for such ones that are unique across file changes
 
+    Only results with matching basics (see ``basics_match()``) are compared,
+    they are looked up by hash.
+
     :param original_file_dict: Dict of lists of file contents before  changes
     :param modified_file_dict: Dict of lists of file contents after changes
     :param original_results:   List of results of the old files
     :param modified_results:   List of results of the new files
+    :param compare_snippets:   Whether to only compare results whose affected
+                               code is equal apart from whitespace. This makes
+                               filtering take about linear time instead of
+                               quadratic time in the number of results with
+                               equal basics, but misses results whose
+                               affected code was changed, e.g. a result
+                               spanning a removed line.
     :return:                   List of results from new files that are unique
                                from all those that existed in the old changes
     """
 
     renamed_files = ensure_files_present(original_file_dict,
                                          modified_file_dict)
-    # diffs_dict[file] is a diff between the original and modified file
+    original_names = {new_name: old_name
+                      for old_name, new_name in renamed_files.items()}
+    # diffs_dict[file] is a diff between the original and modified file, they
+    # are only calculated for files affected by a compared result.
     diffs_dict = {}
-    for file in original_file_dict:
-        diffs_dict[file] = Diff.from_string_arrays(
-            original_file_dict[file],
-            modified_file_dict[renamed_files.get(file, file)])
-
-    orig_result_diff_dict_dict = remove_result_ranges_diffs(original_results,
-                                                            original_file_dict)
-
-    mod_result_diff_dict_dict = remove_result_ranges_diffs(modified_results,
-                                                           modified_file_dict)
+    # The diffs of each file affected by a result that remove its affected
+    # code, per result. Results of both runs may be equal, so they're kept
+    # apart.
+    original_result_diffs = {}
+    modified_result_diffs = {}
+
+    def results_match(original_result, modified_result):
+        if original_result not in original_result_diffs:
+            original_result_diffs[original_result] = _get_removal_diffs(
+                original_result, original_file_dict)
+        if modified_result not in modified_result_diffs:
+            modified_result_diffs[modified_result] = _get_removal_diffs(
+                modified_result, modified_file_dict)
+        original_diffs = original_result_diffs[original_result]
+        modified_diffs = modified_result_diffs[modified_result]
+        # Files affected by neither result are always equal.
+        file_names = set(original_diffs) | {
+            original_names.get(file_name, file_name)
+            for file_name in modified_diffs}
+        for file_name in file_names - set(diffs_dict):
+            diffs_dict[file_name] = Diff.from_string_arrays(
+                original_file_dict[file_name],
+                modified_file_dict[renamed_files.get(file_name, file_name)])
+
+        return source_ranges_match(
+            {file_name: original_file_dict[file_name]
+             for file_name in file_names},
+            diffs_dict,
+            _complete_diffs(original_diffs, original_file_dict, file_names),
+            _complete_diffs(modified_diffs,
+                            modified_file_dict,
+                            (renamed_files.get(file_name, file_name)
+                             for file_name in file_names)),
+            renamed_files)
+
+    original_buckets = {}
+    for o_r in original_results:
+        original_buckets.setdefault(
+            _get_fingerprint(o_r,
+                             original_file_dict,
+                             renamed_files,
+                             compare_snippets),
+            []).append(o_r)
 
     unique_results = []
 
     for m_r in reversed(modified_results):
-        unique = True
+        candidates = original_buckets.get(
+            _get_fingerprint(m_r, modified_file_dict, {}, compare_snippets),
+            ())
+        # at least one original result has to match completely
+        if not any(results_match(o_r, m_r) for o_r in candidates):
+            unique_results.append(m_r)
+
+    return unique_results
 
-        for o_r in original_results:
 
-            if basics_match(o_r, m_r):
-                if source_ranges_match(original_file_dict,
-                                       diffs_dict,
-                                       orig_result_diff_dict_dict[o_r],
-                                       mod_result_diff_dict_dict[m_r],
-                                       renamed_files):
+def _get_fingerprint(result, file_dict, renamed_files, compare_snippets):
+    """
+    Creates a hashable key that is equal for results that may match. It
+    consists of the basics of the result and optionally the affected files
+    and their code with all whitespace removed.
+
+    >>> from coalib.results.Result import Result
+    >>> result = Result.from_values("Bear", "msg", "f", 1, 3, 2, 4)
+    >>> file_dict = {result.affected_code[0].file: ["a  = 1\\n",
+    ...                                             "  b = 2\\n"]}
+    >>> _get_fingerprint(result, file_dict, {}, True)[-1]
+    '=1b'
+    >>> _get_fingerprint(result, file_dict, {}, False)
+    ('Bear', 'msg', 1, '')
+
+    :param result:           The result.
+    :param file_dict:        The dict of file contents the result belongs to.
+    :param renamed_files:    A dict of file renamings to apply to the files
+                             affected by the result.
+    :param compare_snippets: Whether to include the affected code.
+    :return:                 A tuple.
+    """
+    basics = (result.origin, result.message, result.severity, result.debug_msg)
+    if not compare_snippets:
+        return basics
 
-                    # at least one original result matches completely
-                    unique = False
-                    break
-        if unique:
-            unique_results.append(m_r)
+    source_ranges = sorted(_get_disjoint_source_ranges(result))
+    return basics + (
+        tuple(sorted({renamed_files.get(source_range.file, source_range.file)
+                      for source_range in source_ranges})),
+        "".join("".join(_get_snippet(file_dict[source_range.file],
+                                     source_range).split())
+                for source_range in source_ranges))
+
+
+def _get_snippet(file_contents, source_range):
+    """
+    Retrieves the code covered by the source range, i.e. the code
+    ``remove_range()`` removes.
+
+    >>> from coalib.results.SourceRange import SourceRange
+    >>> _get_snippet(["abc\\n", "de\\n", "fgh\\n"],
+    ...              SourceRange.from_values("f", 1, 2, 3, 1))
+    'bc\\nde\\nf'
+
+    :param file_contents: The lines of the file.
+    :param source_range:  The source range.
+    :return:              The covered code as a string.
+    """
+    if not file_contents:
+        return ""
+
+    source_range = source_range.expand(file_contents)
+    start_line = source_range.start.line
+    end_line = source_range.end.line
+    if start_line == end_line:
+        return file_contents[start_line - 1][source_range.start.column - 1:
+                                             source_range.end.column]
+
+    return "".join(
+        [file_contents[start_line - 1][source_range.start.column - 1:]] +
+        list(file_contents[start_line:end_line - 1]) +
+        [file_contents[end_line - 1][:source_range.end.column]])
 
-    return unique_results
+
+def _complete_diffs(diff_dict, file_dict, file_names):
+    """
+    Adds empty diffs for the given files without one.
+    """
+    diff_dict = dict(diff_dict)
+    for file_name in file_names:
+        if file_name not in diff_dict:
+            diff_dict[file_name] = Diff(file_dict[file_name])
+    return diff_dict
 
 
 def basics_match(original_result,
@@ -160,6 +272,58 @@ def remove_range(file_contents, source_range):
     return newfile
 
 
+def _get_disjoint_source_ranges(result):
+    """
+    Retrieves the source ranges affected by the result with overlapping ones
+    joined, sorted backwards.
+    """
+    source_ranges = []
+
+    # SourceRanges must be sorted backwards and overlaps must be eliminated
+    # this way, the deletion based on sourceRanges is not offset by
+    # previous deletions in the same line that invalidate the indices.
+    previous = None
+
+    for source_range in sorted(result.affected_code, reverse=True):
+        # previous exists and overlaps
+        if previous is not None and source_range.overlaps(previous):
+            combined_sr = SourceRange.join(previous, source_range)
+            previous = combined_sr
+        elif previous is None:
+            previous = source_range
+        # previous exists but it doesn't overlap
+        else:
+            source_ranges.append(previous)
+            previous = source_range
+    # don't forget last entry if there were any:
+    if previous:
+        source_ranges.append(previous)
+
+    return source_ranges
+
+
+def _get_removal_diffs(result, file_dict):
+    """
+    Calculates the diffs to the files affected by the result that describe
+    the removal of its affected code.
+
+    :param result:    The result.
+    :param file_dict: dict of file contents
+    :return:          A dict of the diffs of the affected files.
+    """
+    mod_file_dict = {}
+    for source_range in _get_disjoint_source_ranges(result):
+        file_name = source_range.file
+        # remove_range() doesn't modify the file contents it's given.
+        mod_file_dict[file_name] = remove_range(
+            mod_file_dict.get(file_name, file_dict[file_name]),
+            source_range)
+
+    return {file_name: Diff.from_string_arrays(file_dict[file_name],
+                                               new_file)
+            for file_name, new_file in mod_file_dict.items()}
+
+
 def remove_result_ranges_diffs(result_list, file_dict):
     """
     Calculates the diffs to all files in file_dict that describe the removal of
@@ -173,44 +337,10 @@ def remove_result_ranges_diffs(result_list, file_dict):
     """
     result_diff_dict_dict = {}
     for original_result in result_list:
-        mod_file_dict = copy.deepcopy(file_dict)
-
-        # gather all source ranges from this result
-        source_ranges = []
-
-        # SourceRanges must be sorted backwards and overlaps must be eliminated
-        # this way, the deletion based on sourceRanges is not offset by
-        # previous deletions in the same line that invalidate the indices.
-        previous = None
-
-        for source_range in sorted(original_result.affected_code, reverse=True):
-            # previous exists and overlaps
-            if previous is not None and source_range.overlaps(previous):
-                combined_sr = SourceRange.join(previous, source_range)
-                previous = combined_sr
-            elif previous is None:
-                previous = source_range
-            # previous exists but it doesn't overlap
-            else:
-                source_ranges.append(previous)
-                previous = source_range
-        # don't forget last entry if there were any:
-        if previous:
-            source_ranges.append(previous)
-
-        for source_range in source_ranges:
-            file_name = source_range.file
-            new_file = remove_range(mod_file_dict[file_name],
-                                    source_range)
-            mod_file_dict[file_name] = new_file
-
-        diff_dict = {}
-        for file_name in file_dict:
-            diff_dict[file_name] = Diff.from_string_arrays(
-                file_dict[file_name],
-                mod_file_dict[file_name])
-
-        result_diff_dict_dict[original_result] = diff_dict
+        result_diff_dict_dict[original_result] = _complete_diffs(
+            _get_removal_diffs(original_result, file_dict),
+            file_dict,
+            file_dict)
 
     return result_diff_dict_dict
 
@@ -1,13 +1,26 @@
-from os.path import relpath, abspath
+from functools import lru_cache
+from os.path import relpath, abspath, isabs
+import sys
 
 from coalib.misc.Decorators import (
     enforce_signature, generate_ordering, generate_repr, get_public_members)
 from coalib.results.TextPosition import TextPosition
 
+# The number of absolute file names whose normalized and interned form is
+# cached. It is bounded, so long running processes like the daemon don't
+# keep every file name they ever saw.
+INTERNED_FILES_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=INTERNED_FILES_CACHE_SIZE)
+def _intern_absolute_file(file):
+    return sys.intern(abspath(file))
+
 
 @generate_repr("file", "line", "column")
 @generate_ordering("file", "line", "column")
 class SourcePosition(TextPosition):
+    __slots__ = ("_file",)
 
     @enforce_signature
     def __init__(self, file: str, line=None, column=None):
@@ -15,7 +28,8 @@ class SourcePosition(TextPosition):
         Creates a new result position object that represents the position of a
         result in the source code.
 
-        :param file:        The filename.
+        :param file:        The filename. Its absolute path is interned, so
+                            positions in the same file share the string.
         :param line:        The line in file or None, the first line is 1.
         :param column:      The column indicating the character. The first one
                             in a line is 1.
@@ -25,7 +39,9 @@ class SourcePosition(TextPosition):
         """
         TextPosition.__init__(self, line, column)
 
-        self._file = abspath(file)
+        # Relative file names depend on the working directory.
+        self._file = (_intern_absolute_file(file) if isabs(file)
+                      else sys.intern(abspath(file)))
 
     @property
     def file(self):
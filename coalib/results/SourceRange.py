@@ -7,6 +7,7 @@ from coalib.results.AbsolutePosition import AbsolutePosition
 
 
 class SourceRange(TextRange):
+    __slots__ = ()
 
     @enforce_signature
     def __init__(self,
@@ -1,10 +1,12 @@
 from coalib.misc.Decorators import (
-    enforce_signature, generate_ordering, generate_repr)
+    enforce_signature, generate_ordering, generate_repr, generate_slots_state)
 
 
 @generate_repr("line", "column")
 @generate_ordering("line", "column")
+@generate_slots_state
 class TextPosition:
+    __slots__ = ("_line", "_column")
 
     @enforce_signature
     def __init__(self, line: (int, None)=None, column: (int, None)=None):
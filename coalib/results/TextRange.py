@@ -1,13 +1,15 @@
 import copy
 
 from coalib.misc.Decorators import (
-    enforce_signature, generate_ordering, generate_repr)
+    enforce_signature, generate_ordering, generate_repr, generate_slots_state)
 from coalib.results.TextPosition import TextPosition
 
 
 @generate_repr("start", "end")
 @generate_ordering("start", "end")
+@generate_slots_state
 class TextRange:
+    __slots__ = ("_start", "_end")
 
     @enforce_signature
     def __init__(self, start: TextPosition, end: (TextPosition, None)=None):
@@ -1,8 +1,25 @@
 import os
+import shutil
+import tempfile
 import webbrowser
 
+from coalib.misc import Constants
+
+_bear_index_directory = None
+
+
+def pytest_configure(config):
+    # Collecting bears writes an index, keep the one of the developer's coala
+    # installation out of the test runs.
+    global _bear_index_directory
+    _bear_index_directory = tempfile.mkdtemp(prefix="coala_bear_index_")
+    Constants.BEAR_INDEX_FILE = os.path.join(_bear_index_directory,
+                                             "bear_index.json")
+
 
 def pytest_unconfigure(config):
+    shutil.rmtree(_bear_index_directory, ignore_errors=True)
+
     htmlcov_path = os.path.join("htmlcov", "index.html")
     if (hasattr(config.option, "cov_report") and
             'html' in config.option.cov_report and
@@ -85,7 +85,11 @@ if __name__ == "__main__":
                             'makman@alice.de'),
           url='http://coala-analyzer.org/',
           platforms='any',
-          packages=find_packages(exclude=["build.*", "tests", "tests.*"]),
+          packages=find_packages(exclude=["build.*",
+                                          "benchmarks",
+                                          "benchmarks.*",
+                                          "tests",
+                                          "tests.*"]),
           install_requires=required,
           tests_require=test_required,
           package_data={'coalib': ['default_coafile', "VERSION",
@@ -97,6 +101,7 @@ if __name__ == "__main__":
               "console_scripts": [
                   "coala = coalib.coala:main",
                   "coala-ci = coalib.coala_ci:main",
+                  "coala-client = coalib.coala_client:main",
                   "coala-dbus = coalib.coala_dbus:main",
                   "coala-json = coalib.coala_json:main",
                   "coala-format = coalib.coala_format:main",
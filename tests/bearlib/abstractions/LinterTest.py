@@ -1,10 +1,13 @@
 import os
+import queue
 import re
 import sys
 import unittest
 from unittest.mock import ANY, Mock
 
 from coalib.bearlib.abstractions.Linter import linter
+from coalib.bears.BEAR_KIND import BEAR_KIND
+from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
 from coalib.results.Diff import Diff
 from coalib.results.Result import Result
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
@@ -119,11 +122,88 @@ class LinterComponentTest(unittest.TestCase):
             "'ManualProcessingTestLinter', but 'regex' output-format is "
             "specified.")
 
+    def test_decorator_invalid_batch_states(self):
+        with self.assertRaises(ValueError) as cm:
+            linter("some-executable",
+                   batch=True,
+                   use_stdin=True,
+                   output_format="regex",
+                   output_regex="(?P<filename>.*)")
+        self.assertEqual(str(cm.exception),
+                         "`use_stdin` can't be used in batch mode.")
+
+        with self.assertRaises(ValueError) as cm:
+            linter("some-executable", batch=True, output_format="corrected")
+        self.assertEqual(
+            str(cm.exception),
+            "Batch mode needs output-format 'regex' with the named group "
+            "`filename` used in `output_regex`.")
+
+        with self.assertRaises(ValueError) as cm:
+            linter("some-executable",
+                   batch=True,
+                   output_format="regex",
+                   output_regex="(?P<line>.*)")
+        self.assertEqual(
+            str(cm.exception),
+            "Batch mode needs output-format 'regex' with the named group "
+            "`filename` used in `output_regex`.")
+
+        with self.assertRaises(ValueError) as cm:
+            linter("some-executable",
+                   batch=True,
+                   output_format="regex",
+                   output_regex="(?P<filename>.*)",
+                   batch_size=0)
+        self.assertEqual(str(cm.exception),
+                         "Invalid value for `batch_size`: 0")
+
+        with self.assertRaises(ValueError) as cm:
+            linter("some-executable",
+                   batch=True,
+                   output_format="regex",
+                   output_regex="(?P<filename>.*)",
+                   max_concurrency=-1)
+        self.assertEqual(str(cm.exception),
+                         "Invalid value for `max_concurrency`: -1")
+
+        with self.assertRaises(TypeError):
+            linter("some-executable",
+                   batch=True,
+                   output_format="regex",
+                   output_regex="(?P<filename>.*)",
+                   invocation_timeout="1")
+
+        with self.assertRaises(ValueError) as cm:
+            linter("some-executable", batch_size=2)
+        self.assertEqual(str(cm.exception),
+                         "Invalid keyword arguments provided: 'batch_size'")
+
     def test_decorator_generated_default_interface(self):
         uut = linter("some-executable")(self.ManualProcessingTestLinter)
         with self.assertRaises(NotImplementedError):
             uut.create_arguments("filename", "content", None)
 
+    def test_decorator_positional_parameters(self):
+        # The positional parameters stay compatible with the ones before
+        # batch mode was added.
+        process_output_mock = Mock()
+
+        class TestLinter:
+
+            @staticmethod
+            def process_output(output, filename, file):
+                process_output_mock(output)
+
+            @staticmethod
+            def create_arguments(filename, file, config_file):
+                return "-c", "import sys; print(sys.stdin.read())"
+
+        uut = linter(sys.executable, True)(TestLinter)
+        self.assertEqual(uut.kind(), BEAR_KIND.LOCAL)
+        uut(self.section, None).run("", ["from stdin"])
+        process_output_mock.assert_called_once_with("from stdin\n")
+
     def test_decorator_invalid_parameter_types(self):
         # Provide some invalid severity maps.
         with self.assertRaises(TypeError):
@@ -552,6 +632,143 @@ class LinterComponentTest(unittest.TestCase):
             re.escape(repr(sys.executable)) + "\\) at 0x[a-fA-F0-9]+>")
 
 
+class BatchLinterTest(unittest.TestCase):
+
+    # Prints the name of each given file with its line count and the config.
+    TEST_PROGRAM = "\n".join([
+        "import sys",
+        "config = open(sys.argv[1]).read() if sys.argv[1] else '-'",
+        "for filename in sys.argv[2:]:",
+        "    print('{}:{}: {}'.format(",
+        "        filename, len(open(filename).readlines()), config))",
+        "print('elsewhere:1: ignored')"])
+
+    def setUp(self):
+        self.section = Section("BATCH_TEST_SECTION")
+        self.file_dict = {get_testfile_name(name): []
+                          for name in ("test_file.txt", "test_file2.txt")}
+        for filename in self.file_dict:
+            with open(filename) as fl:
+                self.file_dict[filename] = fl.readlines()
+
+    def test_run(self):
+        create_arguments_mock = Mock()
+        generate_config_mock = Mock()
+
+        class Handler:
+
+            @staticmethod
+            def generate_config(filename, file, config_value):
+                generate_config_mock(filename, file)
+                return config_value
+
+            @staticmethod
+            def create_batch_arguments(filenames, config_file):
+                create_arguments_mock(filenames)
+                return (("-c",
+                         BatchLinterTest.TEST_PROGRAM,
+                         config_file or "") +
+                        tuple(filenames))
+
+        uut = (linter(sys.executable,
+                      batch=True,
+                      output_format="regex",
+                      output_regex=r"(?P<filename>.+):(?P<line>\d+): "
+                                   r"(?P<message>.*)",
+                      batch_size=1)
+               (Handler)
+               (self.file_dict, self.section, None))
+        self.assertEqual(uut.kind(), BEAR_KIND.GLOBAL)
+        self.assertEqual(sorted(uut.get_non_optional_settings()),
+                         ["config_value"])
+
+        filenames = sorted(self.file_dict)
+        results = list(uut.run(config_value="cfg"))
+        self.assertEqual(
+            results,
+            [Result.from_values(uut, "cfg", filename,
+                                len(self.file_dict[filename]))
+             for filename in filenames])
+        generate_config_mock.assert_called_once_with(None, None)
+        self.assertEqual(create_arguments_mock.call_count, 2)
+        create_arguments_mock.assert_any_call(filenames[:1])
+        create_arguments_mock.assert_any_call(filenames[1:])
+
+    def test_default_batch_size(self):
+        class Handler:
+
+            @staticmethod
+            def create_batch_arguments(filenames, config_file):
+                return (("-c", BatchLinterTest.TEST_PROGRAM, "") +
+                        tuple(filenames))
+
+        uut = (linter(sys.executable,
+                      batch=True,
+                      output_format="regex",
+                      output_regex=r"(?P<filename>.+):(?P<line>\d+): "
+                                   r"(?P<message>.*)")
+               (Handler)
+               (self.file_dict, self.section, None))
+        self.assertEqual(len(list(uut.run())), 2)
+
+    def test_invocation_timeout(self):
+        class Handler:
+
+            @staticmethod
+            def create_batch_arguments(filenames, config_file):
+                if len(filenames) == 1:
+                    return "-c", "import time; time.sleep(10)"
+                return (("-c", BatchLinterTest.TEST_PROGRAM, "") +
+                        tuple(filenames))
+
+        message_queue = queue.Queue()
+        self.file_dict["a"] = []
+        uut = (linter(sys.executable,
+                      batch=True,
+                      output_format="regex",
+                      output_regex=r"(?P<filename>.+):(?P<line>\d+): "
+                                   r"(?P<message>.*)",
+                      batch_size=2,
+                      max_concurrency=2,
+                      invocation_timeout=0.5)
+               (Handler)
+               (self.file_dict, self.section, message_queue))
+
+        filenames = sorted(self.file_dict)
+        self.assertEqual(len(list(uut.run())), 2)
+        warnings = []
+        while not message_queue.empty():
+            message = message_queue.get()
+            if message.log_level == LOG_LEVEL.WARNING:
+                warnings.append(message.message)
+        self.assertEqual(len(warnings), 1)
+        self.assertTrue(warnings[0].startswith(
+            "Linting {} failed: ".format(filenames[2])))
+
+    def test_invalid_arguments(self):
+        class Handler:
+
+            @staticmethod
+            def create_batch_arguments(filenames, config_file):
+                return None
+
+        uut = (linter(sys.executable,
+                      batch=True,
+                      output_format="regex",
+                      output_regex="(?P<filename>.+)")
+               (Handler)
+               (self.file_dict, self.section, None))
+        self.assertEqual(list(uut.run()), [])
+
+        uut = linter(sys.executable,
+                     batch=True,
+                     output_format="regex",
+                     output_regex="(?P<filename>.+)")(
+                         LinterComponentTest.EmptyTestLinter)
+        with self.assertRaises(NotImplementedError):
+            uut.create_batch_arguments([], None)
+
+
 class LinterReallifeTest(unittest.TestCase):
 
     def setUp(self):
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+
+from pyprint.NullPrinter import NullPrinter
+
+from benchmarks.__main__ import main
+from benchmarks.Benchmark import run_benchmarks, tracemalloc
+from benchmarks.ProjectGenerator import generate_project
+from coalib.misc.ContextManagers import retrieve_stdout
+from coalib.output.printers.LogPrinter import LogPrinter
+
+
+@unittest.skipIf(tracemalloc is None,
+                 "tracemalloc is not available before Python 3.4.")
+class BenchmarkTest(unittest.TestCase):
+
+    def test_generate_project(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_dict = generate_project(directory, 51, 100)
+            self.assertEqual(len(file_dict), 51)
+            self.assertTrue(os.path.isdir(os.path.join(directory,
+                                                       "package1")))
+            for filename, file in file_dict.items():
+                self.assertEqual(len(file), 100)
+                with open(filename) as fl:
+                    self.assertEqual(fl.readlines(), file)
+
+            self.assertEqual(generate_project(directory, 51, 100),
+                             file_dict)
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(LogPrinter(NullPrinter()),
+                                 file_count=3,
+                                 line_count=60,
+                                 jobs=1,
+                                 repeat=1,
+                                 settings={"mmap_file_dict": "true"},
+                                 result_count=100)
+        self.assertEqual(list(results["stages"]),
+                         ["collect_files",
+                          "get_file_dict",
+                          "yield_ignore_ranges",
+                          "Diff.from_string_arrays[difflib]",
+                          "Diff.from_string_arrays[histogram]",
+                          "Diff.from_string_arrays[difflib, repeated lines]",
+                          "Diff.from_string_arrays[histogram, repeated lines]",
+                          "create_results",
+                          "pickle_results",
+                          "filter_results",
+                          "filter_results[compare_snippets]",
+                          "execute_section"])
+        for stage in results["stages"].values():
+            self.assertEqual(len(stage["times"]), 1)
+        self.assertGreater(results["stages"]["create_results"]["memory"], 0)
+        self.assertGreater(results["stages"]["pickle_results"]["size"], 0)
+        self.assertEqual(results["parameters"]["settings"],
+                         {"mmap_file_dict": "true"})
+        self.assertGreater(results["wall_time"], 0)
+        self.assertGreater(results["peak_rss"], 0)
+        # The benchmarks wait for child processes, e.g. the bear runners.
+        self.assertGreater(results["peak_rss_children"], 0)
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as directory:
+            old = os.path.join(directory, "old.json")
+            self.assertEqual(main(["run", "--files", "2", "--lines", "20",
+                                   "--repeat", "1", "-j", "1",
+                                   "--local-bears", "1", "--global-bears",
+                                   "0", "--results", "10", "-o", old]),
+                             0)
+            with open(old) as file:
+                results = json.load(file)
+
+            # Make the new run appear slower.
+            for stage in results["stages"].values():
+                stage["min"] *= 2
+            new = os.path.join(directory, "new.json")
+            with open(new, "w") as file:
+                json.dump(results, file)
+
+            with retrieve_stdout() as stdout:
+                self.assertEqual(main(["compare", old, new]), 1)
+                self.assertIn("execute_section", stdout.getvalue())
+                self.assertIn("REGRESSED", stdout.getvalue())
+
+            with retrieve_stdout() as stdout:
+                self.assertEqual(main(["compare", old, old]), 0)
+                self.assertNotIn("REGRESSED", stdout.getvalue())
+
+            with retrieve_stdout():
+                self.assertEqual(main([]), 2)
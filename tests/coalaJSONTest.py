@@ -3,6 +3,7 @@ import os
 import re
 import sys
 import unittest
+from unittest.mock import patch
 
 from coalib import coala_json
 from coalib.misc.ContextManagers import prepare_file
@@ -83,3 +84,47 @@ class coalaJSONTest(unittest.TestCase):
         self.assertEqual(data['logs'][0]['log_level'],
                          output['logs'][0]['log_level'])
         os.remove('file.json')
+
+    def test_ndjson(self):
+        with bear_test_module(), \
+                prepare_file(["#fixme"], None) as (lines, filename):
+            retval, output = execute_coala(coala_json.main, "coala-json",
+                                           "-c", os.devnull,
+                                           "-b", "LineCountTestBear",
+                                           "-f", re.escape(filename),
+                                           "--format", "ndjson")
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["section"], "default")
+        self.assertEqual(records[0]["result"]["message"],
+                         "This file has 1 lines.")
+        summary = records[1]["summary"]
+        self.assertEqual(summary["exitcode"], retval)
+        self.assertNotEqual(retval, 0)
+        self.assertEqual(summary["result_counts"], {"default": 1})
+        self.assertIsInstance(summary["logs"], list)
+
+    def test_ndjson_not_retained(self):
+        with patch("coalib.coala_json.run_coala",
+                   return_value=({}, 0, {})) as run_coala:
+            retval, output = execute_coala(coala_json.main, "coala-json",
+                                           "--format", "ndjson")
+        self.assertEqual(retval, 0)
+        self.assertEqual(run_coala.call_args[1]["retain_results"], False)
+        self.assertEqual(run_coala.call_args[1]["retain_file_dicts"], False)
+
+    def test_ndjson_output_file(self):
+        retval, output = execute_coala(coala_json.main, "coala-json",
+                                       "-c", "nonex", "--format", "ndjson",
+                                       "-o", "file.ndjson")
+        self.assertEqual(output, "")
+        with open("file.ndjson") as fp:
+            records = [json.loads(line) for line in fp]
+        os.remove("file.ndjson")
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["summary"]["exitcode"], retval)
+        self.assertEqual(records[0]["summary"]["result_counts"], {})
+        self.assertRegex(
+            records[0]["summary"]["logs"][0]["message"],
+            "The requested coafile '.*' does not exist.")
@@ -0,0 +1,137 @@
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+from coalib.coala_main import iter_coala, run_coala
+from coalib.misc import Constants
+from coalib.misc.ContextManagers import prepare_file
+from coalib.output.printers.ListLogPrinter import ListLogPrinter
+from coalib.output.Tagging import delete_tagged_results, load_tagged_results
+from coalib.results.Result import Result
+from tests.TestUtilities import bear_test_module, raise_error
+
+
+class coalaMainTest(unittest.TestCase):
+
+    def setUp(self):
+        self.old_argv = sys.argv
+        self.log_printer = ListLogPrinter()
+
+    def tearDown(self):
+        sys.argv = self.old_argv
+
+    def test_run_coala_retain(self):
+        with bear_test_module(), \
+                prepare_file(["#fixme"], None) as (lines, filename):
+            sys.argv = ["coala", "-c", os.devnull,
+                        "-b", "LineCountTestBear",
+                        "-f", re.escape(filename)]
+            results, exitcode, file_dicts = run_coala(
+                log_printer=self.log_printer)
+            self.assertEqual(exitcode, 1)
+            self.assertEqual(len(results["default"]), 1)
+            self.assertEqual(list(file_dicts["default"]), [filename])
+
+            results, exitcode, file_dicts = run_coala(
+                log_printer=self.log_printer,
+                retain_results=False,
+                retain_file_dicts=False)
+            self.assertEqual(exitcode, 1)
+            self.assertEqual(results, {})
+            self.assertEqual(file_dicts, {})
+
+    def test_run_coala_tag_failed_run(self):
+        with bear_test_module(), \
+                prepare_file(["#fixme"], None) as (lines, filename):
+            sys.argv = ["coala", "-c", os.devnull,
+                        "-b", "LineCountTestBear",
+                        "-f", re.escape(filename),
+                        "--tag", "test_main_tag"]
+            try:
+                results, exitcode, file_dicts = run_coala(
+                    log_printer=self.log_printer)
+                self.assertEqual(exitcode, 1)
+                tag_files = os.listdir(Constants.TAGS_DIR)
+
+                # The interrupted run keeps the previously tagged results.
+                results, exitcode, file_dicts = run_coala(
+                    log_printer=self.log_printer,
+                    print_section_beginning=lambda section: raise_error(
+                        KeyboardInterrupt))
+                self.assertEqual(exitcode, 130)
+                self.assertEqual(results, {})
+                self.assertEqual(os.listdir(Constants.TAGS_DIR), tag_files)
+                tagged_results = load_tagged_results(
+                    "test_main_tag", os.devnull, self.log_printer)
+                self.assertEqual(len(tagged_results["default"]), 1)
+            finally:
+                delete_tagged_results("test_main_tag",
+                                      os.devnull,
+                                      self.log_printer)
+
+    def test_iter_coala(self):
+        with bear_test_module(), \
+                prepare_file(["#fixme"], None) as (lines, filename):
+            sys.argv = ["coala", "-c", os.devnull,
+                        "-b", "LineCountTestBear",
+                        "-f", re.escape(filename)]
+            results = iter_coala(log_printer=self.log_printer)
+            section_name, result = next(results)
+            self.assertEqual(section_name, "default")
+            self.assertIsInstance(result, Result)
+            self.assertEqual(result.message, "This file has 1 lines.")
+            with self.assertRaises(StopIteration) as context:
+                next(results)
+            self.assertEqual(context.exception.value, 1)
+
+            file_dicts = {}
+            self.assertEqual(len(list(iter_coala(log_printer=self.log_printer,
+                                                 file_dicts=file_dicts))),
+                             1)
+            self.assertEqual(file_dicts["default"][filename], ("#fixme\n",))
+
+    def test_iter_coala_close(self):
+        with bear_test_module(), \
+                prepare_file(["line"] * 3, None) as (lines, filename):
+            sys.argv = ["coala", "-c", os.devnull,
+                        "-b", "LineCountTestBear",
+                        "-f", re.escape(filename),
+                        "-S", "second.files=" + re.escape(filename),
+                        "second.bears=LineCountTestBear"]
+            sections = []
+            results = iter_coala(log_printer=self.log_printer,
+                                 print_section_beginning=sections.append)
+            self.assertEqual(next(results)[0], "default")
+            results.close()
+            self.assertEqual([section.name for section in sections],
+                             ["Default"])
+            self.assertEqual(self.log_printer.logs, [])
+
+    def test_iter_coala_close_many_results(self):
+        with bear_test_module(), \
+                tempfile.TemporaryDirectory() as directory:
+            for index in range(50):
+                with open(os.path.join(directory, "{}.py".format(index)),
+                          "w") as file:
+                    # Every line has trailing whitespace.
+                    file.write("line \n" * 200)
+
+            sys.argv = ["coala", "-c", os.devnull,
+                        "-b", "SpaceConsistencyTestBear",
+                        "-f", os.path.join(re.escape(directory), "*.py"),
+                        "-S", "use_spaces=true"]
+            results = iter_coala(log_printer=self.log_printer)
+            self.assertEqual(next(results)[0], "default")
+            # Bear runners still sending results must not block closing.
+            results.close()
+            self.assertEqual(self.log_printer.logs, [])
+
+    def test_iter_coala_nothing_done(self):
+        sys.argv = ["coala", "-c", os.devnull, "-S", "default.enabled=false"]
+        nothing_done = []
+        results = iter_coala(log_printer=self.log_printer,
+                             nothing_done=nothing_done.append)
+        self.assertEqual(list(results), [])
+        self.assertEqual(nothing_done, [self.log_printer])
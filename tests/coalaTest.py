@@ -40,6 +40,28 @@ class coalaTest(unittest.TestCase):
         self.assertEqual(retval, 0)
         self.assertIn("No existent section was targeted or enabled", output)
 
+    def test_daemon(self):
+        with unittest.mock.patch(
+                "coalib.output.daemon.DaemonServer.run_daemon",
+                return_value=0) as run_daemon:
+            retval, output = execute_coala(coala.main, "coala", "--daemon",
+                                           "--daemon-socket", "socket")
+            self.assertEqual(retval, 0)
+            self.assertEqual(run_daemon.call_args[0][0], "socket")
+
+            retval, output = execute_coala(coala.main, "coala",
+                                           "--daemon=false",
+                                           "-c", os.devnull,
+                                           "-S", "default.enabled=false")
+            self.assertEqual(retval, 0)
+            self.assertIn("No existent section was targeted or enabled",
+                          output)
+            self.assertEqual(run_daemon.call_count, 1)
+
+            with self.assertRaises(SystemExit):
+                execute_coala(coala.main, "coala", "--daemon=maybe")
+            self.assertEqual(run_daemon.call_count, 1)
+
     def test_show_bears(self):
         with bear_test_module():
             retval, output = execute_coala(coala.main, "coala", "-A")
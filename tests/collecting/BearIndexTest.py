@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import unittest
+
+from coalib.bears.GlobalBear import GlobalBear
+from coalib.bears.LocalBear import LocalBear
+from coalib.collecting.BearIndex import BearIndex, get_bear_entry
+
+
+class SomeLocalBear(LocalBear):
+    pass
+
+
+class SomeGlobalBear(GlobalBear):
+    pass
+
+
+class BearIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.directory.name,
+                                       "subdir",
+                                       "bear_index.json")
+        self.bear_file = os.path.join(self.directory.name, "SomeBear.py")
+        with open(self.bear_file, "w") as file:
+            file.write("# bears\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_bear_entry(self):
+        self.assertEqual(get_bear_entry(SomeLocalBear, 0),
+                         {"name": "SomeLocalBear", "kind": 0})
+
+        class NoBear:
+            pass
+
+        self.assertEqual(get_bear_entry(NoBear, "kind"),
+                         {"name": "NoBear", "kind": "kind"})
+
+    def test_persistence(self):
+        index = BearIndex(self.index_file)
+        self.assertIsNone(index.get(self.bear_file))
+        index.update(self.bear_file,
+                     [(SomeLocalBear, 0), (SomeGlobalBear, 1)])
+        index.save()
+
+        entries = BearIndex(self.index_file).get(self.bear_file)
+        self.assertEqual([(entry["name"], entry["kind"])
+                          for entry in entries],
+                         [("SomeLocalBear", 0), ("SomeGlobalBear", 1)])
+
+        index = BearIndex(self.index_file)
+        index.update(self.bear_file, [])
+        index.save()
+        self.assertEqual(BearIndex(self.index_file).get(self.bear_file), [])
+
+    def test_invalidation(self):
+        index = BearIndex(self.index_file)
+        index.update(self.bear_file, [(SomeLocalBear, 0)])
+        self.assertIsNotNone(index.get(self.bear_file))
+
+        with open(self.bear_file, "a") as file:
+            file.write("# more bears\n")
+        self.assertIsNone(index.get(self.bear_file))
+
+        index.update(self.bear_file, [(SomeLocalBear, 0)])
+        self.assertIsNotNone(index.get(self.bear_file))
+        os.remove(self.bear_file)
+        self.assertIsNone(index.get(self.bear_file))
+
+    def test_save_prunes_missing_files(self):
+        other_file = os.path.join(self.directory.name, "OtherBear.py")
+        with open(other_file, "w") as file:
+            file.write("# other bears\n")
+
+        index = BearIndex(self.index_file)
+        index.update(self.bear_file, [(SomeLocalBear, 0)])
+        index.update(other_file, [(SomeGlobalBear, 1)])
+        index.save()
+
+        os.remove(other_file)
+        index = BearIndex(self.index_file)
+        index.update(self.bear_file, [(SomeLocalBear, 0)])
+        index.save()
+
+        with open(self.index_file, encoding="utf-8") as file:
+            entries = json.load(file)["entries"]
+        self.assertEqual(list(entries), [self.bear_file])
+
+    def test_unsupported_kind(self):
+        index = BearIndex(self.index_file)
+        index.update(self.bear_file, [(SomeLocalBear, object())])
+        self.assertIsNone(index.get(self.bear_file))
+
+    def test_invalid_file(self):
+        os.makedirs(os.path.dirname(self.index_file))
+        for content in ("no json", "[]", '{"version": 0, "entries": {}}'):
+            with open(self.index_file, "w") as file:
+                file.write(content)
+            self.assertIsNone(BearIndex(self.index_file).get(self.bear_file))
+
+    def test_save_unchanged(self):
+        BearIndex(self.index_file).save()
+        self.assertFalse(os.path.exists(self.index_file))
+
+    def test_save_failure(self):
+        # The index path is an existing file, so the directory can't be
+        # created.
+        index = BearIndex(os.path.join(self.bear_file, "bear_index.json"))
+        index.update(self.bear_file, [])
+        index.save()
+        self.assertEqual(os.listdir(self.directory.name), ["SomeBear.py"])
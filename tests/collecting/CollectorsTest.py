@@ -1,15 +1,20 @@
 import os
 import pkg_resources
+import tempfile
 import unittest
+import unittest.mock
 
 from pyprint.ConsolePrinter import ConsolePrinter
 
+from coalib.collecting import Collectors
 from coalib.collecting.Collectors import (
     collect_all_bears_from_sections, collect_bears, collect_dirs, collect_files,
     collect_registered_bears_dirs, filter_section_bears_by_languages,
     get_all_bears_names)
+from coalib.misc import Constants
 from coalib.misc.ContextManagers import retrieve_stdout
 from coalib.output.printers.LogPrinter import LogPrinter
+from coalib.parsing import Globbing
 from coalib.settings.Section import Section
 from tests.TestUtilities import bear_test_module
 
@@ -91,6 +96,64 @@ class CollectFilesTest(unittest.TestCase):
                                            "py_files",
                                            "file2.py"))])
 
+    def test_pruned_dirs(self):
+        others = os.path.join(self.collectors_test_dir, "others")
+        with unittest.mock.patch("coalib.parsing.Globbing._scan_dir",
+                                 wraps=Globbing._scan_dir) as scan_dir:
+            self.assertEqual(
+                sorted(collect_files([os.path.join(others, "**")],
+                                     self.log_printer,
+                                     ignored_file_paths=[
+                                         os.path.join(others, "py_files",
+                                                      "**")])),
+                sorted(collect_files([os.path.join(others, "**")],
+                                     self.log_printer,
+                                     ignored_file_paths=[
+                                         os.path.join(others, "py_files",
+                                                      "*")])))
+            scanned_dirs = [call[0][0] for call in scan_dir.call_args_list]
+        # The contents of the ignored directory are not searched for the
+        # first call, only for the second.
+        self.assertEqual(scanned_dirs.count(os.path.join(others,
+                                                         "py_files")),
+                         1)
+
+    def test_walk_threads(self):
+        self.assertEqual(
+            sorted(collect_files([os.path.join(self.collectors_test_dir,
+                                               "**", "*.py")],
+                                 self.log_printer,
+                                 walk_threads=2)),
+            sorted(collect_files([os.path.join(self.collectors_test_dir,
+                                               "**", "*.py")],
+                                 self.log_printer)))
+
+    def test_changed_files(self):
+        others = os.path.join(self.collectors_test_dir, "others")
+        changed_files = {os.path.normcase(os.path.join(others, name))
+                         for name in (os.path.join("py_files", "file1.py"),
+                                      os.path.join("py_files", "file2.py"),
+                                      os.path.join("c_files", "file1.c"),
+                                      "deleted.py")}
+        with retrieve_stdout() as sio:
+            self.assertEqual(
+                collect_files([os.path.join(others, "**.py"),
+                               os.path.join(others, "nothing_here")],
+                              self.log_printer,
+                              ignored_file_paths=[
+                                  os.path.join(others, "**", "file1.py")],
+                              changed_files=changed_files),
+                [os.path.normcase(os.path.join(others,
+                                               "py_files",
+                                               "file2.py"))])
+            # Globs not matching changed files are fine.
+            self.assertEqual(sio.getvalue(), "")
+
+        self.assertEqual(collect_files([],
+                                       self.log_printer,
+                                       changed_files=changed_files),
+                         [])
+
 
 class CollectDirsTest(unittest.TestCase):
 
@@ -269,6 +332,34 @@ class CollectBearsTest(unittest.TestCase):
         self.assertEqual(len(local_bears['test_section']), 2)
         self.assertEqual(len(global_bears['test_section']), 2)
 
+    def test_bear_index(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                unittest.mock.patch.object(
+                    Constants, "BEAR_INDEX_FILE",
+                    os.path.join(directory, "bear_index.json")), \
+                unittest.mock.patch(
+                    "coalib.collecting.Collectors._import_bears",
+                    wraps=Collectors._import_bears) as import_bears:
+            bear_dirs = [os.path.join(self.collectors_test_dir, "bears")]
+            self.assertEqual(len(collect_bears(bear_dirs,
+                                               ["bear1", "bear2"],
+                                               ["kind"],
+                                               self.log_printer)[0]), 2)
+            self.assertEqual(import_bears.call_count, 2)
+
+            # Files known to have no bears of the kinds aren't imported.
+            self.assertEqual(collect_bears(bear_dirs,
+                                           ["bear1", "bear2"],
+                                           ["other_kind"],
+                                           self.log_printer), ([],))
+            self.assertEqual(import_bears.call_count, 2)
+
+            self.assertEqual(len(collect_bears(bear_dirs,
+                                               ["bear2"],
+                                               ["kind"],
+                                               self.log_printer)[0]), 1)
+            self.assertEqual(import_bears.call_count, 3)
+
 
 class CollectorsTests(unittest.TestCase):
 
@@ -304,3 +395,15 @@ class CollectorsTests(unittest.TestCase):
                  'LineCountTestBear',
                  'JavaTestBear',
                  'SpaceConsistencyTestBear'})
+
+    def test_get_all_bears_names_from_index(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                unittest.mock.patch.object(
+                    Constants, "BEAR_INDEX_FILE",
+                    os.path.join(directory, "bear_index.json")), \
+                bear_test_module():
+            names = get_all_bears_names()
+            with unittest.mock.patch(
+                    "coalib.collecting.Collectors._import_bears") as import_fn:
+                self.assertEqual(get_all_bears_names(), names)
+                self.assertFalse(import_fn.called)
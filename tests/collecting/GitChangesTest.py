@@ -0,0 +1,107 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from pyprint.NullPrinter import NullPrinter
+
+from coalib.collecting.Collectors import collect_files
+from coalib.collecting.GitChanges import get_changed_files
+from coalib.output.printers.LogPrinter import LogPrinter
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed.")
+class GitChangesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.log_printer = LogPrinter(NullPrinter())
+        self.repo = tempfile.TemporaryDirectory()
+        self.directory = os.path.realpath(self.repo.name)
+        self.git("init", "-q")
+        self.git("config", "user.name", "coala")
+        self.git("config", "user.email", "coala@example.com")
+        for name in ("unchanged", "changed", "staged", "deleted"):
+            self.write(name)
+        self.write(".gitignore", "ignored\n")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "Initial commit")
+
+    def tearDown(self):
+        self.repo.cleanup()
+
+    def git(self, *args):
+        subprocess.check_call(("git",) + args,
+                              cwd=self.directory,
+                              stdout=subprocess.DEVNULL)
+
+    def write(self, name, contents="contents\n"):
+        with open(os.path.join(self.directory, name), "w") as file:
+            file.write(contents)
+
+    def get_names(self, changed_files):
+        return sorted(os.path.relpath(path, self.directory)
+                      for path in changed_files)
+
+    def test_changes(self):
+        self.assertEqual(get_changed_files(self.log_printer,
+                                           directory=self.directory),
+                         set())
+
+        self.write("changed", "new contents\n")
+        self.write("staged", "new contents\n")
+        self.git("add", "staged")
+        os.remove(os.path.join(self.directory, "deleted"))
+        self.write("untracked")
+        self.write("ignored")
+        self.assertEqual(
+            self.get_names(get_changed_files(self.log_printer,
+                                             directory=self.directory)),
+            ["changed", "deleted", "staged", "untracked"])
+
+        self.git("commit", "-q", "-a", "-m", "Second commit")
+        self.assertEqual(
+            self.get_names(get_changed_files(self.log_printer,
+                                             "HEAD~1",
+                                             self.directory)),
+            ["changed", "deleted", "staged", "untracked"])
+
+    def test_subdirectory(self):
+        # Changes outside of the given directory are found too, e.g. files
+        # reached by a ``../`` glob.
+        os.mkdir(os.path.join(self.directory, "sub"))
+        self.write(os.path.join("sub", "file"))
+        self.write("changed", "new contents\n")
+        self.assertEqual(
+            self.get_names(get_changed_files(
+                self.log_printer,
+                directory=os.path.join(self.directory, "sub"))),
+            ["changed", os.path.join("sub", "file")])
+
+    def test_symlinked_directory(self):
+        link_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(link_directory.cleanup)
+        link = os.path.join(link_directory.name, "link")
+        try:
+            os.symlink(self.directory, link)
+        except (OSError, NotImplementedError):
+            self.skipTest("Symlinks are not supported.")
+
+        self.write("changed", "new contents\n")
+        changed_files = get_changed_files(self.log_printer, directory=link)
+        self.assertEqual(self.get_names(changed_files), ["changed"])
+        self.assertEqual(collect_files([os.path.join(link, "*")],
+                                       self.log_printer,
+                                       changed_files=changed_files),
+                         [os.path.normcase(os.path.join(link, "changed"))])
+
+    def test_invalid_ref(self):
+        self.assertIsNone(get_changed_files(self.log_printer,
+                                            "does_not_exist",
+                                            self.directory))
+
+        # Refs must not be taken as options of git.
+        self.assertIsNone(get_changed_files(self.log_printer,
+                                            "--output=out",
+                                            self.directory))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "out")))
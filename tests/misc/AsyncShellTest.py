@@ -0,0 +1,60 @@
+import sys
+import threading
+import time
+import unittest
+
+try:
+    from coalib.misc.AsyncShell import run_shell_commands
+except ImportError:  # pragma: no cover
+    # asyncio is only available from Python 3.4 on.
+    pass
+
+
+@unittest.skipIf(sys.version_info < (3, 4),
+                 "AsyncShell needs Python 3.4 or later.")
+class RunShellCommandsTest(unittest.TestCase):
+
+    @staticmethod
+    def python_command(code):
+        return sys.executable, "-c", code
+
+    def test_stdin_and_stderr(self):
+        command = self.python_command(
+            "import sys; sys.stderr.write(sys.stdin.read().upper())")
+        self.assertEqual(run_shell_commands([command, command], stdin="x\n"),
+                         [("", "X\n"), ("", "X\n")])
+
+    def test_concurrency(self):
+        commands = [self.python_command("import time; time.sleep(0.5)")] * 4
+
+        start = time.time()
+        self.assertEqual(run_shell_commands(commands, max_concurrency=4),
+                         [("", "")] * 4)
+        self.assertLess(time.time() - start, 1.5)
+
+        start = time.time()
+        run_shell_commands(commands[:2], max_concurrency=1)
+        self.assertGreaterEqual(time.time() - start, 1)
+
+    def test_timeout(self):
+        outputs = run_shell_commands(
+            [self.python_command("import time; time.sleep(10)"),
+             self.python_command("print('done')")],
+            timeout=0.5)
+        self.assertIsInstance(outputs[0], TimeoutError)
+        self.assertEqual(outputs[1], ("done\n", ""))
+
+    def test_other_thread(self):
+        outputs = []
+        thread = threading.Thread(
+            target=lambda: outputs.extend(run_shell_commands(
+                [self.python_command("print('a')"),
+                 ["this-executable-does-not-exist"],
+                 self.python_command("import time; time.sleep(10)")],
+                timeout=0.5)))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(outputs[0], ("a\n", ""))
+        self.assertIsInstance(outputs[1], OSError)
+        self.assertIsInstance(outputs[2], TimeoutError)
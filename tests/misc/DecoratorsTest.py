@@ -1,8 +1,11 @@
+import pickle
 import unittest
+from unittest.mock import patch
 
+from coalib.misc import Decorators
 from coalib.misc.Decorators import (
     arguments_to_lists, enforce_signature, generate_eq, generate_ordering,
-    generate_repr, yield_once)
+    generate_repr, generate_slots_state, yield_once)
 
 
 class YieldOnceTest(unittest.TestCase):
@@ -248,6 +251,20 @@ class GenerateEqTest(unittest.TestCase):
 
         self.assertNotEqual(TestClass(), Derived())
         self.assertNotEqual(Derived(), TestClass())
+        self.assertEqual(TestClass(), TestClass())
+
+    def test_non_identifier_member(self):
+        @generate_eq("not an identifier", "class")
+        class TestClass:
+            pass
+
+        first, second = TestClass(), TestClass()
+        for uut in (first, second):
+            setattr(uut, "not an identifier", 1)
+            setattr(uut, "class", 2)
+        self.assertEqual(first, second)
+        setattr(second, "class", 3)
+        self.assertNotEqual(first, second)
 
 
 class GenerateOrderingTest(unittest.TestCase):
@@ -290,6 +307,58 @@ class GenerateOrderingTest(unittest.TestCase):
         self.assertLess(lesser, greater)
 
 
+@generate_slots_state
+class SlotsClass:
+    __slots__ = ("a", "b")
+
+    def __init__(self, a):
+        self.a = a
+
+
+class SlotsSubclass(SlotsClass):
+    __slots__ = "c"
+
+
+class DictSubclass(SlotsClass):
+    pass
+
+
+class GenerateSlotsStateTest(unittest.TestCase):
+
+    def test_state(self):
+        uut = SlotsSubclass(1)
+        uut.b = 2
+        uut.c = 3
+        self.assertEqual(uut.__getstate__(), (1, 2, 3))
+
+        # Unset slots are left out.
+        self.assertEqual(SlotsClass(1).__getstate__(), {"a": 1})
+
+        uut = DictSubclass(1)
+        uut.b = 2
+        uut.d = 4
+        self.assertEqual(uut.__getstate__(), (1, 2, {"d": 4}))
+
+    def test_legacy_state(self):
+        uut = SlotsSubclass.__new__(SlotsSubclass)
+        uut.__setstate__({"a": 1, "c": 3})
+        self.assertEqual((uut.a, uut.c), (1, 3))
+        self.assertFalse(hasattr(uut, "b"))
+
+    def test_pickle(self):
+        uut = SlotsSubclass(1)
+        uut.b = 2
+        uut.c = 3
+        unpickled = pickle.loads(pickle.dumps(uut))
+        self.assertEqual((unpickled.a, unpickled.b, unpickled.c), (1, 2, 3))
+
+        uut = DictSubclass(1)
+        uut.d = 4
+        unpickled = pickle.loads(pickle.dumps(uut))
+        self.assertEqual((unpickled.a, unpickled.d), (1, 4))
+        self.assertFalse(hasattr(unpickled, "b"))
+
+
 class EnforceSignatureTest(unittest.TestCase):
 
     def test_enforce_kwargs(self):
@@ -318,3 +387,55 @@ class EnforceSignatureTest(unittest.TestCase):
 
         test_function(4, "t")
         test_function(None, "t", "anything", "test")
+
+    def test_enforce_defaults(self):
+        @enforce_signature
+        def test_function(a: int=None, *args, b: str=None, **kwargs):
+            return a, args, b, kwargs
+
+        self.assertEqual(test_function(), (None, (), None, {}))
+        self.assertEqual(test_function(1, 2, b="b", c=3),
+                         (1, (2,), "b", {"c": 3}))
+        self.assertEqual(test_function(a=1), (1, (), None, {}))
+
+        with self.assertRaises(TypeError):
+            test_function(None)
+        with self.assertRaises(TypeError):
+            test_function(b=None)
+        with self.assertRaises(TypeError):
+            test_function(1, 2, 3, b=4)
+
+    def test_enforce_keyword_only(self):
+        @enforce_signature
+        def test_function(a, *, b: (int, "value"), c=3):
+            return a, b, c
+
+        self.assertEqual(test_function(1, b=2), (1, 2, 3))
+        self.assertEqual(test_function(1, b="value", c=4), (1, "value", 4))
+
+        with self.assertRaises(TypeError):
+            test_function(1, b="other")
+        with self.assertRaises(TypeError):
+            test_function(1, 2)
+
+    def test_enforce_helper_names(self):
+        @enforce_signature
+        def test_function(_function: int,
+                          isinstance: int=1,
+                          _coala_missing: str=None,
+                          _types_0="value"):
+            return _function, isinstance, _coala_missing, _types_0
+
+        self.assertEqual(test_function(1), (1, 1, None, "value"))
+        self.assertEqual(test_function(1, 2, "a", 3), (1, 2, "a", 3))
+        with self.assertRaises(TypeError):
+            test_function("a")
+        with self.assertRaises(TypeError):
+            test_function(1, _coala_missing=None)
+
+    def test_disabled(self):
+        def test_function(a: int):
+            return a
+
+        with patch.object(Decorators, "ENFORCE_SIGNATURE", False):
+            self.assertIs(enforce_signature(test_function), test_function)
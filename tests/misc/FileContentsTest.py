@@ -0,0 +1,78 @@
+import pickle
+import random
+import unittest
+
+from coalib.misc.FileContents import FileContents
+from coalib.results.AbsolutePosition import calc_line_col
+
+
+class FileContentsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lines = ("first\n", "\n", "third\n", "last")
+        self.uut = FileContents(self.lines)
+
+    def test_sequence(self):
+        self.assertEqual(len(self.uut), 4)
+        self.assertEqual(tuple(self.uut), self.lines)
+        self.assertEqual(list(reversed(self.uut)), list(reversed(self.lines)))
+        for index in range(-4, 4):
+            self.assertEqual(self.uut[index], self.lines[index])
+        self.assertEqual(self.uut[1:3], self.lines[1:3])
+        self.assertEqual(self.uut[::-2], self.lines[::-2])
+        self.assertEqual(self.uut[10:], ())
+        self.assertIn("third\n", self.uut)
+        self.assertEqual(self.uut.index("last"), 3)
+
+        with self.assertRaises(IndexError):
+            self.uut[4]
+        with self.assertRaises(IndexError):
+            self.uut[-5]
+        with self.assertRaises(TypeError):
+            self.uut[0] = "changed\n"
+
+        self.assertEqual(len(FileContents()), 0)
+        self.assertEqual(tuple(FileContents(iter(self.lines))), self.lines)
+
+    def test_from_text(self):
+        self.assertEqual(FileContents.from_text(self.uut.text), self.uut)
+        self.assertEqual(FileContents.from_text(""), ())
+        self.assertEqual(FileContents.from_text("\n"), ("\n",))
+        self.assertEqual(FileContents.from_text("a\n\n"), ("a\n", "\n"))
+
+    def test_equality(self):
+        self.assertEqual(self.uut, self.lines)
+        self.assertEqual(self.lines, self.uut)
+        self.assertEqual(self.uut, FileContents(self.lines))
+        self.assertNotEqual(self.uut, self.lines[:-1])
+        self.assertNotEqual(self.uut, FileContents(("first\nlast",)))
+        self.assertNotEqual(self.uut, list(self.lines))
+        self.assertEqual(hash(self.uut), hash(self.lines))
+        self.assertEqual({self.lines: 1}[self.uut], 1)
+
+    def test_concatenation(self):
+        self.assertEqual(self.uut[:1] + self.uut + ("added",),
+                         self.lines[:1] + self.lines + ("added",))
+        self.assertEqual(self.uut + self.uut, self.lines + self.lines)
+        with self.assertRaises(TypeError):
+            self.uut + ["added"]
+
+    def test_pickle(self):
+        unpickled = pickle.loads(pickle.dumps(self.uut))
+        self.assertIsInstance(unpickled, FileContents)
+        self.assertEqual(unpickled, self.uut)
+
+    def test_get_line_col(self):
+        rand = random.Random(0)
+        for i in range(50):
+            lines = tuple("x" * rand.randint(0, 5) + "\n"
+                          for i in range(rand.randint(1, 10)))
+            file = FileContents(lines)
+            for position in range(len(file.text)):
+                self.assertEqual(file.get_line_col(position),
+                                 calc_line_col(lines, position))
+
+        with self.assertRaises(ValueError):
+            self.uut.get_line_col(len(self.uut.text))
+        with self.assertRaises(ValueError):
+            self.uut.get_line_col(-1)
@@ -4,7 +4,9 @@ import sys
 from tempfile import NamedTemporaryFile
 import unittest
 
-from coalib.misc.Shell import run_interactive_shell_command, run_shell_command
+from coalib.misc.Shell import (
+    run_interactive_shell_command, run_shell_command,
+    run_shell_commands_sequentially)
 
 
 class RunShellCommandTest(unittest.TestCase):
@@ -91,3 +93,15 @@ class RunShellCommandTest(unittest.TestCase):
     def test_run_shell_command_kwargs_delegation(self):
         with self.assertRaises(TypeError):
             run_shell_command("super-cool-command", weird_parameter2="abc")
+
+    def test_run_shell_commands_sequentially(self):
+        outputs = run_shell_commands_sequentially(
+            [(sys.executable, "-c", "import sys; print(sys.stdin.read())"),
+             ["this-executable-does-not-exist"],
+             (sys.executable, "-c", "import time; time.sleep(10)")],
+            stdin="a",
+            timeout=0.5)
+
+        self.assertEqual(outputs[0], ("a\n", ""))
+        self.assertIsInstance(outputs[1], OSError)
+        self.assertIsInstance(outputs[2], TimeoutError)
@@ -310,7 +310,6 @@ class ConsoleInteractionTest(unittest.TestCase):
             OpenEditorAction.is_applicable = staticmethod(lambda *args: True)
 
             patch_result = Result("origin", "msg", diffs={testfile_path: diff})
-            patch_result.file = "f_b"
 
             print_result(self.console_printer,
                          self.log_printer,
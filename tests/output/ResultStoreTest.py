@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from coalib.output.ResultStore import (
+    get_fingerprint, MAX_QUERY_PARAMETERS, ResultStore)
+from coalib.results.Result import RESULT_SEVERITY, Result
+
+
+class ResultStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "store")
+        self.results = [
+            Result.from_values("ABear", "a", "f", 1,
+                               severity=RESULT_SEVERITY.INFO),
+            Result.from_values("ABear", "a", "g", 1,
+                               severity=RESULT_SEVERITY.MAJOR),
+            Result.from_values("BBear", "b", "f", 2),
+            Result("BBear", "no code")]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertResultsEqual(self, results, expected):
+        self.assertEqual(
+            {section: [result.id for result in section_results]
+             for section, section_results in results.items()},
+            {section: [result.id for result in section_results]
+             for section, section_results in expected.items()})
+
+    def test_add_and_get_results(self):
+        with ResultStore(self.path) as store:
+            store.add_results("first", self.results[:2])
+            store.add_results("second", self.results[2:])
+            store.add_results("first", self.results[3:])
+            store.add_results("empty", [])
+
+        with ResultStore(self.path) as store:
+            results = store.get_results()
+            self.assertEqual(list(results), ["first", "second", "empty"])
+            self.assertResultsEqual(results,
+                                    {"first": self.results[:2] +
+                                              self.results[3:],
+                                     "second": self.results[2:],
+                                     "empty": []})
+            self.assertEqual(results["first"][0], self.results[0])
+
+            self.assertResultsEqual(store.get_results(section_name="second"),
+                                    {"second": self.results[2:]})
+            self.assertResultsEqual(
+                store.get_results(file=self.results[0].affected_code[0].file),
+                {"first": self.results[:1],
+                 "second": self.results[2:3],
+                 "empty": []})
+            self.assertResultsEqual(
+                store.get_results(origin="ABear",
+                                  min_severity=RESULT_SEVERITY.NORMAL),
+                {"first": self.results[1:2], "second": [], "empty": []})
+
+    def test_get_new_results(self):
+        moved_result = Result.from_values("ABear", "a", "f", 10,
+                                          severity=RESULT_SEVERITY.INFO)
+        duplicate_result = Result.from_values("ABear", "a", "f", 20,
+                                              severity=RESULT_SEVERITY.INFO)
+        new_result = Result.from_values("CBear", "c", "f", 1)
+        with ResultStore(":memory:") as base, \
+                ResultStore(":memory:") as store:
+            base.add_results("first", self.results[:2])
+            base.add_results("second", self.results[2:])
+            store.add_results("first", [moved_result,
+                                        duplicate_result,
+                                        new_result])
+            # Results are only compared within their section.
+            store.add_results("second", self.results[:1])
+
+            self.assertResultsEqual(store.get_new_results(base),
+                                    {"first": [duplicate_result, new_result],
+                                     "second": self.results[:1]})
+            self.assertResultsEqual(base.get_new_results(base),
+                                    {"first": [], "second": []})
+
+    def test_get_new_results_many(self):
+        results = [Result("Bear", str(i)) for i in range(
+            MAX_QUERY_PARAMETERS * 2 + 1)]
+        with ResultStore(":memory:") as base, \
+                ResultStore(":memory:") as store:
+            store.add_results("section", results)
+            self.assertResultsEqual(store.get_new_results(base),
+                                    {"section": results})
+
+    def test_fingerprint(self):
+        self.assertNotEqual(get_fingerprint(self.results[0]),
+                            get_fingerprint(self.results[1]))
+        self.assertNotEqual(get_fingerprint(Result("Bear", "a")),
+                            get_fingerprint(Result("Bear", "a",
+                                                   debug_msg="debug")))
+
+    def test_get_new_results_moved_project(self):
+        with ResultStore(":memory:", "/project") as base, \
+                ResultStore(":memory:", "/moved") as store:
+            base.add_results("section", [
+                Result.from_values("ABear", "a", "/project/f", 1)])
+            store.add_results("section", [
+                Result.from_values("ABear", "a", "/moved/f", 1),
+                Result.from_values("ABear", "a", "/moved/g", 1)])
+            new_results = store.get_new_results(base)
+
+        self.assertEqual([result.affected_code[0].file
+                          for result in new_results["section"]],
+                         ["/moved/g"])
+
+    def test_invalid_stores(self):
+        with ResultStore(self.path) as store:
+            store._connection.execute("PRAGMA user_version = 1000")
+        with self.assertRaisesRegex(ValueError, "version 1000"):
+            ResultStore(self.path)
+
+        with open(self.path, "wb") as file:
+            file.write(b"no database" * 100)
+        with self.assertRaises(sqlite3.DatabaseError):
+            ResultStore(self.path)
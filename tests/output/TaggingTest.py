@@ -1,11 +1,14 @@
 import os
+import pickle
 import unittest
 
 from pyprint.NullPrinter import NullPrinter
 
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.output.Tagging import (
-    delete_tagged_results, get_tag_path, load_tagged_results, tag_results)
+    create_tag, delete_tagged_results, diff_tagged_results, discard_tag,
+    get_tag_path, load_tagged_results, save_tag, tag_results)
+from coalib.results.Result import Result
 from tests.TestUtilities import raise_error
 
 
@@ -41,6 +44,119 @@ class TaggingTest(unittest.TestCase):
         results = load_tagged_results("None", "test_path", self.log_printer)
         self.assertEquals(results, None)
 
+    def test_save_and_discard_tag(self):
+        old_results = {"section": [Result("ABear", "old")]}
+        new_results = {"section": [Result("ABear", "new")]}
+        path = get_tag_path("test_tag_swap", "test_path", self.log_printer)
+        tags_dir = os.path.dirname(path)
+        try:
+            tag_results("test_tag_swap", "test_path", old_results,
+                        self.log_printer)
+            tag_files = os.listdir(tags_dir)
+
+            result_store = create_tag("test_tag_swap", "test_path",
+                                      self.log_printer)
+            result_store.add_results("section", new_results["section"])
+            self.assertEqual(load_tagged_results("test_tag_swap",
+                                                 "test_path",
+                                                 self.log_printer),
+                             old_results)
+            discard_tag(result_store)
+            self.assertEqual(os.listdir(tags_dir), tag_files)
+            self.assertEqual(load_tagged_results("test_tag_swap",
+                                                 "test_path",
+                                                 self.log_printer),
+                             old_results)
+
+            result_store = create_tag("test_tag_swap", "test_path",
+                                      self.log_printer)
+            result_store.add_results("section", new_results["section"])
+            save_tag(result_store, "test_tag_swap", "test_path",
+                     self.log_printer)
+            self.assertEqual(os.listdir(tags_dir), tag_files)
+            self.assertEqual(load_tagged_results("test_tag_swap",
+                                                 "test_path",
+                                                 self.log_printer),
+                             new_results)
+        finally:
+            delete_tagged_results("test_tag_swap",
+                                  "test_path",
+                                  self.log_printer)
+
+    def test_load_tagged_results_subsets(self):
+        results = {"a": [Result.from_values("ABear", "msg", "f", 1),
+                         Result.from_values("BBear", "msg", "g", 1)],
+                   "b": [Result("ABear", "msg")]}
+        try:
+            tag_results("test_tag_subsets", "test_path", results,
+                        self.log_printer)
+            self.assertEqual(load_tagged_results("test_tag_subsets",
+                                                 "test_path",
+                                                 self.log_printer),
+                             results)
+            self.assertEqual(load_tagged_results("test_tag_subsets",
+                                                 "test_path",
+                                                 self.log_printer,
+                                                 origin="ABear"),
+                             {"a": results["a"][:1], "b": results["b"]})
+            self.assertEqual(load_tagged_results("test_tag_subsets",
+                                                 "test_path",
+                                                 self.log_printer,
+                                                 section_name="b"),
+                             {"b": results["b"]})
+        finally:
+            delete_tagged_results("test_tag_subsets",
+                                  "test_path",
+                                  self.log_printer)
+
+        with self.assertRaises(FileNotFoundError):
+            load_tagged_results("test_tag_subsets",
+                                "test_path",
+                                self.log_printer)
+
+    def test_diff_tagged_results(self):
+        old_result = Result.from_values("ABear", "msg", "f", 1)
+        moved_result = Result.from_values("ABear", "msg", "f", 3)
+        new_result = Result.from_values("BBear", "msg", "f", 1)
+        try:
+            tag_results("test_tag_base", "test_path",
+                        {"section": [old_result]}, self.log_printer)
+            tag_results("test_tag_new", "test_path",
+                        {"section": [moved_result, new_result]},
+                        self.log_printer)
+            self.assertEqual(diff_tagged_results("test_tag_base",
+                                                 "test_tag_new",
+                                                 "test_path",
+                                                 self.log_printer),
+                             {"section": [new_result]})
+            self.assertIsNone(diff_tagged_results("None",
+                                                  "test_tag_new",
+                                                  "test_path",
+                                                  self.log_printer))
+            self.assertIsNone(diff_tagged_results("test_tag_base",
+                                                  "None",
+                                                  "test_path",
+                                                  self.log_printer))
+        finally:
+            for tag in ("test_tag_base", "test_tag_new"):
+                delete_tagged_results(tag, "test_path", self.log_printer)
+
+    def test_load_pickled_results(self):
+        results = {"section": [Result("ABear", "msg")]}
+        path = get_tag_path("test_tag_pickled", "test_path",
+                            self.log_printer)
+        try:
+            with open(path, "wb") as file:
+                pickle.dump(results, file)
+            self.assertEqual(load_tagged_results("test_tag_pickled",
+                                                 "test_path",
+                                                 self.log_printer),
+                             results)
+        finally:
+            delete_tagged_results("test_tag_pickled",
+                                  "test_path",
+                                  self.log_printer)
+
     def test_delete_tagged_results_no_file(self):
         path = get_tag_path("test_tag_del", "test_path", self.log_printer)
         none_path = get_tag_path("None", "test_path", self.log_printer)
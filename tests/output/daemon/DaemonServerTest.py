@@ -0,0 +1,94 @@
+import os
+import re
+import tempfile
+import threading
+import unittest
+from io import BytesIO
+
+from pyprint.NullPrinter import NullPrinter
+
+from coalib import coala_client
+from coalib.misc.ContextManagers import retrieve_stdout
+from coalib.output.daemon.DaemonServer import DaemonServer
+from coalib.output.daemon.Protocol import receive_messages, send_message
+from coalib.output.printers.LogPrinter import LogPrinter
+from tests.TestUtilities import bear_test_module
+
+
+class DaemonServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.python_file = os.path.join(self.directory.name, "a.py")
+        self.text_file = os.path.join(self.directory.name, "b.txt")
+        for filename in (self.python_file, self.text_file):
+            with open(filename, "w") as file:
+                file.write("#fixme\n")
+
+        with bear_test_module():
+            self.uut = DaemonServer(
+                arg_list=["-c", os.devnull,
+                          "-b", "LineCountTestBear",
+                          "-f", os.path.join(re.escape(self.directory.name),
+                                             "*.py"),
+                          "-j", "1"],
+                log_printer=LogPrinter(NullPrinter()))
+
+    def tearDown(self):
+        self.uut.close()
+        self.directory.cleanup()
+
+    def test_analyze(self):
+        messages = list(self.uut.analyze([self.python_file, self.text_file]))
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0]["section"], "default")
+        self.assertEqual(messages[0]["file"], self.python_file)
+        self.assertEqual([result.message
+                          for result in messages[0]["results"]],
+                         ["This file has 1 lines."])
+        self.assertEqual(messages[1], {"exitcode": 1})
+
+        # The bears are kept alive between requests.
+        self.assertEqual(list(self.uut.analyze([self.python_file]))[0]["file"],
+                         self.python_file)
+
+        self.assertEqual(list(self.uut.analyze([self.text_file])),
+                         [{"exitcode": 0}])
+
+    def test_handle_request(self):
+        rfile = BytesIO()
+        send_message(rfile, {"files": [self.python_file]})
+        rfile.seek(0)
+        wfile = BytesIO()
+        self.uut.handle_request(rfile, wfile)
+
+        wfile.seek(0)
+        messages = list(receive_messages(wfile))
+        self.assertEqual(messages[0]["results"][0]["message"],
+                         "This file has 1 lines.")
+        self.assertEqual(messages[-1], {"exitcode": 1})
+
+    def test_serve(self):
+        socket_path = os.path.join(self.directory.name, "socket")
+        server_thread = threading.Thread(target=self.uut.serve,
+                                         args=(socket_path,))
+        server_thread.start()
+        try:
+            while not os.path.exists(socket_path):
+                pass
+
+            with retrieve_stdout() as stdout:
+                retval = coala_client.main(["--socket", socket_path,
+                                            self.python_file])
+                self.assertEqual(retval, 1)
+                self.assertEqual(stdout.getvalue(),
+                                 "{}: INFO: LineCountTestBear: This file has "
+                                 "1 lines.\n".format(self.python_file))
+        finally:
+            self.assertEqual(coala_client.main(["--socket", socket_path,
+                                                "--shutdown"]),
+                             0)
+            server_thread.join()
+
+        self.assertFalse(os.path.exists(socket_path))
+        self.assertEqual(coala_client.main(["--socket", socket_path]), 2)
@@ -20,7 +20,7 @@ import unittest
 
 from coalib.parsing.Globbing import (
     _iter_alternatives, _iter_choices, _position_is_bracketed, fnmatch, glob,
-    glob_escape)
+    glob_escape, GlobMatcher, translate)
 
 
 class TestFiles:
@@ -211,6 +211,46 @@ class FnmatchTest(unittest.TestCase):
         self._test_fnmatch(pattern, matches, non_matches)
 
 
+class GlobMatcherTest(unittest.TestCase):
+
+    def test_literal_suffix(self):
+        matcher = GlobMatcher(["**.x", os.path.join("**", "*.py")])
+        self.assertTrue(matcher.match("a.x"))
+        self.assertTrue(matcher.match(os.path.join("a", "b.py")))
+        self.assertTrue(matcher.match(os.path.join("a", "b", ".py")))
+        self.assertFalse(matcher.match("b.py"))
+        self.assertFalse(matcher.match(os.path.join("a", "b.pyc")))
+
+    def test_literal_infix(self):
+        matcher = GlobMatcher(os.path.join("**", "build", "**"))
+        self.assertTrue(matcher.match(os.path.join("a", "build", "b.py")))
+        self.assertFalse(matcher.match(os.path.join("a", "build")))
+        self.assertFalse(matcher.match(os.path.join("a", "builds", "b")))
+
+    def test_merged_patterns(self):
+        patterns = ["a*b",
+                    "(c|d)?",
+                    "[!x]y",
+                    os.path.join("**", "e", "*"),
+                    "**.py",
+                    "**f**",
+                    os.path.join("g", "**", "*.h")]
+        names = ["ab", "axb", os.path.join("a", "b"), "cz", "dz", "c",
+                 "zy", "xy", os.path.join("e", "z"),
+                 os.path.join("x", "e", "z"), os.path.join("x", "e", "z", "w"),
+                 "a.py", "a.pyc", "xfx", os.path.join("g", "z", "a.h"),
+                 os.path.join("g", "a.h"), os.path.join("z", "g", "z", "a.h")]
+        matcher = GlobMatcher(patterns)
+        for name in names:
+            expected = any(re.match(translate(alternative), name) is not None
+                           for pattern in patterns
+                           for alternative in _iter_alternatives(pattern))
+            self.assertEqual(matcher.match(name), expected, name)
+
+    def test_translate_double_asterisk(self):
+        self.assertEqual(translate("a**b"), "a.*b\\Z(?ms)")
+
+
 class GlobTest(unittest.TestCase):
 
     def setUp(self):
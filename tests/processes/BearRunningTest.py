@@ -1,4 +1,3 @@
-import multiprocessing
 import queue
 import unittest
 
@@ -6,6 +5,7 @@ from coalib.bears.GlobalBear import GlobalBear
 from coalib.bears.LocalBear import LocalBear
 from coalib.processes.BearRunning import (
     LOG_LEVEL, LogMessage, run, send_msg, task_done)
+from coalib.processes.BearScheduler import BearScheduler
 from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
 from coalib.results.Result import RESULT_SEVERITY, Result
 from coalib.settings.Section import Section
@@ -117,14 +117,10 @@ class BearRunningUnitTest(unittest.TestCase):
     def setUp(self):
         self.settings = Section("name")
 
-        self.file_name_queue = queue.Queue()
+        self.task_queue = queue.Queue()
         self.local_bear_list = []
         self.global_bear_list = []
-        self.global_bear_queue = queue.Queue()
         self.file_dict = {}
-        manager = multiprocessing.Manager()
-        self.local_result_dict = manager.dict()
-        self.global_result_dict = manager.dict()
         self.message_queue = queue.Queue()
         self.control_queue = queue.Queue()
 
@@ -158,21 +154,42 @@ class BearRunningUnitTest(unittest.TestCase):
         self.global_bear_list.append(DependentGlobalBear({},
                                                          self.settings,
                                                          self.message_queue))
-        self.global_bear_queue.put(1)
-        self.global_bear_queue.put(0)
-        self.file_name_queue.put("t")
         self.file_dict["t"] = []
+        scheduler = BearScheduler(self.task_queue,
+                                  self.file_dict.keys(),
+                                  self.global_bear_list)
+        scheduler.start()
+        self.task_queue.put(None)
 
-        run(self.file_name_queue,
+        run(self.task_queue,
             self.local_bear_list,
             self.global_bear_list,
-            self.global_bear_queue,
             self.file_dict,
-            self.local_result_dict,
-            self.global_result_dict,
             self.message_queue,
             self.control_queue)
 
+        # The dependent global bear is scheduled once the results of its
+        # dependency arrived.
+        control_elem, (bearname, results) = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.GLOBAL)
+        self.assertEqual(bearname, "SimpleGlobalBear")
+        control_elem, [(filename, _)] = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL)
+        self.assertEqual(filename, "t")
+        scheduler.global_done(bearname, results)
+        self.task_queue.put(None)
+
+        run(self.task_queue,
+            self.local_bear_list,
+            self.global_bear_list,
+            self.file_dict,
+            self.message_queue,
+            self.control_queue)
+
+        control_elem, (bearname, results) = self.control_queue.get(timeout=0)
+        self.assertEqual(bearname, "DependentGlobalBear")
+        self.assertEqual(results, [])
+
         try:
             while True:
                 msg = self.message_queue.get(timeout=0)
@@ -183,16 +200,14 @@ class BearRunningUnitTest(unittest.TestCase):
     def test_evil_bear(self):
         self.local_bear_list.append(EvilBear(self.settings,
                                              self.message_queue))
-        self.file_name_queue.put("t")
+        self.task_queue.put((CONTROL_ELEMENT.LOCAL, "t"))
+        self.task_queue.put(None)
         self.file_dict["t"] = []
 
-        run(self.file_name_queue,
+        run(self.task_queue,
             self.local_bear_list,
             self.global_bear_list,
-            self.global_bear_queue,
             self.file_dict,
-            self.local_result_dict,
-            self.global_result_dict,
             self.message_queue,
             self.control_queue)
 
@@ -201,16 +216,14 @@ class BearRunningUnitTest(unittest.TestCase):
                                                     self.message_queue))
         self.local_bear_list.append(UnexpectedBear2(self.settings,
                                                     self.message_queue))
-        self.file_name_queue.put("t")
+        self.task_queue.put((CONTROL_ELEMENT.LOCAL, "t"))
+        self.task_queue.put(None)
         self.file_dict["t"] = []
 
-        run(self.file_name_queue,
+        run(self.task_queue,
             self.local_bear_list,
             self.global_bear_list,
-            self.global_bear_queue,
             self.file_dict,
-            self.local_result_dict,
-            self.global_result_dict,
             self.message_queue,
             self.control_queue)
 
@@ -234,23 +247,19 @@ d
     def setUp(self):
         self.settings = Section("name")
 
-        self.file_name_queue = queue.Queue()
+        self.task_queue = queue.Queue()
         self.local_bear_list = []
         self.global_bear_list = []
-        self.global_bear_queue = queue.Queue()
         self.file_dict = {}
-        manager = multiprocessing.Manager()
-        self.local_result_dict = manager.dict()
-        self.global_result_dict = manager.dict()
         self.message_queue = queue.Queue()
         self.control_queue = queue.Queue()
 
         self.file1 = "file1"
         self.file2 = "arbitrary"
 
-        self.file_name_queue.put(self.file1)
-        self.file_name_queue.put(self.file2)
-        self.file_name_queue.put("invalid file")
+        self.task_queue.put((CONTROL_ELEMENT.LOCAL, self.file1))
+        self.task_queue.put((CONTROL_ELEMENT.LOCAL, self.file2))
+        self.task_queue.put((CONTROL_ELEMENT.LOCAL, "invalid file"))
         self.local_bear_list.append(LocalTestBear(self.settings,
                                                   self.message_queue))
         self.local_bear_list.append("not a valid bear")
@@ -260,17 +269,15 @@ d
                                                     self.settings,
                                                     self.message_queue))
         self.global_bear_list.append("not a valid bear")
-        self.global_bear_queue.put(0)
-        self.global_bear_queue.put(1)
+        self.task_queue.put((CONTROL_ELEMENT.GLOBAL, (0, None)))
+        self.task_queue.put((CONTROL_ELEMENT.GLOBAL, (1, None)))
+        self.task_queue.put(None)
 
     def test_run(self):
-        run(self.file_name_queue,
+        run(self.task_queue,
             self.local_bear_list,
             self.global_bear_list,
-            self.global_bear_queue,
             self.file_dict,
-            self.local_result_dict,
-            self.global_result_dict,
             self.message_queue,
             self.control_queue)
 
@@ -292,10 +299,11 @@ d
                                                      "something went wrong",
                                                      'arbitrary')]
                                  ]
-        for expected in local_result_expected:
-            control_elem, index = self.control_queue.get()
-            self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL)
-            real = self.local_result_dict[index]
+        control_elem, batch = self.control_queue.get()
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL)
+        self.assertEqual([filename for filename, _ in batch],
+                         [self.file1, self.file2])
+        for (_, real), expected in zip(batch, local_result_expected):
             self.assertEqual(real, expected)
 
         global_results_expected = [Result.from_values(
@@ -309,20 +317,16 @@ d
                                        "arbitrary",
                                        severity=RESULT_SEVERITY.INFO)]
 
-        control_elem, index = self.control_queue.get()
-        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL_FINISHED)
-        control_elem, index = self.control_queue.get()
+        control_elem, (bearname, real) = self.control_queue.get()
         self.assertEqual(control_elem, CONTROL_ELEMENT.GLOBAL)
-        real = self.global_result_dict[index]
+        self.assertEqual(bearname, "GlobalTestBear")
         self.assertEqual(sorted(global_results_expected), sorted(real))
 
-        control_elem, none = self.control_queue.get(timeout=0)
-        self.assertEqual(control_elem, CONTROL_ELEMENT.GLOBAL_FINISHED)
-        self.assertEqual(none, None)
+        # The invalid bear is reported as well for dependency resolution
+        control_elem, (bearname, real) = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.GLOBAL)
+        self.assertEqual(bearname, "str")
+        self.assertIsNone(real)
 
-        # The invalid bear gets a None in that dict for dependency resolution
-        self.assertEqual(len(self.global_result_dict), 2)
-        self.assertEqual(len(self.local_result_dict),
-                         len(local_result_expected))
         self.assertRaises(queue.Empty, self.message_queue.get, timeout=0)
         self.assertRaises(queue.Empty, self.control_queue.get, timeout=0)
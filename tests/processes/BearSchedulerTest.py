@@ -0,0 +1,82 @@
+import queue
+import unittest
+
+from coalib.bears.GlobalBear import GlobalBear
+from coalib.processes.BearScheduler import BearScheduler
+from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+from coalib.settings.Section import Section
+
+
+class MissingBear(GlobalBear):
+    pass
+
+
+class IndependentBear(GlobalBear):
+    pass
+
+
+class DependentBear(GlobalBear):
+
+    @staticmethod
+    def get_dependencies():
+        return [MissingBear]
+
+
+class IndirectlyDependentBear(GlobalBear):
+
+    @staticmethod
+    def get_dependencies():
+        return [DependentBear, IndependentBear]
+
+
+class BearSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.task_queue = queue.Queue()
+        section = Section("name")
+        self.bears = [IndirectlyDependentBear({}, section, None),
+                      DependentBear({}, section, None),
+                      "not a valid bear",
+                      IndependentBear({}, section, None)]
+
+    def get_tasks(self):
+        tasks = []
+        while not self.task_queue.empty():
+            tasks.append(self.task_queue.get())
+        return tasks
+
+    def test_unsatisfiable(self):
+        uut = BearScheduler(self.task_queue, ["a", "b"], self.bears)
+        self.assertEqual(uut.unsatisfiable,
+                         {"DependentBear", "IndirectlyDependentBear"})
+
+        uut.start()
+        self.assertEqual(self.get_tasks(),
+                         [(CONTROL_ELEMENT.GLOBAL, (2, None)),
+                          (CONTROL_ELEMENT.GLOBAL, (3, None)),
+                          (CONTROL_ELEMENT.LOCAL, "a"),
+                          (CONTROL_ELEMENT.LOCAL, "b")])
+
+        uut.global_done("str", None)
+        uut.global_done("IndependentBear", [])
+        self.assertEqual(self.get_tasks(), [])
+        self.assertFalse(uut.finished)
+
+        uut.local_done(1)
+        self.assertFalse(uut.local_finished)
+        uut.local_done(1)
+        self.assertTrue(uut.local_finished)
+        self.assertTrue(uut.finished)
+
+    def test_stop(self):
+        uut = BearScheduler(self.task_queue, [], [])
+        self.assertTrue(uut.finished)
+        uut.stop(2)
+        self.assertEqual(self.get_tasks(), [None, None])
+
+    def test_cancel(self):
+        uut = BearScheduler(self.task_queue, ["file1", "file2"], [])
+        uut.start()
+        uut.cancel()
+        uut.stop(1)
+        self.assertEqual(self.get_tasks(), [None])
@@ -0,0 +1,83 @@
+import random
+import unittest
+import unittest.mock
+
+from coalib.processes import IgnoreComments
+from coalib.processes.IgnoreComments import (
+    get_file_ignore_ranges, get_ignore_scope)
+
+
+def scan_lines(file):
+    """
+    Scans the file line by line like the scanner did before it ran a single
+    regex over the file.
+    """
+    ranges = []
+    start = None
+    bears = []
+    stop_ignoring = False
+    for line_number, line in enumerate(file, start=1):
+        line = line.lower()
+        if "start ignoring " in line:
+            start = line_number
+            bears = get_ignore_scope(line, "start ignoring ")
+        elif "stop ignoring" in line:
+            stop_ignoring = True
+            if start:
+                ranges.append((bears, start, line_number,
+                               len(file[line_number-1])))
+        elif "ignore " in line:
+            ranges.append((get_ignore_scope(line, "ignore "), line_number,
+                           line_number+1, len(file[line_number])))
+    if stop_ignoring is False and start is not None:
+        ranges.append((bears, start, len(file), len(file[-1])))
+    return ranges
+
+
+class IgnoreCommentsTest(unittest.TestCase):
+
+    def setUp(self):
+        IgnoreComments._ignore_comment_cache.clear()
+
+    def test_get_ignore_scope(self):
+        self.assertEqual(get_ignore_scope("# ignore all\n", "ignore "), [])
+        self.assertEqual(get_ignore_scope("# ignore a, b\n", "ignore "),
+                         ["a", "b"])
+
+    def test_no_comments(self):
+        self.assertEqual(get_file_ignore_ranges("f", ()), [])
+        self.assertEqual(get_file_ignore_ranges("f", ("a\n", "b\n")), [])
+
+    def test_matches_line_scan(self):
+        rand = random.Random(0)
+        comments = ["# Ignore ABear\n",
+                    "# IGNORE all\n",
+                    "# start ignoring BBear, CBear\n",
+                    "# Stop Ignoring\n",
+                    "ignored = 1\n",
+                    "# Ignored\n"]
+        for i in range(50):
+            file = [rand.choice(comments) if rand.random() < 0.2 else
+                    "a = {}\n".format(i)
+                    for i in range(rand.randint(1, 30))]
+            # An ignore comment applies to the next line.
+            file.append("last = 1\n")
+            ranges = [(bears, range.start.line, range.end.line,
+                       range.end.column)
+                      for bears, range in get_file_ignore_ranges("f", file)]
+            self.assertEqual(ranges, scan_lines(file), file)
+
+    def test_cache(self):
+        file = ("# Ignore ABear\n", "a = 1\n")
+        with unittest.mock.patch(
+                "coalib.processes.IgnoreComments._scan_ignore_comments",
+                wraps=IgnoreComments._scan_ignore_comments) as scan:
+            first = get_file_ignore_ranges("f", file)
+            second = get_file_ignore_ranges("g", list(file))
+            self.assertEqual(scan.call_count, 1)
+
+        self.assertEqual(first[0][0], ["abear"])
+        self.assertNotEqual(first[0][1].file, second[0][1].file)
+        # The cached bear lists are not shared.
+        first[0][0].append("bbear")
+        self.assertEqual(get_file_ignore_ranges("f", file)[0][0], ["abear"])
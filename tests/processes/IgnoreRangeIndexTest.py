@@ -0,0 +1,109 @@
+import os
+import random
+import unittest
+import unittest.mock
+
+from coalib.parsing.Globbing import fnmatch
+from coalib.processes.IgnoreRangeIndex import IgnoreRangeIndex
+from coalib.results.Result import Result
+from coalib.results.SourceRange import SourceRange
+
+
+def naive_ignores(result, ignore_ranges):
+    orig = result.origin.lower()
+    return any(result.overlaps(range) and
+               (len(bears) == 0 or orig in bears or fnmatch(orig, bears))
+               for bears, range in ignore_ranges)
+
+
+class IgnoreRangeIndexTest(unittest.TestCase):
+
+    def test_empty(self):
+        index = IgnoreRangeIndex([])
+        self.assertFalse(index.ignores(Result.from_values("Bear", "msg", "f",
+                                                          line=1)))
+        self.assertFalse(index.ignores(Result("Bear", "msg")))
+
+    def test_columns(self):
+        index = IgnoreRangeIndex([([], SourceRange.from_values("f", 2, 5,
+                                                               3, 2))])
+        self.assertFalse(index.ignores(Result.from_values(
+            "Bear", "msg", "f", line=2, column=1, end_line=2, end_column=4)))
+        self.assertTrue(index.ignores(Result.from_values(
+            "Bear", "msg", "f", line=2, column=1, end_line=2, end_column=5)))
+        self.assertTrue(index.ignores(Result.from_values(
+            "Bear", "msg", "f", line=3, column=2, end_line=4, end_column=1)))
+        self.assertFalse(index.ignores(Result.from_values(
+            "Bear", "msg", "f", line=3, column=3, end_line=4, end_column=1)))
+        # The whole line overlaps.
+        self.assertTrue(index.ignores(Result.from_values("Bear", "msg", "f",
+                                                         line=3)))
+        # The whole file doesn't.
+        self.assertFalse(index.ignores(Result.from_values("Bear", "msg",
+                                                          "f")))
+
+    def test_bear_scopes(self):
+        index = IgnoreRangeIndex([
+            (["pybear"], SourceRange.from_values("f", 1, 1, 10, 1)),
+            (["(line*|space*)"], SourceRange.from_values("f", 1, 1, 2, 1)),
+            (["xmlbear"], SourceRange.from_values("f", 5, 1, 6, 1))])
+        self.assertTrue(index.ignores(Result.from_values("PyBear", "msg", "f",
+                                                         line=8)))
+        self.assertTrue(index.ignores(Result.from_values("LineLengthBear",
+                                                         "msg", "f",
+                                                         line=2)))
+        self.assertFalse(index.ignores(Result.from_values("LineLengthBear",
+                                                          "msg", "f",
+                                                          line=5)))
+        self.assertTrue(index.ignores(Result.from_values("XMLBear", "msg",
+                                                         "f", line=6)))
+
+    def test_file_dict(self):
+        file_dict = {"f": ("# Ignore ABear\n", "a = 1\n"),
+                     "g": ("# Ignore ABear\n", "b = 1\n")}
+        with unittest.mock.patch(
+                "coalib.processes.IgnoreRangeIndex.get_file_ignore_ranges",
+                return_value=[]) as get_file_ignore_ranges:
+            index = IgnoreRangeIndex(file_dict=file_dict)
+            self.assertEqual(get_file_ignore_ranges.call_count, 0)
+            index.ignores(Result.from_values("ABear", "msg", "f", line=2))
+            index.ignores(Result.from_values("ABear", "msg", "f", line=1))
+            # Only files with results are scanned, each once.
+            get_file_ignore_ranges.assert_called_once_with(
+                os.path.abspath("f"), file_dict["f"])
+
+        index = IgnoreRangeIndex(file_dict=file_dict)
+        self.assertTrue(index.ignores(Result.from_values("ABear", "msg", "g",
+                                                         line=2)))
+        self.assertFalse(index.ignores(Result.from_values("BBear", "msg",
+                                                          "g", line=2)))
+
+    def test_matches_naive_check(self):
+        rand = random.Random(0)
+        bear_scopes = [[], ["abear"], ["(a*|c*)"], ["bbear", "cbear"]]
+        ignore_ranges = []
+        for i in range(200):
+            start_line = rand.randint(1, 100)
+            ignore_ranges.append((
+                rand.choice(bear_scopes),
+                SourceRange.from_values(rand.choice("fg"),
+                                        start_line,
+                                        rand.randint(1, 10),
+                                        start_line + rand.randint(1, 5),
+                                        rand.randint(1, 10))))
+        index = IgnoreRangeIndex(ignore_ranges)
+
+        for i in range(500):
+            start_line = rand.randint(1, 110)
+            result = Result.from_values(rand.choice(["ABear", "BBear",
+                                                     "CBear", "DBear"]),
+                                        "msg",
+                                        rand.choice("fgh"),
+                                        line=start_line,
+                                        column=rand.randint(1, 10),
+                                        end_line=start_line + rand.randint(
+                                            1, 3),
+                                        end_column=rand.randint(1, 10))
+            self.assertEqual(index.ignores(result),
+                             naive_ignores(result, ignore_ranges),
+                             result.affected_code)
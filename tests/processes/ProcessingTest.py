@@ -2,20 +2,27 @@ import multiprocessing
 import os
 import platform
 import queue
+import json
 import re
 import subprocess
 import sys
+import tempfile
 import unittest
+import unittest.mock
 
 from pyprint.ConsolePrinter import ConsolePrinter
 
+from coalib.misc.FileContents import FileContents
 from coalib.output.printers.LogPrinter import LogPrinter
+from coalib.processes.BearScheduler import BearScheduler
 from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
 from coalib.processes.Processing import (
-    ACTIONS, autoapply_actions, check_result_ignore, create_process_group,
-    execute_section, filter_raising_callables, get_default_actions,
-    get_file_dict, print_result, process_queues, simplify_section_result,
-    yield_ignore_ranges)
+    ACTIONS, DEFAULT_READ_THREADS, autoapply_actions, check_result_ignore,
+    create_process_group, execute_section, filter_raising_callables,
+    get_changed_files_from_section, get_default_actions, get_file_dict,
+    get_max_file_size_from_section, get_profile_output_from_section,
+    instantiate_processes, iter_file_dict, print_result, process_queues,
+    simplify_section_result, yield_ignore_ranges)
 from coalib.results.HiddenResult import HiddenResult
 from coalib.results.Result import RESULT_SEVERITY, Result
 from coalib.results.result_actions.ApplyPatchAction import ApplyPatchAction
@@ -124,6 +131,71 @@ class ProcessingTest(unittest.TestCase):
                          "message='test message'\\) at "
                          "0x[0-9a-fA-F]+>".format(hex(global_result.id)))
 
+    def test_run_mmap_file_dict(self):
+        self.sections['default'].append(Setting('jobs', "2"))
+        self.sections['default'].append(Setting('mmap_file_dict', "True"))
+        results = execute_section(self.sections["default"],
+                                  self.global_bears["default"],
+                                  self.local_bears["default"],
+                                  lambda *args: self.result_queue.put(args[2]),
+                                  self.log_printer)
+        self.assertTrue(results[0])
+        self.assertEqual(len(results[1]), 1)
+        self.assertEqual(len(results[2]), 1)
+        self.assertIsInstance(results[3], dict)
+        self.assertEqual(list(results[3].keys()), [self.testcode_c_path])
+
+    def test_run_profiled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profile_output = os.path.join(directory, "profile.json")
+            self.sections['default'].append(Setting('jobs', "2"))
+            self.sections['default'].append(Setting('profile_output',
+                                                    profile_output))
+            results = execute_section(self.sections["default"],
+                                      self.global_bears["default"],
+                                      self.local_bears["default"],
+                                      lambda *args: None,
+                                      self.log_printer)
+            self.assertTrue(results[0])
+
+            with open(profile_output) as file:
+                trace = json.load(file)
+            spans = {(event["cat"], event["name"])
+                     for event in trace["traceEvents"]
+                     if event["ph"] == "X"}
+            self.assertIn(("bear", "ProcessingLocalTestBear"), spans)
+            self.assertIn(("bear", "ProcessingGlobalTestBear"), spans)
+            self.assertIn(("file", "read"), spans)
+            self.assertIn(("output", "print_result"), spans)
+            self.assertIn(("queue", "wait for results"), spans)
+            self.assertIn(("queue", "wait for task"), spans)
+            # The controlling process and both bear running processes.
+            self.assertEqual(len([event for event in trace["traceEvents"]
+                                  if event["ph"] == "M"]),
+                             3)
+
+            with open(os.path.join(directory, "profile.txt")) as file:
+                summary = file.read()
+            self.assertIn("ProcessingLocalTestBear", summary)
+            self.assertIn(self.testcode_c_path, summary)
+            self.assertEqual(sorted(os.listdir(directory)),
+                             ["profile.json", "profile.txt"])
+
+    def test_get_profile_output_from_section(self):
+        section = Section("name")
+        self.assertIsNone(get_profile_output_from_section(section))
+
+        section.append(Setting("profile_output", "False"))
+        self.assertIsNone(get_profile_output_from_section(section))
+
+        section.append(Setting("profile_output", "True"))
+        self.assertEqual(get_profile_output_from_section(section),
+                         "coala_profile_name.json")
+
+        section.append(Setting("profile_output", "out/{section}.json"))
+        self.assertEqual(get_profile_output_from_section(section),
+                         "out/name.json")
+
     def test_empty_run(self):
         self.sections['default'].append(Setting('jobs', "bogus!"))
         results = execute_section(self.sections["default"],
@@ -143,22 +215,6 @@ class ProcessingTest(unittest.TestCase):
 
         # Append custom controlling sequences.
 
-        # Simulated process 1
-        ctrlq.put((CONTROL_ELEMENT.LOCAL, 1))
-        ctrlq.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
-        ctrlq.put((CONTROL_ELEMENT.GLOBAL, 1))
-
-        # Simulated process 2
-        ctrlq.put((CONTROL_ELEMENT.LOCAL, 2))
-
-        # Simulated process 1
-        ctrlq.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
-
-        # Simulated process 2
-        ctrlq.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
-        ctrlq.put((CONTROL_ELEMENT.GLOBAL, 1))
-        ctrlq.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
-
         first_local = Result.from_values("o", "The first result.", file="f")
         second_local = Result.from_values("ABear",
                                           "The second result.",
@@ -173,24 +229,38 @@ class ProcessingTest(unittest.TestCase):
                                           file="f",
                                           line=7)
         first_global = Result("o", "The one and only global result.")
+
+        # Simulated process 1
+        ctrlq.put((CONTROL_ELEMENT.LOCAL,
+                   [(1, [first_local,
+                         second_local,
+                         third_local,
+                         # The following are to be ignored
+                         Result('o', 'm', severity=RESULT_SEVERITY.INFO),
+                         Result.from_values("ABear", "u", "f", 2, 1),
+                         Result.from_values("ABear", "u", "f", 3, 1)])]))
+        # Global results are presented after all local ones
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL, (1, [first_global])))
+
+        # Simulated process 2
+        ctrlq.put((CONTROL_ELEMENT.LOCAL,
+                   [(2, [fourth_local,
+                         # The following are to be ignored
+                         HiddenResult("t", "c"),
+                         Result.from_values("ABear", "u", "f", 5, 1),
+                         Result.from_values("ABear", "u", "f", 6, 1)])]))
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL, (2, [first_global])))
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL, (3, None)))
+
         section = Section("")
         section.append(Setting('min_severity', "normal"))
+        local_result_dict = {}
+        global_result_dict = {}
         process_queues(
             [DummyProcess(control_queue=ctrlq) for i in range(3)],
             ctrlq,
-            {1: [first_local,
-                 second_local,
-                 third_local,
-                 # The following are to be ignored
-                 Result('o', 'm', severity=RESULT_SEVERITY.INFO),
-                 Result.from_values("ABear", "u", "f", 2, 1),
-                 Result.from_values("ABear", "u", "f", 3, 1)],
-             2: [fourth_local,
-                 # The following are to be ignored
-                 HiddenResult("t", "c"),
-                 Result.from_values("ABear", "u", "f", 5, 1),
-                 Result.from_values("ABear", "u", "f", 6, 1)]},
-            {1: [first_global]},
+            local_result_dict,
+            global_result_dict,
             {"f": ["first line  # stop ignoring, invalid ignore range\n",
                    "second line  # ignore all\n",
                    "third line\n",
@@ -200,7 +270,8 @@ class ProcessingTest(unittest.TestCase):
                    "seventh"]},
             lambda *args: self.queue.put(args[2]),
             section,
-            self.log_printer)
+            self.log_printer,
+            BearScheduler(queue.Queue(), [1, 2], ["b1", "b2", "b3"]))
 
         self.assertEqual(self.queue.get(timeout=0), ([first_local,
                                                       second_local,
@@ -208,33 +279,29 @@ class ProcessingTest(unittest.TestCase):
         self.assertEqual(self.queue.get(timeout=0), ([fourth_local]))
         self.assertEqual(self.queue.get(timeout=0), ([first_global]))
         self.assertEqual(self.queue.get(timeout=0), ([first_global]))
+        self.assertEqual(local_result_dict, {1: [first_local,
+                                                 second_local,
+                                                 third_local],
+                                             2: [fourth_local]})
+        self.assertEqual(global_result_dict, {1: [first_global],
+                                              2: [first_global]})
 
     def test_dead_processes(self):
         ctrlq = queue.Queue()
-        # Not enough FINISH elements in the queue, processes start already dead
-        # Also queue elements are reversed
-        ctrlq.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
-        ctrlq.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
-
-        process_queues(
-            [DummyProcess(ctrlq, starts_dead=True) for i in range(3)],
-            ctrlq, {}, {}, {},
-            lambda *args: self.queue.put(args[2]),
-            Section(""),
-            self.log_printer)
-        with self.assertRaises(queue.Empty):
-            self.queue.get(timeout=0)
-
-        # Not enough FINISH elements in the queue, processes start already dead
-        ctrlq.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
-        ctrlq.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
+        first_global = Result("o", "The one and only global result.")
+        # The local results never arrive, processes start already dead
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL, (1, [first_global])))
 
+        global_result_dict = {}
         process_queues(
             [DummyProcess(ctrlq, starts_dead=True) for i in range(3)],
-            ctrlq, {}, {}, {},
+            ctrlq, {}, global_result_dict, {},
             lambda *args: self.queue.put(args[2]),
             Section(""),
-            self.log_printer)
+            self.log_printer,
+            BearScheduler(queue.Queue(), ["f"], ["b1"]))
+        self.assertEqual(self.queue.get(timeout=0), [first_global])
+        self.assertEqual(global_result_dict, {1: [first_global]})
         with self.assertRaises(queue.Empty):
             self.queue.get(timeout=0)
 
@@ -294,12 +361,134 @@ class ProcessingTest(unittest.TestCase):
     def test_get_file_dict(self):
         file_dict = get_file_dict([self.testcode_c_path], self.log_printer)
         self.assertEqual(len(file_dict), 1)
-        self.assertEqual(type(file_dict[self.testcode_c_path]),
-                         tuple,
-                         msg="files in file_dict should not be editable")
+        self.assertIsInstance(file_dict[self.testcode_c_path], FileContents)
+        with self.assertRaises(TypeError,
+                               msg="files in file_dict should not be "
+                                   "editable"):
+            file_dict[self.testcode_c_path][0] = ""
         self.assertEqual("Files that will be checked:\n" + self.testcode_c_path,
                          self.log_printer.log_queue.get().message)
 
+    @unittest.mock.patch('coalib.processes.Processing.get_changed_files')
+    def test_get_changed_files_from_section(self, mock_get_changed_files):
+        mock_get_changed_files.return_value = {"file"}
+        section = Section("name")
+        self.assertIsNone(get_changed_files_from_section(section,
+                                                         self.log_printer))
+
+        section.append(Setting("changed_only", "False"))
+        self.assertIsNone(get_changed_files_from_section(section,
+                                                         self.log_printer))
+
+        section.append(Setting("changed_only", "True"))
+        self.assertEqual(get_changed_files_from_section(section,
+                                                        self.log_printer),
+                         {"file"})
+        mock_get_changed_files.assert_called_with(self.log_printer,
+                                                  "HEAD",
+                                                  os.path.abspath("."))
+
+        # The changes are looked up in the repository of the project.
+        section.append(Setting("project_dir", os.path.abspath("/project")))
+        section.append(Setting("changed_only", "origin/master"))
+        get_changed_files_from_section(section, self.log_printer)
+        mock_get_changed_files.assert_called_with(self.log_printer,
+                                                  "origin/master",
+                                                  os.path.abspath("/project"))
+
+    def test_iter_file_dict(self):
+        with tempfile.TemporaryDirectory() as directory:
+            def write(name, contents):
+                filename = os.path.join(directory, name)
+                with open(filename, "wb") as file:
+                    file.write(contents)
+                return filename
+
+            filenames = [write(str(i), "{}\r\nb\rc\n".format(i).encode())
+                         for i in range(20)]
+            binary = write("binary", b"a\0b")
+            non_unicode = write("non_unicode", b"\xff\xfe")
+            large = write("large", b"a" * 2000)
+
+            for threads in (1, 4):
+                self.assertEqual(
+                    list(iter_file_dict(filenames, self.log_printer,
+                                        threads=threads)),
+                    [(filename, ("{}\n".format(i), "b\n", "c\n"))
+                     for i, filename in enumerate(filenames)])
+
+            self.assertEqual(
+                list(iter_file_dict([binary, non_unicode, large],
+                                    self.log_printer,
+                                    max_file_size=1024)),
+                [])
+            self.assertIn("seems to be a binary file",
+                          self.log_printer.log_queue.get().message)
+            self.assertIn("seems to contain non-unicode characters",
+                          self.log_printer.log_queue.get().message)
+            self.assertIn("more than the maximum file size of 1024 bytes",
+                          self.log_printer.log_queue.get().message)
+
+            self.assertEqual(get_file_dict([large], self.log_printer,
+                                           max_file_size=2000),
+                             {large: ("a" * 2000,)})
+
+    def test_get_max_file_size_from_section(self):
+        section = Section("name")
+        self.assertIsNone(get_max_file_size_from_section(section,
+                                                         self.log_printer))
+
+        section.append(Setting("max_file_size", "2"))
+        self.assertEqual(get_max_file_size_from_section(section,
+                                                        self.log_printer),
+                         2048)
+
+        section.append(Setting("max_file_size", "0.5"))
+        self.assertEqual(get_max_file_size_from_section(section,
+                                                        self.log_printer),
+                         512)
+
+        for invalid in ("many", "inf"):
+            section.append(Setting("max_file_size", invalid))
+            self.assertIsNone(get_max_file_size_from_section(
+                section, self.log_printer))
+            self.assertEqual(self.log_printer.log_queue.get().message,
+                             "Unable to convert setting 'max_file_size' into "
+                             "a number. Falling back to analyzing files of "
+                             "any size.")
+
+    def test_invalid_walk_threads(self):
+        self.sections["default"].append(Setting("walk_threads", "many"))
+        with unittest.mock.patch(
+                "coalib.processes.Processing.collect_files",
+                return_value=[]) as collect_files_mock:
+            instantiate_processes(self.sections["default"],
+                                  [],
+                                  [],
+                                  1,
+                                  self.log_printer)
+        self.assertEqual(collect_files_mock.call_args[1]["walk_threads"], 0)
+        self.assertEqual(self.log_printer.log_queue.get().message,
+                         "Unable to convert setting 'walk_threads' into a "
+                         "number. Falling back to 0.")
+
+    def test_invalid_read_threads(self):
+        self.sections["default"].append(Setting("read_threads", "many"))
+        with unittest.mock.patch(
+                "coalib.processes.Processing.get_file_dict",
+                wraps=get_file_dict) as get_file_dict_mock:
+            instantiate_processes(self.sections["default"],
+                                  [],
+                                  [],
+                                  1,
+                                  self.log_printer)
+        self.assertEqual(get_file_dict_mock.call_args[1]["threads"],
+                         DEFAULT_READ_THREADS)
+        self.assertIn("Unable to convert setting 'read_threads' into a "
+                      "number. Falling back to 8.",
+                      [self.log_printer.log_queue.get().message
+                       for i in range(self.log_printer.log_queue.qsize())])
+
     def test_get_file_dict_non_existent_file(self):
         file_dict = get_file_dict(["non_existent_file"], self.log_printer)
         self.assertEqual(file_dict, {})
@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from coalib.processes.Profiler import (
+    Profiler, get_active_profiler, profile, set_active_profiler)
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def test_span(self):
+        profiler = Profiler("test")
+        with profiler.span("SomeBear", "bear", file="a.py"):
+            sum(range(1000))
+
+        metadata, event = profiler.get_trace_events()
+        self.assertEqual(metadata["ph"], "M")
+        self.assertEqual(metadata["args"], {"name": "test"})
+        self.assertEqual(event["name"], "SomeBear")
+        self.assertEqual(event["cat"], "bear")
+        self.assertEqual(event["pid"], os.getpid())
+        self.assertGreaterEqual(event["dur"], 0)
+        self.assertGreaterEqual(event["args"]["cpu_time"], 0)
+        self.assertEqual(event["args"]["file"], "a.py")
+
+    def test_span_thread(self):
+        profiler = Profiler()
+
+        def record_span():
+            with profiler.span("read", "file", file="a.py"):
+                pass
+
+        thread = threading.Thread(target=record_span)
+        thread.start()
+        thread.join()
+
+        event = profiler.events[0]
+        self.assertEqual(event["tid"], thread.ident)
+        # The CPU time of other threads than the main one is only known if
+        # it can be measured per thread.
+        self.assertEqual("cpu_time" in event["args"],
+                         hasattr(time, "thread_time"))
+
+    def test_span_exception(self):
+        profiler = Profiler()
+        with self.assertRaises(ValueError):
+            with profiler.span("SomeBear", "bear"):
+                raise ValueError
+
+        self.assertEqual(len(profiler.events), 1)
+
+    def test_save_load_write(self):
+        worker = Profiler("worker")
+        with worker.span("SomeBear", "bear"):
+            pass
+        profiler = Profiler()
+
+        with tempfile.TemporaryDirectory() as directory:
+            events_file = os.path.join(directory, "events.json")
+            worker.save_events(events_file)
+            profiler.load_events(events_file)
+            self.assertEqual(profiler.events, worker.get_trace_events())
+
+            trace_file = os.path.join(directory, "trace.json")
+            profiler.write_trace(trace_file)
+            with open(trace_file) as file:
+                trace = json.load(file)
+
+        self.assertEqual(trace["displayTimeUnit"], "ms")
+        self.assertEqual(len(trace["traceEvents"]), 3)
+
+    def test_profile(self):
+        self.assertIsNone(get_active_profiler())
+        with profile("SomeBear", "bear"):
+            pass
+
+        profiler = Profiler()
+        set_active_profiler(profiler)
+        try:
+            self.assertIs(get_active_profiler(), profiler)
+            with profile("SomeBear", "bear", file="a.py"):
+                pass
+        finally:
+            set_active_profiler(None)
+
+        self.assertEqual(len(profiler.events), 1)
+        self.assertEqual(profiler.events[0]["args"]["file"], "a.py")
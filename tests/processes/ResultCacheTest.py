@@ -0,0 +1,208 @@
+import os
+import queue
+import tempfile
+import unittest
+
+from pyprint.NullPrinter import NullPrinter
+
+from coalib.bears.GlobalBear import GlobalBear
+from coalib.bears.LocalBear import LocalBear
+from coalib.output.printers.LogPrinter import LogPrinter
+from coalib.processes.BearRunning import (
+    run_global_bear, run_local_bears_on_file)
+from coalib.processes.communication.ResultTransport import ResultTransport
+from coalib.processes.ResultCache import (
+    ResultCache, get_result_cache, hash_file_contents, hash_file_dict)
+from coalib.results.Result import Result
+from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
+
+
+class CountingBear(LocalBear):
+    runs = 0
+
+    def run(self, filename, file, setting: int=1):
+        CountingBear.runs += 1
+        return [Result.from_values("CountingBear", str(setting), filename)]
+
+
+class DependentCountingBear(LocalBear):
+    runs = 0
+
+    def run(self, filename, file, dependency_results=None):
+        DependentCountingBear.runs += 1
+        return []
+
+    @staticmethod
+    def get_dependencies():
+        return [CountingBear]
+
+
+class CountingGlobalBear(GlobalBear):
+    runs = 0
+
+    def run(self):
+        CountingGlobalBear.runs += 1
+        return [Result("CountingGlobalBear", str(len(self.file_dict)))]
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.uut = ResultCache(self.cache_dir.name)
+        self.section = Section("name")
+        self.message_queue = queue.Queue()
+        CountingBear.runs = 0
+        DependentCountingBear.runs = 0
+        CountingGlobalBear.runs = 0
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_hash_file_contents(self):
+        self.assertEqual(hash_file_contents(("a\n", "b\n")),
+                         hash_file_contents(["a\n", "b\n"]))
+        self.assertNotEqual(hash_file_contents(("a\n", "b\n")),
+                            hash_file_contents(("a\n", "c\n")))
+
+    def test_hash_file_dict(self):
+        self.assertEqual(hash_file_dict({"a": ("1\n",), "b": ()}),
+                         hash_file_dict({"b": (), "a": ("1\n",)}))
+        self.assertNotEqual(hash_file_dict({"a": ("1\n",)}),
+                            hash_file_dict({"b": ("1\n",)}))
+        self.assertNotEqual(hash_file_dict({"a": ("1\n",)}),
+                            hash_file_dict({"a": ("2\n",)}))
+
+    def test_key(self):
+        bear = CountingBear(self.section, self.message_queue)
+        key = self.uut.get_key(bear, ("a\n",))
+        self.assertEqual(key, self.uut.get_key(bear, ("a\n",)))
+        self.assertNotEqual(key, self.uut.get_key(bear, ("b\n",)))
+
+        # Relevant settings are part of the key, others aren't.
+        section = Section("name")
+        section.append(Setting("irrelevant", "value"))
+        self.assertEqual(
+            key,
+            self.uut.get_key(CountingBear(section, self.message_queue),
+                             ("a\n",)))
+        bear = CountingBear(section, self.message_queue)
+        section.append(Setting("setting", "2"))
+        other_key = self.uut.get_key(bear, ("a\n",))
+        self.assertNotEqual(key, other_key)
+        # Changed settings are taken into account for the same bear.
+        section.append(Setting("setting", "3"))
+        self.assertNotEqual(other_key, self.uut.get_key(bear, ("a\n",)))
+
+    def test_key_filename(self):
+        bear = CountingBear(self.section, self.message_queue)
+        key = self.uut.get_key(bear, ("a\n",), filename="a.py")
+        self.assertEqual(key,
+                         self.uut.get_key(bear, ("a\n",), filename="a.py"))
+        self.assertNotEqual(key,
+                            self.uut.get_key(bear, ("a\n",), filename="b.py"))
+        self.assertNotEqual(key, self.uut.get_key(bear, ("a\n",)))
+
+    def test_get_put(self):
+        self.assertIsNone(self.uut.get("key"))
+        self.uut.put("key", [Result("origin", "message")])
+        self.assertEqual(self.uut.get("key"), [Result("origin", "message")])
+
+        # Unpicklable results are not cached.
+        self.uut.put("other", [lambda: None])
+        self.assertIsNone(self.uut.get("other"))
+        self.assertEqual(os.listdir(self.cache_dir.name), ["key"])
+
+    def test_evict(self):
+        self.uut.put("old", ["x" * 1024 * 600])
+        os.utime(os.path.join(self.cache_dir.name, "old"), (0, 0))
+        self.uut.put("new", ["x" * 1024 * 600])
+
+        self.uut.max_size = 1
+        self.uut.evict()
+        self.assertEqual(os.listdir(self.cache_dir.name), ["new"])
+
+    def test_run_local_bears_on_file(self):
+        file_dict = {"f": ("a\n",)}
+        bears = [CountingBear(self.section, self.message_queue),
+                 DependentCountingBear(self.section, self.message_queue)]
+        control_queue = queue.Queue()
+        transport = ResultTransport(control_queue, "LOCAL", batch_size=1)
+
+        for i in range(2):
+            run_local_bears_on_file(self.message_queue,
+                                    0,
+                                    file_dict,
+                                    bears,
+                                    transport,
+                                    "f",
+                                    self.uut)
+            _, [(filename, results)] = control_queue.get(timeout=0)
+            self.assertEqual(len(results), 1)
+
+        # Bears with dependencies are always run.
+        self.assertEqual(CountingBear.runs, 1)
+        self.assertEqual(DependentCountingBear.runs, 2)
+
+        file_dict = {"f": ("b\n",)}
+        run_local_bears_on_file(self.message_queue,
+                                0,
+                                file_dict,
+                                bears,
+                                transport,
+                                "f",
+                                self.uut)
+        self.assertEqual(CountingBear.runs, 2)
+
+    def test_run_local_bears_on_equal_files(self):
+        file_dict = {"a.py": ("a\n",), "b.py": ("a\n",)}
+        bears = [CountingBear(self.section, self.message_queue)]
+        control_queue = queue.Queue()
+        transport = ResultTransport(control_queue, "LOCAL", batch_size=1)
+
+        for filename in ("a.py", "b.py"):
+            run_local_bears_on_file(self.message_queue,
+                                    0,
+                                    file_dict,
+                                    bears,
+                                    transport,
+                                    filename,
+                                    self.uut)
+            _, [(_, [result])] = control_queue.get(timeout=0)
+            self.assertEqual(result.affected_code[0].file,
+                             os.path.abspath(filename))
+        self.assertEqual(CountingBear.runs, 2)
+
+    def test_run_global_bear(self):
+        bear = CountingGlobalBear({"f": ("a\n",)},
+                                  self.section,
+                                  self.message_queue)
+
+        for i in range(2):
+            self.assertEqual(
+                run_global_bear(self.message_queue, 0, bear, None, self.uut),
+                [Result("CountingGlobalBear", "1")])
+        self.assertEqual(CountingGlobalBear.runs, 1)
+
+        # Any file change invalidates the results.
+        bear.file_dict = {"f": ("a\n",), "g": ()}
+        self.assertEqual(
+            run_global_bear(self.message_queue, 0, bear, None, self.uut),
+            [Result("CountingGlobalBear", "2")])
+        self.assertEqual(CountingGlobalBear.runs, 2)
+
+    def test_get_result_cache(self):
+        log_printer = LogPrinter(NullPrinter())
+        self.assertIsNone(get_result_cache(self.section, log_printer))
+
+        cache_dir = os.path.join(self.cache_dir.name, "sub")
+        self.section.append(Setting("cache_dir", cache_dir))
+        self.section.append(Setting("max_cache_size", "5"))
+        cache = get_result_cache(self.section, log_printer)
+        self.assertEqual(cache.cache_dir, cache_dir)
+        self.assertEqual(cache.max_size, 5)
+        self.assertTrue(os.path.isdir(cache_dir))
+
+        self.section.append(Setting("no_cache", "True"))
+        self.assertIsNone(get_result_cache(self.section, log_printer))
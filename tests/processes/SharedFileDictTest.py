@@ -0,0 +1,55 @@
+import os
+import pickle
+import unittest
+
+from coalib.misc.FileContents import FileContents
+from coalib.processes.SharedFileDict import SharedFileDict
+
+
+class SharedFileDictTest(unittest.TestCase):
+
+    def setUp(self):
+        self.file_dict = {"file": ("a\n", "äöü\n", "\n", "no newline"),
+                          "empty": (),
+                          "other": ("b\n",)}
+        self.uut = SharedFileDict(self.file_dict)
+
+    def tearDown(self):
+        self.uut.close()
+
+    def test_creating_process(self):
+        self.assertEqual(dict(self.uut), self.file_dict)
+        self.assertIs(self.uut["file"], self.file_dict["file"])
+        self.assertIn("empty", self.uut)
+        self.assertNotIn("unknown", self.uut)
+        self.assertEqual(len(self.uut), 3)
+
+    def test_other_process(self):
+        shared = pickle.loads(pickle.dumps(self.uut))
+        self.assertIsNone(shared._file_dict)
+        # Pretend to be unpickled in another process.
+        shared._creator_pid = -1
+
+        self.assertIsInstance(shared["file"], FileContents)
+        self.assertEqual(shared["file"], self.file_dict["file"])
+        self.assertEqual(shared["file"][1], "äöü\n")
+        self.assertEqual(shared["file"].get_line_col(6), (3, 1))
+        self.assertEqual(shared["empty"], ())
+        self.assertEqual(shared["other"], ("b\n",))
+        self.assertIs(shared["other"], shared["other"])
+        self.assertEqual(dict(shared), self.file_dict)
+        self.assertRaises(KeyError, shared.__getitem__, "unknown")
+
+    def test_close(self):
+        self.uut.close()
+        self.assertFalse(os.path.exists(self.uut.arena_path))
+        # The creating process still has the contents.
+        self.assertEqual(self.uut["other"], ("b\n",))
+        self.uut.close()
+
+    def test_empty(self):
+        uut = SharedFileDict({})
+        shared = pickle.loads(pickle.dumps(uut))
+        shared._creator_pid = -1
+        self.assertEqual(dict(shared), {})
+        uut.close()
@@ -0,0 +1,46 @@
+import multiprocessing
+import time
+import unittest
+
+from coalib.processes.communication.ResultTransport import (
+    ResultTransport, join_senders)
+
+
+def send_results(control_queue, count):
+    transport = ResultTransport(control_queue, "LOCAL", batch_size=1)
+    for index in range(count):
+        # Large enough to fill the pipe of the queue quickly.
+        transport.send(index, ["result"] * 100)
+    transport.flush()
+
+
+class ResultTransportTest(unittest.TestCase):
+
+    def test_join_senders(self):
+        control_queue = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=send_results,
+                                             args=(control_queue, 1000))
+                     for i in range(2)]
+        for process in processes:
+            process.start()
+
+        self.assertEqual(control_queue.get(),
+                         ("LOCAL", [(0, ["result"] * 100)]))
+        # The rest of the results are never read otherwise.
+        join_senders(control_queue, processes)
+        for process in processes:
+            self.assertFalse(process.is_alive())
+            self.assertEqual(process.exitcode, 0)
+
+    def test_join_senders_exited(self):
+        # Processes exiting on their own are joined without polling the
+        # queue for a while.
+        control_queue = multiprocessing.Queue()
+        start = time.perf_counter()
+        for i in range(10):
+            process = multiprocessing.Process(target=time.sleep,
+                                              args=(0.005,))
+            process.start()
+            join_senders(control_queue, [process])
+            self.assertEqual(process.exitcode, 0)
+        self.assertLess(time.perf_counter() - start, 0.9)
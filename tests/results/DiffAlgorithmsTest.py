@@ -0,0 +1,93 @@
+import random
+import unittest
+import unittest.mock
+
+from coalib.results import DiffAlgorithms
+from coalib.results.DiffAlgorithms import (
+    difflib_opcodes, histogram_opcodes, _get_line_ids, _myers_matches)
+
+
+def longest_common_subsequence_length(lines_1, lines_2):
+    lengths = [[0] * (len(lines_2) + 1) for i in range(len(lines_1) + 1)]
+    for i, line_1 in enumerate(lines_1):
+        for j, line_2 in enumerate(lines_2):
+            lengths[i + 1][j + 1] = (lengths[i][j] + 1 if line_1 == line_2
+                                     else max(lengths[i][j + 1],
+                                              lengths[i + 1][j]))
+    return lengths[-1][-1]
+
+
+def apply_opcodes(opcodes, lines_1, lines_2):
+    result = []
+    for tag, index_1, end_1, index_2, end_2 in opcodes:
+        if tag == "equal":
+            assert lines_1[index_1:end_1] == lines_2[index_2:end_2]
+            result.extend(lines_1[index_1:end_1])
+        else:
+            result.extend(lines_2[index_2:end_2])
+    return result
+
+
+class DiffAlgorithmsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rand = random.Random(0)
+
+    def random_lines(self, alphabet, max_length=30):
+        return [self.rand.choice(alphabet)
+                for i in range(self.rand.randint(0, max_length))]
+
+    def test_opcodes(self):
+        for i in range(500):
+            alphabet = self.rand.choice(["a", "ab", "ab}", "abcdefghij"])
+            lines_1 = self.random_lines(alphabet)
+            lines_2 = self.random_lines(alphabet)
+            for algorithm in (difflib_opcodes, histogram_opcodes):
+                opcodes = algorithm(lines_1, lines_2)
+                self.assertEqual(apply_opcodes(opcodes, lines_1, lines_2),
+                                 lines_2)
+                # Like difflib, all lines are covered and changes are never
+                # adjacent.
+                self.assertEqual(opcodes[0][1:4:2] if opcodes else (0, 0),
+                                 (0, 0))
+                for opcode, next_opcode in zip(opcodes, opcodes[1:]):
+                    self.assertEqual(opcode[2:5:2], next_opcode[1:4:2])
+                    self.assertIn("equal", (opcode[0], next_opcode[0]))
+
+    def test_myers_is_minimal(self):
+        for i in range(300):
+            lines_1 = self.random_lines("abc", 20)
+            lines_2 = self.random_lines("abc", 20)
+            ids_1, ids_2 = _get_line_ids(lines_1, lines_2)
+            matches = _myers_matches(ids_1, ids_2,
+                                     0, len(ids_1), 0, len(ids_2))
+            self.assertEqual(len(matches),
+                             longest_common_subsequence_length(lines_1,
+                                                               lines_2))
+            for index_1, index_2 in matches:
+                self.assertEqual(lines_1[index_1], lines_2[index_2])
+
+    def test_repeated_lines(self):
+        lines_1 = ["}\n", "\n"] * 200 + ["a\n"]
+        lines_2 = ["\n", "}\n"] * 200 + ["b\n"]
+        with unittest.mock.patch.object(DiffAlgorithms, "MAX_MYERS_EDITS",
+                                        10):
+            opcodes = histogram_opcodes(lines_1, lines_2)
+        self.assertEqual(apply_opcodes(opcodes, lines_1, lines_2), lines_2)
+        self.assertEqual(histogram_opcodes(lines_1, lines_2),
+                         [("delete", 0, 1, 0, 0),
+                          ("equal", 1, 400, 0, 399),
+                          ("replace", 400, 401, 399, 401)])
+
+    def test_no_rare_lines(self):
+        # Two lines repeated in random order need many edits, the Myers
+        # algorithm may only search for a few of them before giving up.
+        lines_1 = [self.rand.choice("ab") + "\n" for i in range(2000)]
+        lines_2 = [self.rand.choice("ab") + "\n" for i in range(2000)]
+        with unittest.mock.patch.object(
+                DiffAlgorithms, "_myers_matches",
+                wraps=DiffAlgorithms._myers_matches) as myers_matches:
+            opcodes = histogram_opcodes(lines_1, lines_2)
+        self.assertEqual(apply_opcodes(opcodes, lines_1, lines_2), lines_2)
+        self.assertEqual(myers_matches.call_count, 1)
+        self.assertEqual(myers_matches.call_args[0][6], 89)
@@ -151,6 +151,16 @@ class DiffTest(unittest.TestCase):
         self.uut = Diff.from_string_arrays(a, b)
         self.assertEqual(self.uut.modified, b)
 
+    def test_from_string_arrays_algorithms(self):
+        a = ["{", "a", "}", "", "{", "b", "}"]
+        b = ["{", "b", "}", "", "{", "a", "c", "}"]
+        for algorithm in ("difflib", "histogram"):
+            self.uut = Diff.from_string_arrays(a, b, algorithm=algorithm)
+            self.assertEqual(self.uut.modified, b)
+
+        with self.assertRaisesRegex(ValueError, "difflib, histogram"):
+            Diff.from_string_arrays(a, b, algorithm="patience")
+
     def test_from_clang_fixit(self):
         try:
             from clang.cindex import Index, LibclangError
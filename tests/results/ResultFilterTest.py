@@ -604,3 +604,27 @@ class ResultFilterTest(unittest.TestCase):
                                      [old_result_tf1, old_result_tf2],
                                      [new_result])
         self.assertEqual(new_results, [new_result])
+
+    def test_compare_snippets(self):
+        tf1 = abspath('tf1')
+        original_file_dict = {tf1: ['a = 1\n', 'removed\n', 'b = 2\n']}
+        modified_file_dict = {tf1: ['x = 0\n', 'a = 1\n', 'b = 2\n']}
+        old_results = [
+            Result.from_values('origin', 'message', 'tf1', 3),
+            Result.from_values('origin', 'message', 'tf1', 1, 1, 3, 1)]
+        new_results = [
+            Result.from_values('origin', 'message', 'tf1', 3),
+            Result.from_values('origin', 'message', 'tf1', 2, 1, 3, 1)]
+
+        self.assertEqual(filter_results(dict(original_file_dict),
+                                        dict(modified_file_dict),
+                                        old_results,
+                                        new_results),
+                         [])
+        # The second result spans a removed line, its code changed.
+        self.assertEqual(filter_results(dict(original_file_dict),
+                                        dict(modified_file_dict),
+                                        old_results,
+                                        new_results,
+                                        compare_snippets=True),
+                         [new_results[1]])
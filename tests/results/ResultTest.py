@@ -1,5 +1,6 @@
 import unittest
 import json
+import pickle
 from os.path import abspath
 
 from coalib.results.Diff import Diff
@@ -156,3 +157,26 @@ class ResultTest(unittest.TestCase):
         json_dump = json.dumps(diff, cls=JSONEncoder, sort_keys=True)
         self.assertEqual(
             json_dump, '"--- \\n+++ \\n@@ -1,3 +1,2 @@\\n 1-2-3+3_changed"')
+
+    def test_ids(self):
+        ids = [Result("origin", "msg").id for i in range(3)]
+        self.assertEqual(ids, list(range(ids[0], ids[0] + 3)))
+
+    def test_pickle(self):
+        uut = Result.from_values("origin", "msg", "file", 2, 3,
+                                 severity=RESULT_SEVERITY.MAJOR,
+                                 debug_msg="debug")
+        self.assertFalse(hasattr(uut, "__dict__"))
+        with self.assertRaises(AttributeError):
+            uut.undefined = 1
+
+        unpickled = pickle.loads(pickle.dumps(uut))
+        self.assertEqual(unpickled, uut)
+        self.assertEqual(unpickled.id, uut.id)
+        self.assertEqual(unpickled.__json__(), uut.__json__())
+
+        # Results pickled before they had slots hold a dict of attributes.
+        legacy = Result.__new__(Result)
+        legacy.__setstate__({member: getattr(uut, member)
+                             for member in Result.__slots__})
+        self.assertEqual(legacy, uut)
@@ -1,6 +1,8 @@
+import os
 import unittest
 from os.path import relpath
 
+from coalib.results import SourcePosition as SourcePositionModule
 from coalib.results.SourcePosition import SourcePosition
 from coalib.misc.ContextManagers import prepare_file
 
@@ -19,6 +21,21 @@ class SourcePositionTest(unittest.TestCase):
         SourcePosition("file", 4, None)
         SourcePosition("file", 4, 5)
 
+    def test_interned_file(self):
+        self.assertIs(SourcePosition("file" + str(1)).file,
+                      SourcePosition("file1").file)
+        absolute_file = os.path.abspath("file1")
+        self.assertIs(SourcePosition(absolute_file[:-1] + "1").file,
+                      SourcePosition(absolute_file).file)
+
+        # Only a bounded number of file names is kept.
+        cache_size = SourcePositionModule.INTERNED_FILES_CACHE_SIZE
+        for index in range(cache_size + 10):
+            SourcePosition(os.path.abspath("file" + str(index)))
+        self.assertEqual(
+            SourcePositionModule._intern_absolute_file.cache_info().currsize,
+            cache_size)
+
     def test_string_conversion(self):
         uut = SourcePosition("filename", 1)
         self.assertRegex(